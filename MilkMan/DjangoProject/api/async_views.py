@@ -0,0 +1,150 @@
+"""
+Async (ASGI) versions of the read-heavy customer endpoints.
+
+Django 4.2's async ORM methods (``aget``, ``async for``...) run every query
+of a request on one shared thread, so they free the event loop but never
+overlap. These views instead run each independent section through
+``_in_db_thread``: a worker from a dedicated pool with its own database
+connection. The dashboard's catalog, recent payments and basket are loaded
+together, so the request costs roughly its slowest section instead of the
+sum, and the event loop keeps serving other requests meanwhile.
+
+The payloads come from the same helpers and serializers as the sync views in
+api/views.py and are rendered with the API's JSON renderer (JSON_BACKEND),
+so clients see the same bytes either way (DRF 3.14 has no async views, so
+there is no browsable API on these routes). ``USER_VIEWS_ASYNC`` switches
+the routes in api/urls.py; serve them with an ASGI server, e.g.
+``gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker config.asgi``.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .caching import get_dashboard_catalog
+from .views import (
+    _customer_orders, _customer_payments, _dashboard_basket, _dashboard_catalog, _dashboard_customer_summary,
+    _dashboard_recent_payments, _order_history_page, _resolve_customer_for_user_request, _upcoming_deliveries,
+)
+
+# Each thread keeps its own (persistent or pooled) connection, so the pool size
+# bounds how many connections one ASGI worker process opens.
+_db_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='async-db')
+
+
+def _with_connection_lifecycle(func, *args):
+    # Pool threads never see request_started/request_finished; apply CONN_MAX_AGE and health checks here.
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+async def _in_db_thread(func, *args):
+    return await sync_to_async(_with_connection_lifecycle, thread_sensitive=False, executor=_db_executor)(
+        func, *args,
+    )
+
+
+async def _timed(func, *args):
+    started = perf_counter()
+    result = await _in_db_thread(func, *args)
+    return result, perf_counter() - started
+
+
+def _json_response(data, status_code=status.HTTP_200_OK):
+    # The first configured renderer is the JSON one (FastJSONRenderer or DRF's JSONRenderer).
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(renderer.render(data), status=status_code, content_type='application/json')
+
+
+def _customer_not_found():
+    return _json_response({"error": "Valid customer not found"}, status.HTTP_400_BAD_REQUEST)
+
+
+def _method_not_allowed(request):
+    return _json_response(
+        {"detail": f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED,
+    )
+
+
+async def user_dashboard_data(request):
+    """Async user_dashboard_data: the catalog and both customer queries run concurrently."""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    started = perf_counter()
+    customer = await _in_db_thread(_resolve_customer_for_user_request, request)
+    if not customer:
+        return _customer_not_found()
+    resolved = perf_counter()
+
+    (catalog, catalog_seconds), (payments, payments_seconds), (basket, basket_seconds) = await asyncio.gather(
+        _timed(get_dashboard_catalog, _dashboard_catalog),
+        _timed(_dashboard_recent_payments, customer),
+        _timed(_dashboard_basket, customer),
+    )
+    finished = perf_counter()
+
+    response = _json_response({
+        "customer": _dashboard_customer_summary(customer),
+        "products": catalog["products"],
+        "subscriptions": catalog["subscriptions"],
+        "recent_payments": payments,
+        "subscription_basket": basket,
+    })
+    # Sections overlap, so "sections" (their wall time) is less than catalog + payments + basket.
+    response['Server-Timing'] = ", ".join(
+        f"{name};dur={seconds * 1000:.1f}"
+        for name, seconds in (
+            ("resolve", resolved - started),
+            ("catalog", catalog_seconds),
+            ("payments", payments_seconds),
+            ("basket", basket_seconds),
+            ("sections", finished - resolved),
+        )
+    )
+    return response
+
+
+async def user_subscription_deliveries(request):
+    """Async user_subscription_deliveries; the schedule rebuild and read stay in one thread, in order."""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    customer = await _in_db_thread(_resolve_customer_for_user_request, request)
+    if not customer:
+        return _customer_not_found()
+    days = int(request.GET.get('days') or 7)
+    return _json_response({"deliveries": await _in_db_thread(_upcoming_deliveries, customer, days)})
+
+
+async def user_payments(request):
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    customer = await _in_db_thread(_resolve_customer_for_user_request, request)
+    if not customer:
+        return _customer_not_found()
+    return _json_response(await _in_db_thread(_customer_payments, customer))
+
+
+async def user_orders(request):
+    """Async user_orders; same filters and cursor pagination as the sync view."""
+    if request.method != 'GET':
+        return _method_not_allowed(request)
+    customer = await _in_db_thread(_resolve_customer_for_user_request, request)
+    if not customer:
+        return _customer_not_found()
+    try:
+        orders, summary = _customer_orders(customer, request.GET)
+    except ValueError:
+        return _json_response({"error": "start and end must be YYYY-MM-DD"}, status.HTTP_400_BAD_REQUEST)
+    # The cursor paginator reads query_params and builds next/previous links from a DRF Request.
+    page = await _in_db_thread(_order_history_page, orders, summary, Request(request))
+    return _json_response(page.data)
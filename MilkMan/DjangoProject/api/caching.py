@@ -0,0 +1,74 @@
+"""
+Response caches and their invalidation.
+
+Keys are built here so writers (views, payment settlement) and readers agree
+on them. Values are plain JSON-serializable data, never model instances.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+
+from .metrics import record_cache_lookup
+
+
+def _get_or_compute(key, timeout, compute):
+    value = cache.get(key)
+    # The key prefix names the cache in /metrics (reorder-suggestions, admin-stats, ...).
+    record_cache_lookup(key.split(':', 1)[0], value is not None)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+# Payments are settled by process_payment_jobs, whose cache.delete() would not reach the
+# web workers' in-process caches. The key carries the customer's paid order count instead
+# (CustomerStats, loaded with the customer), so a newly paid order is a miss everywhere.
+def reorder_suggestions_key(customer):
+    try:
+        paid_orders = customer.stats.order_count
+    except ObjectDoesNotExist:
+        paid_orders = 0
+    return f"reorder-suggestions:{customer.customer_id}:{paid_orders}"
+
+
+def get_reorder_suggestions(customer, compute):
+    """Cached "buy again" list for a customer; ``compute()`` fills a miss."""
+    return _get_or_compute(
+        reorder_suggestions_key(customer), settings.REORDER_SUGGESTIONS_CACHE_SECONDS, compute,
+    )
+
+
+def get_admin_stats(admin_id, compute):
+    """Dashboard counts for one admin's scope; short-lived rather than invalidated."""
+    return _get_or_compute(f"admin-stats:{admin_id}", settings.ADMIN_STATS_CACHE_SECONDS, compute)
+
+
+# The user dashboard catalog (active products and plans) is identical for every
+# customer. It is cached under a version number that catalog writes bump. The
+# version lives in the cache too: a shared backend makes a change visible to every
+# worker on its next request, the per-process default only to the worker that made
+# it (the others catch up after CATALOG_CACHE_SECONDS).
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 2, None)
+
+
+def get_dashboard_catalog(compute):
+    """Shared catalog section of user_dashboard_data for the current catalog version."""
+    return _get_or_compute(
+        f"user-dashboard-catalog:v{catalog_version()}", settings.CATALOG_CACHE_SECONDS, compute,
+    )
@@ -0,0 +1,190 @@
+"""
+Response compression: gzip, plus brotli when the Brotli package is installed.
+
+Customer, delivery and report lists are large, repetitive JSON that shrinks
+5-10x. ``CompressionMiddleware`` compresses responses whose content type is
+in COMPRESSION_CONTENT_TYPES and whose body is at least
+COMPRESSION_MIN_BYTES, using the best encoding the client's
+``Accept-Encoding`` allows (brotli over gzip on equal weight). Levels are
+COMPRESSION_GZIP_LEVEL and COMPRESSION_BROTLI_LEVEL; benchmark_compression
+shows the CPU cost and transfer savings of each.
+
+Streaming responses are compressed as they stream. Output is flushed every
+STREAM_FLUSH_BYTES of input rather than per chunk, so row-at-a-time
+generators still compress well while the client keeps receiving data.
+
+Place it right after SecurityMiddleware, outside CORS, session, common and
+the instrumentation middleware. Those then see the uncompressed body, and
+their headers (``Vary: Origin``, ``Vary: Cookie``, Content-Length) are
+merged or recomputed here. Compression is skipped for responses that are
+already encoded, that carry ``Cache-Control: no-transform``, or that are
+partial (Content-Range). API bodies never echo secrets such as CSRF tokens
+next to user input, which is what BREACH-style attacks need.
+"""
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+STREAM_FLUSH_BYTES = 32 * 1024
+
+
+class _Gzip:
+    def __init__(self, level):
+        # wbits=31: gzip container with a zero mtime, so equal bodies compress to equal bytes.
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._zlib.compress(data)
+
+    def flush(self):
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._zlib.flush()
+
+
+class _Brotli:
+    def __init__(self, level):
+        self._brotli = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+
+    def compress(self, data):
+        return self._brotli.process(data)
+
+    def flush(self):
+        return self._brotli.flush()
+
+    def finish(self):
+        return self._brotli.finish()
+
+
+def compress(encoding, level, content):
+    """Compress a whole body with 'gzip' or 'br'."""
+    compressor = (_Brotli if encoding == 'br' else _Gzip)(level)
+    return compressor.compress(content) + compressor.finish()
+
+
+def compress_stream(encoding, level, chunks):
+    """Compress an iterable of byte chunks, yielding output every STREAM_FLUSH_BYTES of input."""
+    compressor = (_Brotli if encoding == 'br' else _Gzip)(level)
+    pending = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= STREAM_FLUSH_BYTES:
+            data += compressor.flush()
+            pending = 0
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(encoding, level, chunks):
+    """compress_stream for the async iterators of StreamingHttpResponse under ASGI."""
+    compressor = (_Brotli if encoding == 'br' else _Gzip)(level)
+    pending = 0
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        if pending >= STREAM_FLUSH_BYTES:
+            data += compressor.flush()
+            pending = 0
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def negotiate_encoding(accept_encoding, available):
+    """The encoding from ``available`` (in preference order) with the highest q-value, or None."""
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """gzip/brotli for allowlisted content types; see the module docstring for placement. Sync and async capable."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.COMPRESSION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.content_types = {content_type.strip().lower() for content_type in settings.COMPRESSION_CONTENT_TYPES}
+        self.min_bytes = settings.COMPRESSION_MIN_BYTES
+        self.levels = {'gzip': settings.COMPRESSION_GZIP_LEVEL}
+        if brotli is not None and settings.COMPRESSION_BROTLI:
+            self.levels = {'br': settings.COMPRESSION_BROTLI_LEVEL, **self.levels}
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._compress(request, await self.get_response(request))
+
+    def _compress(self, request, response):
+        if not self._compressible(response):
+            return response
+        # Set before looking at the request: caches must key this URL on Accept-Encoding either way.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.levels)
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(encoding, level, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoding, level, response.streaming_content)
+            # The compressed length is unknown until the stream ends.
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(encoding, level, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag promises byte-identical bodies; the compressed variant is only equivalent.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compressible(self, response):
+        if response.has_header('Content-Encoding') or response.has_header('Content-Range'):
+            return False
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type not in self.content_types:
+            return False
+        return response.streaming or len(response.content) >= self.min_bytes
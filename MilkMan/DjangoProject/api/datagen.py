@@ -0,0 +1,374 @@
+"""
+Synthetic data for load testing.
+
+``generate()`` builds one admin's worth of realistic data: customers spread
+over Indian cities, subscription plans, baskets with daily / alternate /
+weekly items, ``days`` of deliveries with items, one-off orders and both
+kinds of payments. Volume is driven by ``scale``: each unit is 1,000
+customers, which is roughly 380k rows with the default year of history.
+
+Everything is written with batched ``bulk_create`` and every account shares
+one password hash. Customers are generated in fixed chunks, each with its
+own ``random.Random(f"{seed}:{tag}:{chunk}")``, so a seed and tag always
+produce the same data whether the chunks run in one process or in a pool of
+workers (only the primary keys interleave differently). The tag is part of
+the seed because payment references are unique across data sets.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from time import perf_counter
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .deliveries import subscription_items_for_date
+from .models import (
+    Admin, Category, Customer, Order, OrderItem, OrderPayment, PaymentTransaction, Product, Subscription,
+    SubscriptionBasketItem, SubscriptionDelivery, SubscriptionDeliveryItem,
+)
+from .pricing import CENTS, ORDER_TAX_RATE
+from .rollups import rebuild_customer_stats, rebuild_delivery_summary, rebuild_sales_rollups
+
+CUSTOMERS_PER_SCALE = 1000
+CUSTOMERS_PER_CHUNK = 100
+
+CITIES = [
+    ('Mumbai', 'Maharashtra', '400001'), ('Pune', 'Maharashtra', '411001'), ('Delhi', 'Delhi', '110001'),
+    ('Bengaluru', 'Karnataka', '560001'), ('Chennai', 'Tamil Nadu', '600001'), ('Hyderabad', 'Telangana', '500001'),
+    ('Kolkata', 'West Bengal', '700001'), ('Ahmedabad', 'Gujarat', '380001'), ('Jaipur', 'Rajasthan', '302001'),
+    ('Lucknow', 'Uttar Pradesh', '226001'), ('Kochi', 'Kerala', '682001'), ('Indore', 'Madhya Pradesh', '452001'),
+]
+STREETS = ['MG Road', 'Station Road', 'Park Street', 'Lake View', 'Temple Street', 'Nehru Nagar']
+FIRST_NAMES = [
+    'Aarav', 'Vivaan', 'Aditya', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan', 'Rohan', 'Kabir',
+    'Ananya', 'Diya', 'Isha', 'Kavya', 'Meera', 'Priya', 'Riya', 'Saanvi', 'Tara', 'Neha',
+]
+LAST_NAMES = [
+    'Sharma', 'Verma', 'Patel', 'Reddy', 'Iyer', 'Nair', 'Gupta', 'Mehta', 'Joshi', 'Kulkarni',
+    'Das', 'Singh', 'Rao', 'Menon', 'Chopra', 'Bose',
+]
+CATALOG = {
+    'Milk': ['Toned Milk 500ml', 'Full Cream Milk 1L', 'Double Toned Milk 500ml', 'A2 Cow Milk 1L', 'Buffalo Milk 1L'],
+    'Curd & Yogurt': ['Fresh Curd 400g', 'Greek Yogurt 100g', 'Mishti Doi 200g', 'Sweet Lassi 200ml'],
+    'Butter & Ghee': ['Table Butter 100g', 'Cow Ghee 500ml', 'White Butter 200g'],
+    'Paneer & Cheese': ['Malai Paneer 200g', 'Cheese Slices 200g', 'Mozzarella 200g'],
+    'Bakery': ['Brown Bread', 'Multigrain Bread', 'Pav 6pc'],
+    'Eggs': ['Farm Eggs 6pc', 'Brown Eggs 12pc'],
+}
+PLANS = [
+    # name, price, billing_cycle, duration_days, max_products, share of subscribers
+    ('Daily Essentials', Decimal('499.00'), 'monthly', 30, 3, 45),
+    ('Family Pack', Decimal('899.00'), 'monthly', 30, 6, 30),
+    ('Premium Dairy', Decimal('2499.00'), 'quarterly', 90, 10, 15),
+    ('Weekend Saver', Decimal('299.00'), 'monthly', 30, 2, 10),
+]
+BASKET_FREQUENCIES = ['daily', 'daily', 'alternate', 'weekly']
+PAYMENT_METHODS = ['card', 'card', 'upi', 'upi', 'netbanking']
+ORDER_PAYMENT_METHODS = ['card', 'upi', 'upi', 'netbanking', 'cod']
+FAILURE_REASONS = ['Card declined', 'Insufficient funds', 'Bank timeout']
+SUBSCRIBED_SHARE = 0.85
+
+TABLES = [
+    'customer', 'subscription_basket_item', 'payment_transaction', 'subscription_delivery',
+    'subscription_delivery_item', 'order', 'order_item', 'order_payment',
+]
+
+
+def _money(value):
+    return value.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk_create keep the created_at / updated_at set on each row instead of overwriting them with now()."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def create_dimensions(tag, password_hash, seed=0, admin_role='super_admin'):
+    """The admin, categories, plans and products shared by every customer chunk."""
+    rng = random.Random(f"{seed}:{tag}:dimensions")
+    with transaction.atomic():
+        admin = Admin.objects.create(
+            first_name='Load', last_name='Test', email=f'{tag}-admin@example.com', phone='+919800000000',
+            username=tag, password=password_hash, role=admin_role,
+        )
+        plans = Subscription.objects.bulk_create([
+            Subscription(
+                name=f'{name} ({tag})', description=f'{name} plan', price=price, billing_cycle=cycle,
+                duration_days=duration, max_products=max_products, features=['Morning delivery'],
+                owner_admin=admin,
+            )
+            for name, price, cycle, duration, max_products, _ in PLANS
+        ])
+        products = []
+        for category_name, names in CATALOG.items():
+            category = Category.objects.create(
+                name=f'{category_name} ({tag})', description=f'{category_name} products', owner_admin=admin,
+            )
+            for index, name in enumerate(names):
+                price = Decimal(rng.randint(25, 600))
+                products.append(Product(
+                    name=name, description=f'{name} from local farms', category=category, price=price,
+                    cost=_money(price * Decimal('0.7')), quantity_in_stock=rng.randint(5000, 50000),
+                    sku=f'{tag}-{category.category_id}-{index}', status='active', is_featured=rng.random() < 0.2,
+                    subscription_only=category_name == 'Milk' and index % 2 == 0,
+                    rating=round(rng.uniform(3.5, 5.0), 1), tags=[category_name.lower()], created_by=admin,
+                ))
+        products = Product.objects.bulk_create(products)
+    # Plain values so the dimensions can be pickled to worker processes.
+    return {
+        'tag': tag,
+        'admin_id': admin.admin_id,
+        'plans': [
+            {'id': plan.subscription_id, 'price': plan.price, 'duration_days': plan.duration_days,
+             'max_products': plan.max_products, 'weight': spec[-1]}
+            for plan, spec in zip(plans, PLANS)
+        ],
+        'products': [
+            {'id': product.product_id, 'name': product.name, 'price': product.price,
+             'subscription_only': product.subscription_only}
+            for product in products
+        ],
+    }
+
+
+def generate_chunk(dimensions, chunk, first_index, count, days, password_hash, seed=0, batch_size=1000):
+    """Create ``count`` customers with their baskets, deliveries, orders and payments; returns {table: rows}."""
+    tag = dimensions['tag']
+    rng = random.Random(f"{seed}:{tag}:{chunk}")
+    today = timezone.localdate()
+    tzinfo = timezone.get_current_timezone()
+    plans = dimensions['plans']
+    products = dimensions['products']
+    product_names = {product['id']: product['name'] for product in products}
+    orderable = [product for product in products if not product['subscription_only']]
+
+    def moment(day, first_hour=6, last_hour=21):
+        return datetime.combine(day, time(rng.randint(first_hour, last_hour), rng.randint(0, 59)), tzinfo)
+
+    customers = []
+    for index in range(first_index, first_index + count):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city, state, postal_code = rng.choice(CITIES)
+        joined_at = moment(today - timedelta(days=rng.randint(0, days)))
+        customers.append(Customer(
+            first_name=first_name, last_name=last_name,
+            email=f'{first_name}.{last_name}.{index}@{tag}.example.com'.lower(),
+            phone=f'+9198{rng.randint(10000000, 99999999)}', password=password_hash,
+            address=f'{rng.randint(1, 400)}, {rng.choice(STREETS)}', city=city, state=state,
+            postal_code=postal_code, country='India',
+            status=rng.choices(['active', 'inactive', 'suspended'], weights=[90, 6, 4])[0],
+            is_verified=rng.random() < 0.7, owner_admin_id=dimensions['admin_id'],
+            created_at=joined_at, updated_at=joined_at,
+        ))
+
+    basket_items, payments, deliveries, orders = [], [], [], []
+    with transaction.atomic(), _explicit_timestamps(
+        Customer, SubscriptionBasketItem, SubscriptionDelivery, SubscriptionDeliveryItem,
+        PaymentTransaction, Order, OrderPayment,
+    ):
+        customers = Customer.objects.bulk_create(customers, batch_size=batch_size)
+        subscribed = []
+        for customer in customers:
+            joined = customer.created_at.date()
+            tenure = (today - joined).days
+            if rng.random() < SUBSCRIBED_SHARE:
+                plan = rng.choices(plans, weights=[plan['weight'] for plan in plans])[0]
+                duration = plan['duration_days']
+                # Renewed every period since joining; the current period runs past today.
+                periods = tenure // duration + 1
+                customer.subscription_id = plan['id']
+                customer.subscription_start_date = customer.created_at + timedelta(days=(periods - 1) * duration)
+                customer.subscription_end_date = customer.subscription_start_date + timedelta(days=duration)
+                subscribed.append(customer)
+                for period in range(periods):
+                    paid_at = customer.created_at + timedelta(days=period * duration)
+                    if rng.random() < 0.05:
+                        payments.append(_subscription_payment(rng, customer, plan, paid_at, 'failed'))
+                        paid_at += timedelta(minutes=rng.randint(2, 30))
+                    payments.append(_subscription_payment(rng, customer, plan, paid_at, 'success'))
+
+                basket = [
+                    SubscriptionBasketItem(
+                        customer=customer, product_id=product['id'], quantity=rng.randint(1, 3),
+                        frequency=rng.choice(BASKET_FREQUENCIES),
+                        created_at=customer.created_at, updated_at=customer.created_at,
+                    )
+                    for product in rng.sample(products, rng.randint(1, min(plan['max_products'], 4)))
+                ]
+                basket_items.extend(basket)
+                # Like the live rebuild, the current period is scheduled through to its end date.
+                for offset in range((customer.subscription_end_date.date() - joined).days + 1):
+                    day = joined + timedelta(days=offset)
+                    # Frequencies count from the start of the period the day falls in, as the live rebuild does.
+                    period_start = joined + timedelta(days=min(offset // duration, periods - 1) * duration)
+                    day_items = subscription_items_for_date(basket, period_start, day)
+                    if not day_items:
+                        continue
+                    if day >= today:
+                        status, delivered_at = 'scheduled', None
+                    else:
+                        status = rng.choices(['delivered', 'missed', 'skipped'], weights=[93, 4, 3])[0]
+                        delivered_at = moment(day, 5, 8) if status == 'delivered' else None
+                    created_at = max(customer.created_at, moment(period_start))
+                    search_text = SubscriptionDelivery.build_search_text(
+                        customer.first_name, customer.last_name, [product_names[item.product_id] for item in day_items],
+                    )
+                    deliveries.append((SubscriptionDelivery(
+                        customer=customer, subscription_id=plan['id'], scheduled_for=day, status=status,
+                        delivered_at=delivered_at, search_text=search_text,
+                        created_at=created_at, updated_at=delivered_at or created_at,
+                    ), day_items))
+
+            for _ in range(rng.randint(0, max(1, tenure // 15))):
+                ordered_on = joined + timedelta(days=rng.randint(0, tenure))
+                lines = [(product, rng.randint(1, 3)) for product in rng.sample(orderable, rng.randint(1, 4))]
+                orders.append((customer, max(customer.created_at, moment(ordered_on)), lines))
+
+        Customer.objects.bulk_update(
+            subscribed, ['subscription', 'subscription_start_date', 'subscription_end_date'], batch_size=batch_size,
+        )
+        SubscriptionBasketItem.objects.bulk_create(basket_items, batch_size=batch_size)
+        PaymentTransaction.objects.bulk_create(payments, batch_size=batch_size)
+        SubscriptionDelivery.objects.bulk_create([delivery for delivery, _ in deliveries], batch_size=batch_size)
+        delivery_items = SubscriptionDeliveryItem.objects.bulk_create([
+            SubscriptionDeliveryItem(
+                delivery=delivery, product_id=item.product_id, product_name=product_names[item.product_id],
+                quantity=item.quantity, created_at=delivery.created_at,
+            )
+            for delivery, day_items in deliveries for item in day_items
+        ], batch_size=batch_size)
+        order_rows, order_items, order_payments = _create_orders(rng, orders, batch_size)
+
+    return {
+        'customer': len(customers),
+        'subscription_basket_item': len(basket_items),
+        'payment_transaction': len(payments),
+        'subscription_delivery': len(deliveries),
+        'subscription_delivery_item': len(delivery_items),
+        'order': order_rows,
+        'order_item': order_items,
+        'order_payment': order_payments,
+    }
+
+
+def _subscription_payment(rng, customer, plan, paid_at, status):
+    return PaymentTransaction(
+        customer=customer, subscription_id=plan['id'], amount=plan['price'], status=status,
+        payment_method=rng.choice(PAYMENT_METHODS),
+        # save() is bypassed by bulk_create, so the unique reference has to be set here.
+        transaction_reference=f"TXN-{rng.getrandbits(48):012X}",
+        paid_at=paid_at if status == 'success' else None,
+        failure_reason=rng.choice(FAILURE_REASONS) if status == 'failed' else None,
+        created_at=paid_at,
+    )
+
+
+def _create_orders(rng, orders, batch_size):
+    """Bulk-create orders, then their items and payments; returns the three row counts."""
+    order_rows, lines_by_order = [], []
+    for customer, created_at, lines in orders:
+        subtotal = _money(sum((product['price'] * quantity for product, quantity in lines), Decimal('0')))
+        tax = _money(subtotal * ORDER_TAX_RATE)
+        order_rows.append(Order(
+            customer=customer, subtotal=subtotal, tax_amount=tax, total_amount=subtotal + tax,
+            status=rng.choices(['paid', 'failed', 'pending'], weights=[92, 5, 3])[0],
+            created_at=created_at, updated_at=created_at,
+        ))
+        lines_by_order.append(lines)
+    Order.objects.bulk_create(order_rows, batch_size=batch_size)
+
+    items, payments = [], []
+    for order, lines in zip(order_rows, lines_by_order):
+        for product, quantity in lines:
+            items.append(OrderItem(
+                order=order, product_id=product['id'], quantity=quantity, unit_price=product['price'],
+                line_total=_money(product['price'] * quantity),
+            ))
+        status = {'paid': 'success', 'failed': 'failed'}.get(order.status, 'pending')
+        payments.append(OrderPayment(
+            order=order, amount=order.total_amount, status=status, payment_method=rng.choice(ORDER_PAYMENT_METHODS),
+            transaction_reference=f"ORDPAY-{rng.getrandbits(48):012X}",
+            paid_at=order.created_at if status == 'success' else None,
+            failure_reason=rng.choice(FAILURE_REASONS) if status == 'failed' else None,
+            created_at=order.created_at,
+        ))
+    OrderItem.objects.bulk_create(items, batch_size=batch_size)
+    OrderPayment.objects.bulk_create(payments, batch_size=batch_size)
+    return len(order_rows), len(items), len(payments)
+
+
+def _init_worker():
+    import django
+    django.setup()
+    # Forked workers must not reuse the parent's database sockets.
+    connections.close_all()
+
+
+def _run_chunk(args):
+    try:
+        return generate_chunk(*args)
+    finally:
+        connections.close_all()
+
+
+def generate(scale=1.0, seed=0, days=365, batch_size=1000, workers=1, tag=None, password_hash='!',
+             admin_role='super_admin', rebuild_rollups=True, progress=None):
+    """
+    Generate ``scale`` * 1,000 customers with ``days`` of history under a new admin.
+
+    Returns ``{'tag', 'admin_id', 'rows': {table: count}, 'seconds'}``. ``progress``
+    is called with each finished chunk's row counts.
+    """
+    started = perf_counter()
+    tag = tag or f'loadtest-{seed}'
+    dimensions = create_dimensions(tag, password_hash, seed=seed, admin_role=admin_role)
+    rows = {
+        'admin': 1, 'category': len(CATALOG), 'subscription': len(PLANS), 'product': len(dimensions['products']),
+        **{table: 0 for table in TABLES},
+    }
+
+    total = max(1, round(scale * CUSTOMERS_PER_SCALE))
+    chunks = [
+        (dimensions, chunk, first, min(CUSTOMERS_PER_CHUNK, total - first), days, password_hash, seed, batch_size)
+        for chunk, first in enumerate(range(0, total, CUSTOMERS_PER_CHUNK))
+    ]
+
+    def collect(chunk_rows):
+        for table, count in chunk_rows.items():
+            rows[table] += count
+        if progress:
+            progress(chunk_rows)
+
+    if workers > 1:
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for chunk_rows in pool.map(_run_chunk, chunks):
+                collect(chunk_rows)
+    else:
+        for chunk in chunks:
+            collect(generate_chunk(*chunk))
+
+    if rebuild_rollups:
+        today = timezone.localdate()
+        longest_period = max(plan['duration_days'] for plan in dimensions['plans'])
+        rebuild_delivery_summary(today - timedelta(days=days), today + timedelta(days=longest_period))
+        rebuild_sales_rollups(today - timedelta(days=days), today)
+        rebuild_customer_stats(
+            Customer.objects.filter(owner_admin_id=dimensions['admin_id']).values('customer_id')
+        )
+    return {'tag': tag, 'admin_id': dimensions['admin_id'], 'rows': rows, 'seconds': perf_counter() - started}
@@ -0,0 +1,119 @@
+"""
+Subscription delivery scheduling.
+
+``rebuild_future_subscription_deliveries`` rewrites a customer's scheduled
+deliveries from today (or ``start_date``) to the end of the plan period
+from their active basket. It is shared by the basket and subscription
+views and by the payment workers that activate a plan, so it lives outside
+api/views.py.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .metrics import observe_delivery_rebuild
+from .models import SubscriptionBasketItem, SubscriptionDelivery, SubscriptionDeliveryItem
+from .rollups import apply_delivery_summary_delta, diff_summaries, summarize_deliveries
+
+
+def subscription_items_for_date(basket_items, subscription_start_date, target_date):
+    day_items = []
+    for basket_item in basket_items:
+        if basket_item.frequency == 'daily':
+            include = True
+        elif basket_item.frequency == 'alternate':
+            include = ((target_date - subscription_start_date).days % 2) == 0
+        else:
+            include = ((target_date - subscription_start_date).days % 7) == 0
+        if include:
+            day_items.append(basket_item)
+    return day_items
+
+
+def rebuild_future_subscription_deliveries(customer, start_date=None):
+    if not customer or not customer.subscription or not customer.subscription_start_date or not customer.subscription_end_date:
+        return
+
+    # Only rebuild for active subscription period.
+    today = timezone.localdate()
+    period_start = customer.subscription_start_date.date()
+    period_end = customer.subscription_end_date.date()
+    rebuild_start = max(period_start, today)
+    if start_date:
+        try:
+            rebuild_start = max(rebuild_start, start_date)
+        except Exception:
+            pass
+
+    if rebuild_start > period_end:
+        return
+
+    scheduled_deliveries = SubscriptionDelivery.objects.filter(
+        customer=customer,
+        scheduled_for__gte=rebuild_start,
+        scheduled_for__lte=period_end,
+        status='scheduled',
+    )
+
+    with observe_delivery_rebuild(), transaction.atomic():
+        before = summarize_deliveries(scheduled_deliveries)
+        _materialize_subscription_deliveries(customer, scheduled_deliveries, period_start, rebuild_start, period_end)
+        apply_delivery_summary_delta(diff_summaries(summarize_deliveries(scheduled_deliveries), before))
+
+
+def _materialize_subscription_deliveries(customer, scheduled_deliveries, period_start, rebuild_start, period_end):
+    basket_items = list(
+        SubscriptionBasketItem.objects.filter(customer=customer, is_active=True)
+        .select_related('product')
+        .order_by('product__name')
+    )
+
+    # If basket is empty, clear future scheduled deliveries.
+    scheduled_deliveries.delete()
+
+    if not basket_items:
+        return
+
+    deliveries_to_create = []
+    items_to_create = []
+
+    current = rebuild_start
+    while current <= period_end:
+        todays = subscription_items_for_date(basket_items, period_start, current)
+        if todays:
+            delivery = SubscriptionDelivery(
+                customer=customer,
+                subscription=customer.subscription,
+                scheduled_for=current,
+                status='scheduled',
+                search_text=SubscriptionDelivery.build_search_text(
+                    customer.first_name, customer.last_name, [item.product.name for item in todays]
+                ),
+            )
+            deliveries_to_create.append(delivery)
+        current = current + timedelta(days=1)
+
+    if not deliveries_to_create:
+        return
+
+    # Bulk create deliveries, then attach items.
+    SubscriptionDelivery.objects.bulk_create(deliveries_to_create, ignore_conflicts=True)
+    created_deliveries = {d.scheduled_for: d for d in scheduled_deliveries}
+
+    current = rebuild_start
+    while current <= period_end:
+        delivery = created_deliveries.get(current)
+        if delivery:
+            todays = subscription_items_for_date(basket_items, period_start, current)
+            for basket_item in todays:
+                items_to_create.append(SubscriptionDeliveryItem(
+                    delivery=delivery,
+                    product=basket_item.product,
+                    product_name=basket_item.product.name,
+                    quantity=basket_item.quantity,
+                ))
+        current = current + timedelta(days=1)
+
+    if items_to_create:
+        SubscriptionDeliveryItem.objects.bulk_create(items_to_create, ignore_conflicts=True)
@@ -0,0 +1,78 @@
+"""
+HTTP cache headers, so a CDN or reverse proxy can serve the public catalog.
+
+``CachePolicyMiddleware`` sets Cache-Control by route name and session:
+
+* Anonymous GET/HEAD 200s of a route in HTTP_CACHE_POLICIES get
+  ``public, max-age=N, stale-while-revalidate=M``. These catalog lists are
+  scoped to the admin's own rows when an admin is logged in, so the
+  response also varies on Cookie. Storefront clients without a session
+  cookie share one cached copy; a proxy sends everyone else to the origin.
+* Requests with an admin or customer session get ``private, no-store``:
+  their responses are scoped or personal and must not be kept by a shared
+  cache or on disk.
+* Anything else, or a response that sets a cookie or already has
+  Cache-Control, is left alone.
+
+Place it just before SessionMiddleware so it sees the session's Set-Cookie
+and Vary headers. Vary: Accept (DRF), Origin (CORS) and Accept-Encoding
+(compression) are added by the other middleware. HTTP caches cannot be
+purged the way the catalog version in api/caching.py is bumped, so
+max-age bounds how stale a proxy's copy can get.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+SAFE_METHODS = {'GET', 'HEAD'}
+
+
+def _has_auth_session(request):
+    session = getattr(request, 'session', None)
+    return session is not None and session.get('auth_role') in ('admin', 'user')
+
+
+class CachePolicyMiddleware:
+    """Public caching for catalog routes, ``private, no-store`` for signed-in sessions. Sync and async capable."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.HTTP_CACHE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        return self._apply(request, response, _has_auth_session(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key is None:
+            signed_in = False
+        else:
+            # The view may not have loaded the session; that is a database read.
+            signed_in = await sync_to_async(_has_auth_session)(request)
+        return self._apply(request, response, signed_in)
+
+    def _apply(self, request, response, signed_in):
+        if response.has_header('Cache-Control'):
+            return response
+        if signed_in:
+            patch_cache_control(response, private=True, no_store=True)
+            return response
+        match = request.resolver_match
+        policy = settings.HTTP_CACHE_POLICIES.get(match.view_name) if match else None
+        if policy is None or request.method not in SAFE_METHODS or response.status_code != 200 or response.cookies:
+            return response
+        max_age, stale_while_revalidate = policy
+        patch_cache_control(response, public=True, max_age=max_age, stale_while_revalidate=stale_while_revalidate)
+        patch_vary_headers(response, ('Cookie',))
+        return response
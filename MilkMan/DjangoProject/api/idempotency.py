@@ -0,0 +1,154 @@
+"""
+Idempotency-Key support for POST endpoints that charge money or create orders.
+
+A client that retries a POST with the same ``Idempotency-Key`` header gets
+the stored response of the first attempt instead of running the view again.
+The first request claims the key with an INSERT guarded by a unique index,
+so a concurrent duplicate cannot run the view; it polls until the first
+request has stored its response and then replays it. A key still
+``processing`` after IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS belongs to a
+worker that died mid-request; the next retry releases and claims it.
+Errors release the key too, unless the view has called
+``mark_writes_committed``: then the error is stored and replayed, since
+running the view again would write a second order or payment.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+POLL_INTERVAL_SECONDS = 0.1
+
+
+def _request_actor(request):
+    session_obj = getattr(request, "session", None)
+    if session_obj and session_obj.get("auth_role") and session_obj.get("auth_user_id"):
+        return f"{session_obj.get('auth_role')}:{session_obj.get('auth_user_id')}"
+    customer_id = request.query_params.get("customer_id") or request.data.get("customer_id")
+    return f"customer:{customer_id or '-'}"
+
+
+def _request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def _replay(record):
+    response = Response(record.response_body, status=record.response_status)
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+def _claim(scope, key, fingerprint):
+    """Insert a processing record; returns None if another request already holds the key."""
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                scope=scope,
+                key=key,
+                request_fingerprint=fingerprint,
+                expires_at=timezone.now() + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+    except IntegrityError:
+        return None
+
+
+def idempotent(scope_name):
+    """Decorator for function views (below ``@api_view``) that honours the Idempotency-Key header."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key = (request.headers.get(IDEMPOTENCY_HEADER) or '').strip()
+            if not key:
+                return view_func(request, *args, **kwargs)
+            if len(key) > 255:
+                return Response({"error": f"{IDEMPOTENCY_HEADER} must be at most 255 characters"}, status=status.HTTP_400_BAD_REQUEST)
+
+            scope = f"{scope_name}:{_request_actor(request)}"
+            fingerprint = _request_fingerprint(request)
+            deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+
+            while True:
+                claimed = _claim(scope, key, fingerprint)
+                if claimed:
+                    return _run_and_store(claimed, view_func, request, *args, **kwargs)
+
+                record = IdempotencyKey.objects.filter(scope=scope, key=key).first()
+                if record is None:
+                    continue
+                if record.expires_at <= timezone.now():
+                    IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=timezone.now()).delete()
+                    continue
+                abandoned_before = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS)
+                if record.status == 'processing' and record.created_at <= abandoned_before:
+                    IdempotencyKey.objects.filter(pk=record.pk, status='processing').delete()
+                    continue
+                if record.request_fingerprint != fingerprint:
+                    return Response(
+                        {"error": f"{IDEMPOTENCY_HEADER} was already used for a different request"},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                if record.status == 'completed':
+                    return _replay(record)
+                if time.monotonic() >= deadline:
+                    return Response(
+                        {"error": "A request with this Idempotency-Key is still being processed"},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                time.sleep(POLL_INTERVAL_SECONDS)
+        return wrapper
+    return decorator
+
+
+def mark_writes_committed(request):
+    """
+    Record that the view has committed writes a retry must not repeat (an
+    order, a pending payment). From then on an exception or 5xx keeps the key
+    and stores the error, so a retry replays it instead of running the view again.
+    """
+    request._idempotency_writes_committed = True
+
+
+def _run_and_store(record, view_func, request, *args, **kwargs):
+    try:
+        response = view_func(request, *args, **kwargs)
+    except Exception:
+        if not getattr(request, '_idempotency_writes_committed', False):
+            record.delete()
+            raise
+        _store(
+            record,
+            {"error": "The request failed after it was recorded; check its status instead of retrying"},
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+        raise
+
+    if response.status_code >= 500 and not getattr(request, '_idempotency_writes_committed', False):
+        # Server errors before anything was written are not a final outcome; release the key so the client can retry.
+        record.delete()
+        return response
+
+    _store(record, response.data, response.status_code)
+    return response
+
+
+def _store(record, data, status_code):
+    # Store the rendered JSON so replays are byte-for-byte what the first caller saw.
+    # A plain UPDATE: if this request outlived the processing timeout, a retry may already own the key.
+    IdempotencyKey.objects.filter(pk=record.pk).update(
+        response_body=json.loads(JSONRenderer().render(data) or b'null'),
+        response_status=status_code,
+        status='completed',
+    )
@@ -0,0 +1,207 @@
+"""
+Per-request query instrumentation.
+
+``QueryInstrumentationMiddleware`` counts the SQL statements each request
+runs and splits its wall time into view, serialization (DRF rendering) and
+database time. Every request gets a ``Server-Timing`` header and a JSON log
+line on the ``api.instrumentation`` logger; statements slower than
+``QUERY_SLOW_MS`` are logged with their SQL and the view that ran them.
+Per-endpoint totals are kept in process memory and served by
+``/api/admin/query-stats/``.
+
+When ``QUERY_INSTRUMENTATION`` is off the middleware removes itself at
+startup (MiddlewareNotUsed), so it costs nothing.
+"""
+import json
+import logging
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_endpoint_stats = {}
+_endpoint_stats_lock = threading.Lock()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = perf_counter()
+        self.view_name = None
+        self.view_started = None
+        self.view_finished = None
+        self.render_finished = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        # Async views run a request's queries on several threads at once.
+        self.lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - started
+            with self.lock:
+                self.queries += 1
+                self.db_seconds += duration
+            if duration * 1000 >= settings.QUERY_SLOW_MS:
+                logger.warning(json.dumps({
+                    "event": "slow_query",
+                    "view": self.view_name,
+                    "alias": context['connection'].alias,
+                    "duration_ms": round(duration * 1000, 2),
+                    "sql": sql,
+                }))
+
+    def timings_ms(self, finished):
+        view_finished = self.view_finished or finished
+        return {
+            "queries": self.queries,
+            "db_ms": self.db_seconds * 1000,
+            "view_ms": (view_finished - self.view_started) * 1000 if self.view_started else 0.0,
+            "serialize_ms": (self.render_finished - view_finished) * 1000 if self.render_finished else 0.0,
+            "total_ms": (finished - self.started) * 1000,
+        }
+
+
+# The current request's metrics; a ContextVar follows the request into sync_to_async threads.
+_request_metrics = ContextVar('instrumentation_request_metrics', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def _install_query_recorder(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class QueryInstrumentationMiddleware:
+    """Place near the top of MIDDLEWARE so session and auth queries are counted too. Sync and async capable."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_recorder, dispatch_uid='api.instrumentation.query_recorder')
+        for connection in connections.all(initialized_only=True):
+            _install_query_recorder(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request._query_metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = request._query_metrics = RequestMetrics()
+        token = _request_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self._finish(request, response, metrics)
+
+    def _finish(self, request, response, metrics):
+        timings = metrics.timings_ms(perf_counter())
+
+        server_timing = (
+            f'db;desc="{timings["queries"]} queries";dur={timings["db_ms"]:.1f}, '
+            f'view;dur={timings["view_ms"]:.1f}, '
+            f'serialize;dur={timings["serialize_ms"]:.1f}, '
+            f'total;dur={timings["total_ms"]:.1f}'
+        )
+        # Views may set their own Server-Timing entries (user_dashboard_data); keep them.
+        existing = response.get('Server-Timing')
+        response['Server-Timing'] = f"{existing}, {server_timing}" if existing else server_timing
+
+        endpoint = f"{request.method} {metrics.view_name or 'unresolved'}"
+        _record_endpoint(endpoint, timings, response.status_code)
+        logger.info(json.dumps({
+            "event": "request",
+            "endpoint": endpoint,
+            "path": request.path,
+            "status": response.status_code,
+            **{key: round(value, 2) for key, value in timings.items()},
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = request._query_metrics
+        match = request.resolver_match
+        metrics.view_name = match.view_name if match else view_func.__name__
+        metrics.view_started = perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF Responses are rendered after this hook; the render callback marks the end of serialization.
+        metrics = request._query_metrics
+        metrics.view_finished = perf_counter()
+        response.add_post_render_callback(lambda rendered: setattr(metrics, 'render_finished', perf_counter()))
+        return response
+
+
+def _record_endpoint(endpoint, timings, status_code):
+    with _endpoint_stats_lock:
+        stats = _endpoint_stats.get(endpoint)
+        if stats is None:
+            stats = _endpoint_stats[endpoint] = {
+                "requests": 0, "errors": 0, "queries": 0, "max_queries": 0,
+                "db_ms": 0.0, "view_ms": 0.0, "serialize_ms": 0.0, "total_ms": 0.0, "max_total_ms": 0.0,
+            }
+        stats["requests"] += 1
+        stats["errors"] += status_code >= 500
+        stats["queries"] += timings["queries"]
+        stats["max_queries"] = max(stats["max_queries"], timings["queries"])
+        for key in ("db_ms", "view_ms", "serialize_ms", "total_ms"):
+            stats[key] += timings[key]
+        stats["max_total_ms"] = max(stats["max_total_ms"], timings["total_ms"])
+
+
+def endpoint_stats():
+    """Per-endpoint averages for this process, slowest total time first."""
+    with _endpoint_stats_lock:
+        snapshot = {endpoint: dict(stats) for endpoint, stats in _endpoint_stats.items()}
+    rows = []
+    for endpoint, stats in snapshot.items():
+        count = stats["requests"]
+        rows.append({
+            "endpoint": endpoint,
+            "requests": count,
+            "errors": stats["errors"],
+            "avg_queries": round(stats["queries"] / count, 2),
+            "max_queries": stats["max_queries"],
+            "avg_db_ms": round(stats["db_ms"] / count, 2),
+            "avg_view_ms": round(stats["view_ms"] / count, 2),
+            "avg_serialize_ms": round(stats["serialize_ms"] / count, 2),
+            "avg_total_ms": round(stats["total_ms"] / count, 2),
+            "max_total_ms": round(stats["max_total_ms"], 2),
+            "total_ms": round(stats["total_ms"], 2),
+        })
+    rows.sort(key=lambda row: row["total_ms"], reverse=True)
+    return rows
+
+
+def reset_endpoint_stats():
+    with _endpoint_stats_lock:
+        _endpoint_stats.clear()
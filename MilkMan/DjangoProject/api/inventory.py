@@ -0,0 +1,147 @@
+"""
+Stock reservation for checkout.
+
+Stock is taken with single-statement conditional decrements
+(``UPDATE ... SET qty = qty - n WHERE qty >= n``) in autocommit, so a row
+lock is held only for one statement and never for the whole checkout.
+Hot products can additionally be split into ``ProductStockShard`` slots:
+each reservation starts at a random slot, spreading concurrent checkouts
+of the same SKU over N rows instead of one. A line larger than one slot
+is taken from several slots (and the product row), one reservation each. Available stock is always
+``Product.quantity_in_stock`` plus the sum of the product's slots.
+"""
+import random
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Product, ProductStockShard, StockReservation
+
+
+class InsufficientStock(Exception):
+    """Raised when the product row and all of its shards together cannot cover a cart line."""
+
+    def __init__(self, product):
+        super().__init__(f"Insufficient stock for product {product.product_id}")
+        self.product = product
+
+
+def _take_from(rows, field, wanted):
+    """Conditionally decrement up to ``wanted`` from one stock row; returns the amount taken."""
+    while wanted > 0:
+        if rows.filter(**{f'{field}__gte': wanted}).update(**{field: F(field) - wanted}):
+            return wanted
+        # Not enough for the whole amount: take what the row holds now (0 stops).
+        wanted = min(wanted, rows.values_list(field, flat=True).first() or 0)
+    return 0
+
+
+def _take(product, quantity):
+    """
+    Decrement ``quantity`` across the product's stock sources.
+
+    Shards are tried from a random slot, then the product row. Each source gives
+    what it holds, up to what is still needed. Returns [(taken, shard), ...], with
+    shard None for the product row. On shortage the partial takes are put back
+    and an empty list is returned.
+    """
+    taken = []
+    remaining = quantity
+    shard_count = product.stock_shard_count
+    first = random.randrange(shard_count) if shard_count else 0
+    sources = [(first + offset) % shard_count for offset in range(shard_count)] + [None]
+    for shard in sources:
+        if shard is None:
+            rows, field = Product.objects.filter(product_id=product.product_id), 'quantity_in_stock'
+        else:
+            rows, field = ProductStockShard.objects.filter(product_id=product.product_id, shard=shard), 'quantity'
+        amount = _take_from(rows, field, remaining)
+        if amount:
+            taken.append((amount, shard))
+            remaining -= amount
+            if not remaining:
+                return taken
+    for amount, shard in taken:
+        _give_back(product.product_id, amount, shard)
+    return []
+
+
+def _give_back(product_id, quantity, shard):
+    if shard is None:
+        Product.objects.filter(product_id=product_id).update(quantity_in_stock=F('quantity_in_stock') + quantity)
+    else:
+        ProductStockShard.objects.filter(product_id=product_id, shard=shard).update(quantity=F('quantity') + quantity)
+
+
+def reserve_stock(lines):
+    """
+    Take stock for ``[(product, quantity), ...]`` all-or-nothing.
+
+    Returns unsaved StockReservation objects (without an order) describing where
+    each line's stock came from, one per stock source a line touched. On
+    shortage the lines already taken are put back and InsufficientStock is raised.
+    """
+    reservations = []
+    for product, quantity in lines:
+        taken = _take(product, quantity)
+        if not taken:
+            release_stock(reservations)
+            raise InsufficientStock(product)
+        reservations.extend(
+            StockReservation(product=product, quantity=amount, shard=shard) for amount, shard in taken
+        )
+    return reservations
+
+
+def release_stock(reservations):
+    """Put back stock for reservations that were never saved (compensation path)."""
+    for reservation in reservations:
+        _give_back(reservation.product_id, reservation.quantity, reservation.shard)
+
+
+def release_order_reservations(order):
+    """Return an order's held stock; safe to call more than once or concurrently."""
+    released = 0
+    for reservation in StockReservation.objects.filter(order=order, status='held'):
+        # Claim the row first so only one caller returns its stock.
+        if StockReservation.objects.filter(pk=reservation.pk, status='held').update(status='released'):
+            _give_back(reservation.product_id, reservation.quantity, reservation.shard)
+            released += 1
+    return released
+
+
+def available_stock(product):
+    """Total sellable quantity: the product row plus all of its shards."""
+    if not product.stock_shard_count:
+        return product.quantity_in_stock
+    shard_total = sum(shard.quantity for shard in product.stock_shards.all())
+    return product.quantity_in_stock + shard_total
+
+
+def rebalance_stock(product, shard_count=None, total=None):
+    """
+    Redistribute a product's stock evenly over ``shard_count`` slots (0 = unsharded).
+
+    ``total`` replaces the available quantity (admin restock); by default the
+    current total is kept. Runs under row locks so concurrent reservations wait.
+    """
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(product_id=product.product_id)
+        shards = ProductStockShard.objects.select_for_update().filter(product=product)
+        current_total = product.quantity_in_stock + (shards.aggregate(total=Sum('quantity'))['total'] or 0)
+        total = current_total if total is None else total
+        shard_count = product.stock_shard_count if shard_count is None else shard_count
+
+        shards.delete()
+        if shard_count:
+            base, extra = divmod(total, shard_count)
+            ProductStockShard.objects.bulk_create([
+                ProductStockShard(product=product, shard=shard, quantity=base + (1 if shard < extra else 0))
+                for shard in range(shard_count)
+            ])
+            product.quantity_in_stock = 0
+        else:
+            product.quantity_in_stock = total
+        product.stock_shard_count = shard_count
+        product.save(update_fields=['quantity_in_stock', 'stock_shard_count', 'updated_at'])
+    return product
@@ -0,0 +1,246 @@
+"""
+Shared helpers for the benchmark_* management commands.
+
+Benchmarks seed their own fixture rows inside a transaction that is always
+rolled back, so they can run against SQL Server or the SQLite stand-in
+(DB_ENGINE=sqlite) without leaving data behind. The endpoint dataset is the
+exception: it is committed and reused, so seed_endpoint_dataset refuses to
+write to SQL Server without ``--allow-server-db``.
+"""
+import random
+import statistics
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import (
+    Admin, Category, Customer, Order, OrderItem, OrderPayment, PaymentTransaction, Product, Subscription,
+    SubscriptionBasketItem, SubscriptionDelivery, SubscriptionDeliveryItem,
+)
+from api.rollups import rebuild_customer_stats, rebuild_delivery_summary, rebuild_sales_rollups
+from api.serializers import ProductSerializer, SubscriptionDeliverySerializer
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is rolled back even on success."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def summarize_timings(samples_ms):
+    """p50/p95/max/mean of a list of millisecond samples."""
+    ordered = sorted(samples_ms)
+
+    def percentile(pct):
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    return {
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'max': ordered[-1],
+        'mean': statistics.fmean(ordered),
+    }
+
+
+def create_benchmark_catalog(product_count, stock=1000):
+    """Create an admin, a category, ``product_count`` active products and a customer."""
+    tag = uuid.uuid4().hex[:8]
+    admin = Admin.objects.create(
+        first_name='Bench', last_name='Admin', email=f'bench-{tag}@example.com',
+        phone='+12025550000', username=f'bench-{tag}', password='!', role='super_admin',
+    )
+    category = Category.objects.create(name=f'Bench {tag}', owner_admin=admin)
+    Product.objects.bulk_create([
+        Product(
+            name=f'Bench product {i}', category=category, price=Decimal('12.34') + i,
+            quantity_in_stock=stock, sku=f'BENCH-{tag}-{i}', status='active', created_by=admin,
+        )
+        for i in range(product_count)
+    ])
+    products = list(Product.objects.filter(category=category).order_by('product_id'))
+    customer = Customer.objects.create(
+        first_name='Bench', last_name='Customer', email=f'bench-{tag}@example.com',
+        phone='+12025550000', owner_admin=admin,
+    )
+    return admin, products, customer
+
+
+def create_list_payloads(rows):
+    """
+    Builders for three ``rows``-row API payloads: serialized products,
+    serialized deliveries with two items each, and raw ``values()`` product
+    rows (Decimals and datetimes left to the JSON encoder). Creates its
+    fixture rows, so call it inside ``rolled_back()``.
+    """
+    admin, products, customer = create_benchmark_catalog(rows)
+    plan = Subscription.objects.create(
+        name=f'Bench plan {customer.customer_id}', price=Decimal('499.00'), duration_days=30, max_products=5,
+        owner_admin=admin,
+    )
+    today = timezone.localdate()
+    SubscriptionDelivery.objects.bulk_create([
+        SubscriptionDelivery(
+            customer=customer, subscription=plan, scheduled_for=today + timedelta(days=i),
+            notes='Leave at the door — ring twice' if i % 7 == 0 else None,
+        )
+        for i in range(rows)
+    ])
+    # Re-read rather than rely on bulk_create filling in primary keys (not every backend does).
+    deliveries = SubscriptionDelivery.objects.filter(customer=customer).order_by('delivery_id')
+    SubscriptionDeliveryItem.objects.bulk_create([
+        SubscriptionDeliveryItem(delivery=delivery, product=product, product_name=product.name, quantity=1 + n % 3)
+        for n, delivery in enumerate(deliveries)
+        for product in (products[n % rows], products[(n + 1) % rows])
+    ])
+
+    product_rows = Product.objects.filter(product_id__in=[p.product_id for p in products])
+    delivery_rows = SubscriptionDelivery.objects.filter(customer=customer)
+    return {
+        'products': lambda: ProductSerializer(product_rows.select_related('category', 'created_by'), many=True).data,
+        'deliveries': lambda: SubscriptionDeliverySerializer(
+            delivery_rows.select_related('customer').prefetch_related('items'), many=True,
+        ).data,
+        'raw-values': lambda: list(product_rows.values('product_id', 'name', 'sku', 'price', 'created_at', 'updated_at')),
+    }
+
+
+BENCHMARK_PASSWORD = 'Benchmark123!'
+
+
+def parse_scale(value):
+    """'1k' -> 1000, '100k' -> 100000, '1m' -> 1000000, plain integers as-is."""
+    value = str(value).strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    number = value[:-1] if multiplier > 1 else value
+    return int(float(number) * multiplier)
+
+
+def add_allow_server_db_argument(parser):
+    parser.add_argument('--allow-server-db', action='store_true',
+                        help='Commit the benchmark dataset even when the database is SQL Server')
+
+
+def seed_endpoint_dataset(rows, seed=0, batch_size=1000, allow_server_db=False):
+    """
+    Committed dataset of roughly ``rows`` rows owned by a dedicated admin.
+
+    Reused when it already exists, since the larger scales take minutes to
+    build; point DB_SQLITE_PATH (or DB_NAME) at a throwaway stand-in. SQL
+    Server is the configured default, so it is refused unless
+    ``allow_server_db`` is set. Returns the ids the endpoint benchmark needs
+    to build URLs.
+    """
+    if connection.vendor == 'microsoft' and not allow_server_db:
+        raise CommandError(
+            "The endpoint benchmark commits its dataset; run it on a stand-in (DB_ENGINE=sqlite) "
+            "or pass --allow-server-db to write to this SQL Server database"
+        )
+    tag = f'bench-{rows}'
+    admin = Admin.objects.filter(username=tag).first()
+    if admin is None:
+        rng = random.Random(seed)
+        password = make_password(BENCHMARK_PASSWORD)
+        today = timezone.localdate()
+        with transaction.atomic():
+            admin = Admin.objects.create(
+                first_name='Bench', last_name='Admin', email=f'{tag}@example.com', phone='+12025550000',
+                username=tag, password=password, role='admin',
+            )
+            category = Category.objects.create(name=f'Bench {rows}', owner_admin=admin)
+            plan = Subscription.objects.create(
+                name=f'Bench plan {rows}', price=Decimal('499.00'), duration_days=30, max_products=5,
+                owner_admin=admin,
+            )
+            products = Product.objects.bulk_create([
+                Product(
+                    name=f'Bench product {i}', category=category, price=Decimal('20.00') + i % 50,
+                    quantity_in_stock=10000, sku=f'{tag}-{i}', status='active', is_featured=i % 10 == 0,
+                    subscription_only=i == 0, created_by=admin,
+                )
+                for i in range(max(20, rows // 2000))
+            ], batch_size=batch_size)
+            customer_count = max(10, rows // 50)
+            for start in range(0, customer_count, batch_size):
+                customers = Customer.objects.bulk_create([
+                    Customer(
+                        first_name=f'Bench{i}', last_name='Customer', email=f'{tag}-{i}@example.com',
+                        phone='+12025550000', password=password, owner_admin=admin, subscription=plan,
+                        subscription_start_date=timezone.now() - timedelta(days=10),
+                        subscription_end_date=timezone.now() + timedelta(days=20),
+                        is_verified=i % 2 == 0,
+                    )
+                    for i in range(start, min(start + batch_size, customer_count))
+                ], batch_size=batch_size)
+                _seed_customer_history(rng, customers, products, plan, rows // customer_count, today, batch_size)
+        rebuild_delivery_summary()
+        rebuild_sales_rollups()
+        rebuild_customer_stats()
+
+    customer = Customer.objects.filter(owner_admin=admin).order_by('customer_id').first()
+    return {
+        'admin_id': admin.admin_id,
+        'category_id': Category.objects.filter(owner_admin=admin).values_list('category_id', flat=True).first(),
+        'subscription_id': Subscription.objects.filter(owner_admin=admin).values_list('subscription_id', flat=True).first(),
+        'product_id': Product.objects.filter(created_by=admin, subscription_only=False).values_list('product_id', flat=True).first(),
+        'customer_id': customer.customer_id,
+        'customer_email': customer.email,
+        'admin_username': admin.username,
+        'order_id': customer.orders.values_list('order_id', flat=True).first(),
+        # A past delivery: future ones are replaced whenever the schedule is rebuilt.
+        'delivery_id': customer.subscription_deliveries.order_by('scheduled_for').values_list('delivery_id', flat=True).first(),
+        'payment_reference': customer.payments.values_list('transaction_reference', flat=True).first(),
+    }
+
+
+def _seed_customer_history(rng, customers, products, plan, rows_per_customer, today, batch_size):
+    """Basket, deliveries, orders and payments for a batch of customers (about rows_per_customer rows each)."""
+    deliveries_per_customer = max(1, rows_per_customer // 4)
+    orders_per_customer = max(1, rows_per_customer // 10)
+    basket, payments, deliveries, orders = [], [], [], []
+    for customer in customers:
+        staple = products[rng.randrange(len(products))]
+        basket.append(SubscriptionBasketItem(customer=customer, product=staple, quantity=rng.randint(1, 3)))
+        payments.append(PaymentTransaction(
+            customer=customer, subscription=plan, amount=plan.price, status='success', currency='INR',
+            transaction_reference=f'TXN-B{customer.customer_id}', paid_at=customer.subscription_start_date,
+        ))
+        for d in range(deliveries_per_customer):
+            deliveries.append((SubscriptionDelivery(
+                customer=customer, subscription=plan, scheduled_for=today - timedelta(days=d - 7),
+                status='scheduled' if d < 7 else rng.choice(['delivered', 'delivered', 'delivered', 'missed']),
+                search_text=SubscriptionDelivery.build_search_text(customer.first_name, customer.last_name, [staple.name]),
+            ), staple))
+        for _ in range(orders_per_customer):
+            items = rng.sample(products[1:], 2)
+            subtotal = sum((product.price for product in items), Decimal('0.00'))
+            orders.append((Order(
+                customer=customer, subtotal=subtotal, total_amount=subtotal, status='paid',
+            ), items))
+
+    SubscriptionBasketItem.objects.bulk_create(basket, batch_size=batch_size)
+    PaymentTransaction.objects.bulk_create(payments, batch_size=batch_size)
+    SubscriptionDelivery.objects.bulk_create([delivery for delivery, _ in deliveries], batch_size=batch_size)
+    SubscriptionDeliveryItem.objects.bulk_create([
+        SubscriptionDeliveryItem(delivery=delivery, product=product, product_name=product.name, quantity=1)
+        for delivery, product in deliveries
+    ], batch_size=batch_size)
+    Order.objects.bulk_create([order for order, _ in orders], batch_size=batch_size)
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=1, unit_price=product.price, line_total=product.price)
+        for order, items in orders for product in items
+    ], batch_size=batch_size)
+    OrderPayment.objects.bulk_create([
+        OrderPayment(
+            order=order, amount=order.total_amount, status='success',
+            transaction_reference=f'ORDPAY-B{order.order_id}',
+        )
+        for order, _ in orders
+    ], batch_size=batch_size)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import (
+    SubscriptionDelivery, SubscriptionDeliveryItem,
+    SubscriptionDeliveryArchive, SubscriptionDeliveryItemArchive,
+)
+
+
+class Command(BaseCommand):
+    """
+    Move completed deliveries past the archive horizon into the archive tables.
+
+    Keeps subscription_delivery / subscription_delivery_item (and their
+    indexes) limited to recent and upcoming rows. Each batch copies and
+    deletes its rows in one transaction and skips rows locked by a concurrent
+    run. Daily rollups are unaffected because they are keyed by date, not by
+    row location.
+    """
+    help = "Archive completed deliveries older than DELIVERY_ARCHIVE_AFTER_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=None,
+            help='Override DELIVERY_ARCHIVE_AFTER_DAYS for this run',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Deliveries moved per transaction (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        horizon_days = options['older_than_days']
+        if horizon_days is None:
+            horizon_days = settings.DELIVERY_ARCHIVE_AFTER_DAYS
+        batch_size = options['batch_size']
+        if horizon_days < 1 or batch_size < 1:
+            raise CommandError('--older-than-days and --batch-size must be >= 1')
+
+        cutoff = timezone.localdate() - timedelta(days=horizon_days)
+        candidates = SubscriptionDelivery.objects.filter(
+            scheduled_for__lt=cutoff,
+            status__in=['delivered', 'missed', 'skipped'],
+        )
+
+        deliveries_moved = 0
+        items_moved = 0
+        while True:
+            moved = self._archive_batch(candidates, batch_size)
+            if moved is None:
+                break
+            deliveries_moved += moved[0]
+            items_moved += moved[1]
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  archived {moved[0]} deliveries, {moved[1]} items")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {deliveries_moved} deliveries and {items_moved} items scheduled before {cutoff}"
+        ))
+
+    def _archive_batch(self, candidates, batch_size):
+        with transaction.atomic():
+            deliveries = list(
+                candidates.select_for_update(skip_locked=True)
+                .order_by('scheduled_for', 'delivery_id')[:batch_size]
+            )
+            if not deliveries:
+                return None
+            delivery_ids = [delivery.delivery_id for delivery in deliveries]
+            items = list(SubscriptionDeliveryItem.objects.filter(delivery_id__in=delivery_ids))
+
+            SubscriptionDeliveryArchive.objects.bulk_create([
+                SubscriptionDeliveryArchive(
+                    delivery_id=delivery.delivery_id,
+                    customer_id=delivery.customer_id,
+                    subscription_id=delivery.subscription_id,
+                    scheduled_for=delivery.scheduled_for,
+                    status=delivery.status,
+                    delivered_at=delivery.delivered_at,
+                    notes=delivery.notes,
+                    search_text=delivery.search_text,
+                    created_at=delivery.created_at,
+                    updated_at=delivery.updated_at,
+                )
+                for delivery in deliveries
+            ], ignore_conflicts=True)
+            SubscriptionDeliveryItemArchive.objects.bulk_create([
+                SubscriptionDeliveryItemArchive(
+                    delivery_item_id=item.delivery_item_id,
+                    delivery_id=item.delivery_id,
+                    product_id=item.product_id,
+                    product_name=item.product_name,
+                    quantity=item.quantity,
+                    created_at=item.created_at,
+                )
+                for item in items
+            ], ignore_conflicts=True)
+
+            SubscriptionDeliveryItem.objects.filter(delivery_id__in=delivery_ids).delete()
+            SubscriptionDelivery.objects.filter(delivery_id__in=delivery_ids).delete()
+            return len(deliveries), len(items)
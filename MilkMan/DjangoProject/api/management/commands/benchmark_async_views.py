@@ -0,0 +1,181 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment
+
+from ._benchmark import (
+    BENCHMARK_PASSWORD, add_allow_server_db_argument, parse_scale, seed_endpoint_dataset, summarize_timings,
+)
+
+ENDPOINTS = [
+    ('user-dashboard-data', '/api/user/dashboard-data/'),
+    ('user-subscription-deliveries', '/api/user/subscription-deliveries/'),
+    ('user-payments', '/api/user/payments/'),
+    ('user-orders', '/api/user/orders/'),
+]
+MODES = {'wsgi': 'false', 'asgi': 'true'}
+
+
+class Command(BaseCommand):
+    """
+    Compare the sync (WSGI) and async (ASGI) versions of the customer read
+    endpoints under concurrent load.
+
+    Each mode runs in a fresh process with USER_VIEWS_ASYNC set accordingly.
+    The WSGI run pushes --concurrency clients through --wsgi-workers request
+    slots, like a gunicorn deployment with that many sync workers; the ASGI
+    run serves the same clients from one event loop, like one uvicorn worker.
+    On the SQLite stand-in queries take microseconds, so --db-latency-ms
+    adds a per-statement delay to model a networked database; that wait is
+    what the async views overlap. SQLite also rejects concurrent writers
+    outright, so the deliveries endpoint (which rebuilds the schedule on
+    every GET) is skipped there.
+    """
+    help = "Benchmark the customer read endpoints as sync (WSGI) vs async (ASGI) views"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='1k', help='Approximate dataset rows: 1k, 100k or a number (default: 1k)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the dataset (default: 0)')
+        parser.add_argument('--requests', type=int, default=40, help='Measured requests per endpoint (default: 40)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent clients (default: 16)')
+        parser.add_argument('--wsgi-workers', type=int, default=4,
+                            help='Requests the WSGI run serves at once, i.e. gunicorn workers x threads (default: 4)')
+        parser.add_argument('--db-latency-ms', type=float, default=2.0,
+                            help='Delay added to every SQL statement (default: 2)')
+        add_allow_server_db_argument(parser)
+        parser.add_argument('--child', choices=sorted(MODES), help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        rows = parse_scale(options['scale'])
+        endpoints = ENDPOINTS
+        if connection.vendor == 'sqlite':
+            endpoints = [(name, path) for name, path in ENDPOINTS if name != 'user-subscription-deliveries']
+        if options['child']:
+            return self._child(rows, endpoints, options)
+
+        # Seed once here so the two children only reuse the committed dataset.
+        seed_endpoint_dataset(rows, seed=options['seed'], allow_server_db=options['allow_server_db'])
+        self.stdout.write(
+            f"{rows} rows on {connection.vendor}, {options['requests']} requests per endpoint, "
+            f"{options['concurrency']} clients, +{options['db_latency_ms']:g} ms per query, "
+            f"{options['wsgi_workers']} WSGI workers"
+        )
+        if len(endpoints) < len(ENDPOINTS):
+            self.stdout.write("user-subscription-deliveries skipped: SQLite cannot run its rebuilds concurrently")
+        self.stdout.write(f"{'mode':<5} {'endpoint':<30} {'p50 ms':>8} {'p95 ms':>8}")
+        throughput = {}
+        for mode, async_views in MODES.items():
+            result = self._run_child(mode, async_views, options)
+            if result['errors']:
+                raise CommandError(f"{mode}: unexpected responses {result['errors']}")
+            for name, timings in result['endpoints'].items():
+                summary = summarize_timings(timings)
+                self.stdout.write(f"{mode:<5} {name:<30} {summary['p50']:>8.1f} {summary['p95']:>8.1f}")
+            total = sum(len(timings) for timings in result['endpoints'].values())
+            throughput[mode] = total / result['seconds']
+        self.stdout.write(
+            f"throughput: wsgi {throughput['wsgi']:.0f} req/s, asgi {throughput['asgi']:.0f} req/s "
+            f"({throughput['asgi'] / throughput['wsgi']:.2f}x)"
+        )
+
+    def _run_child(self, mode, async_views, options):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE),
+            'USER_VIEWS_ASYNC': async_views,
+        }
+        command = [
+            sys.executable, 'manage.py', 'benchmark_async_views', '--child', mode,
+            '--scale', options['scale'], '--seed', str(options['seed']),
+            '--requests', str(options['requests']), '--concurrency', str(options['concurrency']),
+            '--wsgi-workers', str(options['wsgi_workers']), '--db-latency-ms', str(options['db_latency_ms']),
+        ]
+        if options['allow_server_db']:
+            command.append('--allow-server-db')
+        result = subprocess.run(command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f"{mode} run failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def _child(self, rows, endpoints, options):
+        context = seed_endpoint_dataset(rows, seed=options['seed'], allow_server_db=options['allow_server_db'])
+        # Lets the test client's 'testserver' host through ALLOWED_HOSTS.
+        setup_test_environment()
+        login = Client()
+        response = login.post(
+            '/api/auth/login/', {'identifier': context['customer_email'], 'password': BENCHMARK_PASSWORD},
+            content_type='application/json',
+        )
+        if response.status_code != 200:
+            raise CommandError(f"Could not log in the benchmark customer: {response.status_code}")
+        cookies = login.cookies
+        connections.close_all()
+        self._add_query_latency(options['db_latency_ms'] / 1000)
+
+        # Every client requests each endpoint in turn; one untimed round warms caches and connections.
+        schedule = [path for _ in range(options['requests']) for _, path in endpoints]
+        names = {path: name for name, path in endpoints}
+        timings = {name: [] for name, _ in endpoints}
+        errors = []
+        mode = options['child']
+        self._run(mode, [path for _, path in endpoints], cookies, options, [], {name: [] for name, _ in endpoints}, names)
+        started = perf_counter()
+        self._run(mode, schedule, cookies, options, errors, timings, names)
+        seconds = perf_counter() - started
+        self.stdout.write(json.dumps({'endpoints': timings, 'seconds': seconds, 'errors': errors[:5]}))
+
+    def _add_query_latency(self, delay):
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            # Fires again whenever a thread's connection reconnects; add the delay once.
+            if slow_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(slow_query)
+
+        if delay > 0:
+            connection_created.connect(install, weak=False)
+
+    def _run(self, mode, schedule, cookies, options, errors, timings, names):
+        # Clients are tasks on one event loop in both modes. WSGI requests queue (FIFO, like
+        # gunicorn's accept backlog) for one of --wsgi-workers threads; ASGI requests go
+        # straight to the async handler. Timings start when the client sends, so queueing counts.
+        pending = iter(schedule)
+        workers = ThreadPoolExecutor(options['wsgi_workers'], thread_name_prefix='wsgi-worker')
+
+        async def client_loop():
+            if mode == 'wsgi':
+                client = Client()
+                loop = asyncio.get_running_loop()
+                send = lambda path: loop.run_in_executor(workers, client.get, path)  # noqa: E731
+            else:
+                client = AsyncClient()
+                send = client.get
+            client.cookies = cookies
+            for path in pending:
+                started = perf_counter()
+                response = await send(path)
+                timings[names[path]].append((perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors.append([path, response.status_code])
+
+        async def main():
+            await asyncio.gather(*(client_loop() for _ in range(options['concurrency'])))
+
+        try:
+            asyncio.run(main())
+        finally:
+            workers.shutdown()
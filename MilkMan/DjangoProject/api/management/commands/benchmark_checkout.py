@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from api.views import user_cart_checkout
+
+from ._benchmark import create_benchmark_catalog, rolled_back, summarize_timings
+
+
+class Command(BaseCommand):
+    """
+    Time user_cart_checkout for carts of different sizes.
+
+    Each cart size runs in a rolled-back transaction against the configured
+    database. Besides latency it reports the statement and INSERT counts of
+    one checkout, which should not grow with the number of cart lines.
+    """
+    help = "Benchmark cart checkout latency and statement counts by cart size"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, nargs='+', default=[1, 10, 100], help='Cart sizes to test')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed checkouts per cart size')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        self.stdout.write(f"{'lines':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'queries':>8} {'inserts':>8}")
+
+        for line_count in options['lines']:
+            with rolled_back():
+                _admin, products, customer = create_benchmark_catalog(line_count)
+                payload = {
+                    'customer_id': customer.customer_id,
+                    'payment_method': 'upi',
+                    'upi_id': 'bench@upi',
+                    'items': [{'product_id': p.product_id, 'quantity': 2} for p in products],
+                }
+
+                def checkout():
+                    response = user_cart_checkout(factory.post('/api/user/cart-checkout/', payload, format='json'))
+                    if response.status_code not in (201, 202):
+                        raise RuntimeError(f"checkout failed: {response.status_code} {response.data}")
+
+                # One warm-up run doubles as the statement count sample.
+                with CaptureQueriesContext(connection) as captured:
+                    checkout()
+                statements = [q['sql'].lstrip().upper() for q in captured.captured_queries]
+                inserts = sum(1 for sql in statements if sql.startswith('INSERT'))
+
+                samples = []
+                for _ in range(options['iterations']):
+                    started = time.perf_counter()
+                    checkout()
+                    samples.append((time.perf_counter() - started) * 1000)
+
+            stats = summarize_timings(samples)
+            self.stdout.write(
+                f"{line_count:>6} {stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['max']:>9.2f} "
+                f"{len(statements):>8} {inserts:>8}"
+            )
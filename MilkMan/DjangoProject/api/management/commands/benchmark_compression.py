@@ -0,0 +1,87 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.settings import api_settings
+
+from api import compression
+
+from ._benchmark import create_list_payloads, rolled_back, summarize_timings
+
+GZIP_LEVELS = [1, 4, 6, 9]
+BROTLI_LEVELS = [1, 4, 5, 6, 9]
+
+
+class Command(BaseCommand):
+    """
+    CPU cost versus bytes saved for each gzip (and brotli) level on rendered
+    --rows-row JSON payloads (see create_list_payloads).
+
+    "to client" is compression time plus transfer time at --bandwidth-mbps,
+    so slow links favour higher levels and fast links favour cheap ones; the
+    levels in settings are marked with *. The "stream" rows compress the
+    delivery list one row per chunk through the StreamingHttpResponse path,
+    which should come close to the one-shot size.
+    """
+    help = "Benchmark response compression levels: CPU time, ratio and time to client"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per payload (default: 1000)')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed runs per level (default: 20)')
+        parser.add_argument('--bandwidth-mbps', type=float, default=20.0,
+                            help='Client bandwidth for the "to client" column (default: 20)')
+
+    def handle(self, *args, **options):
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        with rolled_back():
+            builders = create_list_payloads(options['rows'])
+            payloads = {name: renderer.render(build()) for name, build in builders.items()}
+            delivery_rows = [renderer.render(row) for row in builders['deliveries']()]
+
+        variants = [('gzip', level) for level in GZIP_LEVELS]
+        if compression.brotli is not None:
+            variants += [('br', level) for level in BROTLI_LEVELS]
+        else:
+            self.stdout.write("Brotli is not installed; gzip only")
+        configured = {('gzip', settings.COMPRESSION_GZIP_LEVEL), ('br', settings.COMPRESSION_BROTLI_LEVEL)}
+        bytes_per_ms = options['bandwidth_mbps'] * 1_000_000 / 8 / 1000
+
+        self.stdout.write(
+            f"{'payload':<12} {'encoding':<9} {'KB':>7} {'ratio':>6} {'p50 ms':>7} {'MB/s':>6} "
+            f"{'to client ms':>12}  (at {options['bandwidth_mbps']:g} Mbps)"
+        )
+        for name, body in payloads.items():
+            self.stdout.write(
+                f"{name:<12} {'identity':<9} {len(body) / 1024:>7.1f} {1:>6.1f} {0:>7.2f} {'':>6} "
+                f"{len(body) / bytes_per_ms:>12.1f}"
+            )
+            for encoding, level in variants:
+                size, elapsed = self._measure(lambda: compression.compress(encoding, level, body), options['iterations'])
+                self._row(name, encoding, level, len(body), size, elapsed, bytes_per_ms, configured)
+
+        name = f"deliveries ({len(delivery_rows)} chunks)"
+        body_size = sum(len(row) for row in delivery_rows)
+        self.stdout.write(f"stream: {name}")
+        for encoding, level in variants:
+            if (encoding, level) not in configured:
+                continue
+            size, elapsed = self._measure(
+                lambda: b''.join(compression.compress_stream(encoding, level, iter(delivery_rows))),
+                options['iterations'],
+            )
+            self._row('stream', encoding, level, body_size, size, elapsed, bytes_per_ms, configured)
+
+    def _measure(self, func, iterations):
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            output = func()
+            samples.append((time.perf_counter() - started) * 1000)
+        return len(output), summarize_timings(samples)['p50']
+
+    def _row(self, name, encoding, level, original, size, elapsed, bytes_per_ms, configured):
+        label = f"{encoding}-{level}{'*' if (encoding, level) in configured else ''}"
+        self.stdout.write(
+            f"{name:<12} {label:<9} {size / 1024:>7.1f} {original / size:>6.1f} {elapsed:>7.2f} "
+            f"{original / 1e6 / (elapsed / 1000):>6.0f} {elapsed + size / bytes_per_ms:>12.1f}"
+        )
@@ -0,0 +1,132 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.models import Product
+from config.db_pool import pool_stats
+
+from ._benchmark import summarize_timings
+
+POOLED_ENGINES = {
+    'mssql': 'config.db_backends.mssql',
+    'django.db.backends.sqlite3': 'config.db_backends.sqlite3',
+    'config.db_backends.mssql': 'config.db_backends.mssql',
+    'config.db_backends.sqlite3': 'config.db_backends.sqlite3',
+    'django.db.backends.postgresql': 'config.db_backends.postgresql',
+    'config.db_backends.postgresql': 'config.db_backends.postgresql',
+}
+UNPOOLED_ENGINES = {
+    'config.db_backends.mssql': 'mssql',
+    'config.db_backends.sqlite3': 'django.db.backends.sqlite3',
+    'config.db_backends.postgresql': 'django.db.backends.postgresql',
+}
+
+
+class Command(BaseCommand):
+    """
+    Compare per-request latency for the three connection strategies.
+
+    Each simulated request runs the same request_started / query /
+    request_finished cycle Django does (close_if_unusable_or_obsolete around
+    the view), against copies of the default database settings with:
+
+    * ``no-persist``: CONN_MAX_AGE=0, a new connection per request
+    * ``persistent``: CONN_MAX_AGE=600 with CONN_HEALTH_CHECKS
+    * ``pooled``: the process-level pool from config/db_pool.py
+
+    Opening a SQLite file is far cheaper than an ODBC login to SQL Server, so
+    ``--connect-latency-ms`` adds a sleep to every new physical connection to
+    model the server-side cost.
+    """
+    help = "Benchmark per-request latency with and without persistent / pooled DB connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per thread (default: 200)')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent request threads (default: 4)')
+        parser.add_argument('--connect-latency-ms', type=float, default=20.0,
+                            help='Simulated cost of opening a connection (default: 20)')
+        parser.add_argument('--pool-size', type=int, default=4, help='Pool size for the pooled run (default: 4)')
+
+    def handle(self, *args, **options):
+        default = connections.settings['default']
+        base_engine = UNPOOLED_ENGINES.get(default['ENGINE'], default['ENGINE'])
+        modes = {
+            'no-persist': {'ENGINE': base_engine, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+            'persistent': {'ENGINE': base_engine, 'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True},
+            'pooled': {
+                'ENGINE': POOLED_ENGINES[default['ENGINE']],
+                'CONN_MAX_AGE': 0,
+                'CONN_HEALTH_CHECKS': False,
+                'POOL': {'size': options['pool_size'], 'max_overflow': 0, 'recycle': 1800, 'timeout': 30},
+            },
+        }
+
+        self.stdout.write(
+            f"{options['threads']} threads x {options['requests']} requests, "
+            f"connect latency {options['connect_latency_ms']:.0f}ms"
+        )
+        self.stdout.write(f"{'mode':>12} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'req/s':>8} {'connects':>9}")
+        for mode, overrides in modes.items():
+            alias = f'benchmark_{mode.replace("-", "_")}'
+            connections.settings[alias] = {**default, **overrides}
+            try:
+                samples, connects, elapsed = self._run(alias, options)
+            finally:
+                connections.settings.pop(alias, None)
+            summary = summarize_timings(samples)
+            self.stdout.write(
+                f"{mode:>12} {summary['p50']:>8.2f} {summary['p95']:>8.2f} {summary['max']:>8.2f} "
+                f"{len(samples) / elapsed:>8.1f} {connects:>9}"
+            )
+            if mode == 'pooled':
+                stats = pool_stats()[alias]
+                self.stdout.write(
+                    f"{'':>12} pool: checkouts={stats['checkouts']} reuses={stats['reuses']} "
+                    f"waits={stats['waits']} timeouts={stats['timeouts']} failed_pings={stats['failed_pings']} "
+                    f"wait_ms={stats['wait_seconds'] * 1000:.1f}"
+                )
+
+    def _run(self, alias, options):
+        latency = options['connect_latency_ms'] / 1000
+        samples = []
+        connects = [0]
+        lock = threading.Lock()
+        start_gate = threading.Barrier(options['threads'] + 1)
+
+        def worker():
+            connection = connections[alias]
+            # Pooled wrappers open physical connections through connect_raw.
+            hook = 'connect_raw' if hasattr(connection, 'connect_raw') else 'get_new_connection'
+            open_connection = getattr(connection, hook)
+
+            def slow_connect(conn_params):
+                time.sleep(latency)
+                with lock:
+                    connects[0] += 1
+                return open_connection(conn_params)
+
+            setattr(connection, hook, slow_connect)
+            timings = []
+            try:
+                start_gate.wait()
+                for _ in range(options['requests']):
+                    started = time.perf_counter()
+                    connection.close_if_unusable_or_obsolete()
+                    Product.objects.using(alias).filter(status='active').exists()
+                    connection.close_if_unusable_or_obsolete()
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+                with lock:
+                    samples.extend(timings)
+
+        workers = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        for thread in workers:
+            thread.start()
+        start_gate.wait()
+        started = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        return samples, connects[0], time.perf_counter() - started
@@ -0,0 +1,261 @@
+import json
+from contextlib import ExitStack
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import URLResolver, get_resolver
+
+from ._benchmark import (
+    BENCHMARK_PASSWORD, add_allow_server_db_argument, parse_scale, rolled_back, seed_endpoint_dataset,
+    summarize_timings,
+)
+
+# One representative request per route name in api/urls.py, with the most SQL
+# statements it may run. Budgets are per request and must not grow with the
+# dataset size. Requests that write run inside a rolled-back transaction.
+ENDPOINTS = [
+    # Router: admins, categories, subscriptions, customers, products, deliveries
+    {'name': 'api-root', 'as': 'anon', 'path': '/api/', 'budget': 0},
+    {'name': 'admin-list', 'as': 'admin', 'path': '/api/admins/', 'budget': 4},
+    {'name': 'admin-active-admins', 'as': 'admin', 'path': '/api/admins/active_admins/', 'budget': 3},
+    {'name': 'admin-detail', 'as': 'admin', 'path': '/api/admins/{admin_id}/', 'budget': 3},
+    {'name': 'admin-deactivate', 'as': 'admin', 'method': 'post', 'path': '/api/admins/{admin_id}/deactivate/', 'budget': 4},
+    {'name': 'category-list', 'as': 'admin', 'path': '/api/categories/', 'budget': 4},
+    {'name': 'category-active-categories', 'as': 'admin', 'path': '/api/categories/active_categories/', 'budget': 3},
+    {'name': 'category-detail', 'as': 'admin', 'path': '/api/categories/{category_id}/', 'budget': 3},
+    {'name': 'category-products-count', 'as': 'admin', 'path': '/api/categories/{category_id}/products_count/', 'budget': 5},
+    {'name': 'subscription-list', 'as': 'admin', 'path': '/api/subscriptions/', 'budget': 4},
+    {'name': 'subscription-active-subscriptions', 'as': 'admin', 'path': '/api/subscriptions/active_subscriptions/', 'budget': 3},
+    {'name': 'subscription-by-price-range', 'as': 'admin', 'path': '/api/subscriptions/by_price_range/?min_price=0&max_price=1000', 'budget': 3},
+    {'name': 'subscription-detail', 'as': 'admin', 'path': '/api/subscriptions/{subscription_id}/', 'budget': 3},
+    {'name': 'customer-list', 'as': 'admin', 'path': '/api/customers/', 'budget': 4},
+    {'name': 'customer-active-customers', 'as': 'admin', 'path': '/api/customers/active_customers/', 'budget': 3},
+    {'name': 'customer-verified-customers', 'as': 'admin', 'path': '/api/customers/verified_customers/', 'budget': 3},
+    {'name': 'customer-detail', 'as': 'admin', 'path': '/api/customers/{customer_id}/', 'budget': 3},
+    {'name': 'customer-reactivate', 'as': 'admin', 'method': 'post', 'path': '/api/customers/{customer_id}/reactivate/', 'budget': 4},
+    {'name': 'customer-suspend', 'as': 'admin', 'method': 'post', 'path': '/api/customers/{customer_id}/suspend/', 'budget': 4},
+    {'name': 'customer-verify', 'as': 'admin', 'method': 'post', 'path': '/api/customers/{customer_id}/verify/', 'budget': 4},
+    {'name': 'product-list', 'as': 'admin', 'path': '/api/products/', 'budget': 5},
+    {'name': 'product-active-products', 'as': 'admin', 'path': '/api/products/active_products/', 'budget': 4},
+    {'name': 'product-by-category', 'as': 'admin', 'path': '/api/products/by_category/?category_id={category_id}', 'budget': 4},
+    {'name': 'product-by-price-range', 'as': 'admin', 'path': '/api/products/by_price_range/?min_price=0&max_price=1000', 'budget': 4},
+    {'name': 'product-featured-products', 'as': 'admin', 'path': '/api/products/featured_products/', 'budget': 4},
+    {'name': 'product-low-stock', 'as': 'admin', 'path': '/api/products/low_stock/', 'budget': 3},
+    {'name': 'product-detail', 'as': 'admin', 'path': '/api/products/{product_id}/', 'budget': 4},
+    {'name': 'delivery-list', 'as': 'admin', 'path': '/api/deliveries/', 'budget': 5},
+    {'name': 'delivery-calendar', 'as': 'admin', 'path': '/api/deliveries/calendar/', 'budget': 3},
+    {'name': 'delivery-history', 'as': 'admin', 'path': '/api/deliveries/history/', 'budget': 5},
+    {'name': 'delivery-detail', 'as': 'admin', 'path': '/api/deliveries/{delivery_id}/', 'budget': 4},
+    {'name': 'delivery-mark-delivered', 'as': 'admin', 'method': 'post', 'path': '/api/deliveries/{delivery_id}/mark_delivered/', 'budget': 9},
+    {'name': 'delivery-mark-missed', 'as': 'admin', 'method': 'post', 'path': '/api/deliveries/{delivery_id}/mark_missed/', 'budget': 11},
+    # Auth
+    {'name': 'hello-world', 'as': 'anon', 'path': '/api/hello/', 'budget': 0},
+    {'name': 'auth-signup', 'as': 'guest', 'method': 'post', 'path': '/api/auth/signup/', 'budget': 7, 'data': {
+        'first_name': 'Bench', 'last_name': 'Signup', 'email': 'bench-signup@example.com',
+        'phone': '+12025550000', 'password': BENCHMARK_PASSWORD,
+    }},
+    {'name': 'auth-login', 'as': 'guest', 'method': 'post', 'path': '/api/auth/login/', 'budget': 7, 'data': {
+        'identifier': '{customer_email}', 'password': BENCHMARK_PASSWORD,
+    }},
+    {'name': 'auth-me', 'as': 'user', 'path': '/api/auth/me/', 'budget': 2},
+    {'name': 'auth-logout', 'as': 'anon', 'method': 'post', 'path': '/api/auth/logout/', 'budget': 0},
+    # Customer endpoints
+    {'name': 'user-dashboard-data', 'as': 'user', 'path': '/api/user/dashboard-data/', 'budget': 4},
+    {'name': 'user-subscribe', 'as': 'user', 'method': 'post', 'path': '/api/user/subscribe/', 'budget': 8, 'data': {
+        'subscription_id': '{subscription_id}', 'payment_method': 'card', 'card_number': '4111111111111111',
+        'expiry': '12/30', 'cvv': '123',
+    }},
+    {'name': 'user-subscription-basket', 'as': 'user', 'path': '/api/user/subscription-basket/', 'budget': 3},
+    {'name': 'user-subscription-deliveries', 'as': 'user', 'path': '/api/user/subscription-deliveries/', 'budget': 21},
+    {'name': 'user-subscription-delivery-history', 'as': 'user', 'path': '/api/user/subscription-deliveries/history/', 'budget': 5},
+    {'name': 'user-payments', 'as': 'user', 'path': '/api/user/payments/', 'budget': 5},
+    {'name': 'user-payment-status', 'as': 'user', 'path': '/api/user/payments/{payment_reference}/status/', 'budget': 4},
+    {'name': 'user-deactivate-subscription', 'as': 'user', 'method': 'post', 'path': '/api/user/deactivate-subscription/', 'budget': 29},
+    {'name': 'user-cart-checkout', 'as': 'user', 'method': 'post', 'path': '/api/user/cart-checkout/', 'budget': 12, 'data': {
+        'items': [{'product_id': '{product_id}', 'quantity': 1}], 'payment_method': 'cod',
+    }},
+    {'name': 'user-orders', 'as': 'user', 'path': '/api/user/orders/', 'budget': 4},
+    {'name': 'user-order-detail', 'as': 'user', 'path': '/api/user/orders/{order_id}/', 'budget': 4},
+    {'name': 'user-reorder-suggestions', 'as': 'user', 'path': '/api/user/reorder-suggestions/', 'budget': 2},
+    # Admin dashboards and reports
+    {'name': 'admin-stats', 'as': 'admin', 'path': '/api/admin/stats/', 'budget': 7},
+    {'name': 'admin-query-stats', 'as': 'admin', 'path': '/api/admin/query-stats/', 'budget': 2},
+    {'name': 'admin-sales-report', 'as': 'admin', 'path': '/api/admin/reports/sales/', 'budget': 3},
+    {'name': 'admin-product-sales-report', 'as': 'admin', 'path': '/api/admin/reports/product-sales/', 'budget': 4},
+]
+
+
+def _route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _route_names(pattern.url_patterns)
+        elif pattern.name:
+            yield pattern.name
+
+
+def _fill(value, context):
+    """Substitute {placeholders} in strings, keeping whole-placeholder values in their original type."""
+    if isinstance(value, dict):
+        return {key: _fill(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, context) for item in value]
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in context:
+            return context[value[1:-1]]
+        return value.format(**context)
+    return value
+
+
+class Command(BaseCommand):
+    """
+    Latency and SQL query count for every route in api/urls.py.
+
+    Seeds (or reuses) a dataset of about --scale rows on the configured
+    database, runs each entry of ENDPOINTS --iterations times through the
+    Django test client and reports p50/p95 latency and queries per request.
+    Run it on a stand-in database (DB_ENGINE=sqlite or postgres), never
+    against production: the dataset is committed so larger scales are only
+    built once.
+
+    --save-baseline writes the results to JSON. Otherwise, when a baseline
+    exists, the command fails if an endpoint's latency (--metric) regressed
+    by more than --threshold, its query count went up, or it exceeds its
+    declared budget.
+    """
+    help = "Benchmark every API route against a seeded stand-in database and check query budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', default='1k', help='Approximate dataset rows: 1k, 100k, 1m or a number (default: 1k)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the dataset (default: 0)')
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per endpoint (default: 30)')
+        parser.add_argument('--only', nargs='+', help='Route names to run (skips the coverage check)')
+        parser.add_argument('--baseline', help='Baseline JSON path (default: benchmarks/endpoints-<vendor>-<rows>.json)')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--metric', choices=['p50', 'p95'], default='p50',
+                            help='Percentile compared against the baseline (default: p50, steadier on shared machines)')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed slowdown over the baseline, as a fraction (default: 0.25)')
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help='Ignore slowdowns smaller than this many ms (default: 2)')
+        add_allow_server_db_argument(parser)
+
+    def handle(self, *args, **options):
+        endpoints = ENDPOINTS
+        if options['only']:
+            endpoints = [spec for spec in ENDPOINTS if spec['name'] in options['only']]
+        else:
+            missing = sorted(set(_route_names(get_resolver('api.urls').url_patterns)) - {spec['name'] for spec in ENDPOINTS})
+            if missing:
+                raise CommandError(f"Routes without a benchmark entry: {', '.join(missing)}")
+
+        rows = parse_scale(options['scale'])
+        started = perf_counter()
+        context = seed_endpoint_dataset(rows, seed=options['seed'], allow_server_db=options['allow_server_db'])
+        self.stdout.write(f"Dataset {rows} rows on {connection.vendor} ready in {perf_counter() - started:.1f}s")
+
+        # Lets the test client's 'testserver' host through ALLOWED_HOSTS.
+        setup_test_environment()
+        clients = self._clients(context)
+        # Round-robin over the endpoints so background noise spreads evenly; round 0 warms caches.
+        samples = {spec['name']: {'timings': [], 'queries': [], 'statuses': set()} for spec in endpoints}
+        for round_number in range(options['iterations'] + 1):
+            for spec in endpoints:
+                elapsed, queries, status_code = self._request(spec, clients[spec['as']], context)
+                if round_number:
+                    samples[spec['name']]['timings'].append(elapsed)
+                    samples[spec['name']]['queries'].append(queries)
+                    samples[spec['name']]['statuses'].add(status_code)
+
+        results = {}
+        self.stdout.write(f"{'endpoint':<38} {'status':>6} {'queries':>8} {'budget':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        for spec in endpoints:
+            measured = samples[spec['name']]
+            result = results[spec['name']] = {
+                'method': spec.get('method', 'get').upper(),
+                'path': _fill(spec['path'], context),
+                'status': max(measured['statuses']),
+                'queries': max(measured['queries']),
+                'budget': spec['budget'],
+                **summarize_timings(measured['timings']),
+            }
+            self.stdout.write(
+                f"{spec['name']:<38} {result['status']:>6} {result['queries']:>8} {result['budget']:>7} "
+                f"{result['p50']:>8.2f} {result['p95']:>8.2f}"
+            )
+
+        baseline_path = Path(options['baseline'] or settings.BASE_DIR / 'benchmarks' / f'endpoints-{connection.vendor}-{rows}.json')
+        if options['save_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps({
+                'rows': rows, 'vendor': connection.vendor, 'iterations': options['iterations'], 'endpoints': results,
+            }, indent=2, sort_keys=True))
+            self.stdout.write(f"Saved baseline to {baseline_path}")
+
+        failures = self._check(results, baseline_path, options)
+        if failures:
+            raise CommandError("Endpoint benchmark failed:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} endpoints within budget"))
+
+    def _clients(self, context):
+        # 'guest' signs up and logs in, so those sessions never leak into the anonymous requests.
+        clients = {'anon': Client(), 'guest': Client(), 'admin': Client(), 'user': Client()}
+        logins = {'admin': context['admin_username'], 'user': context['customer_email']}
+        for role, identifier in logins.items():
+            response = clients[role].post(
+                '/api/auth/login/', {'identifier': identifier, 'password': BENCHMARK_PASSWORD},
+                content_type='application/json',
+            )
+            if response.status_code != 200:
+                raise CommandError(f"Could not log in the benchmark {role}: {response.status_code}")
+        return clients
+
+    def _request(self, spec, client, context):
+        """One request; returns (milliseconds, SQL statements, status code)."""
+        method = spec.get('method', 'get')
+        path = _fill(spec['path'], context)
+        queries = [0]
+
+        def count_query(execute, sql, params, many, query_context):
+            queries[0] += 1
+            return execute(sql, params, many, query_context)
+
+        with ExitStack() as stack:
+            if method != 'get':
+                stack.enter_context(rolled_back())
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(count_query))
+            started = perf_counter()
+            if method == 'get':
+                response = client.get(path)
+            else:
+                response = getattr(client, method)(path, _fill(spec.get('data', {}), context), content_type='application/json')
+            elapsed = (perf_counter() - started) * 1000
+        return elapsed, queries[0], response.status_code
+
+    def _check(self, results, baseline_path, options):
+        failures = []
+        for name, result in results.items():
+            if result['status'] >= 400:
+                failures.append(f"{name}: HTTP {result['status']}")
+            if result['queries'] > result['budget']:
+                failures.append(f"{name}: {result['queries']} queries exceeds budget of {result['budget']}")
+
+        if options['save_baseline'] or not baseline_path.exists():
+            return failures
+        baseline = json.loads(baseline_path.read_text())['endpoints']
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            if result['queries'] > previous['queries']:
+                failures.append(f"{name}: queries went from {previous['queries']} to {result['queries']}")
+            metric = options['metric']
+            allowed = previous[metric] * (1 + options['threshold'])
+            if result[metric] > allowed and result[metric] - previous[metric] > options['min_delta_ms']:
+                failures.append(f"{name}: {metric} {result[metric]:.2f}ms vs baseline {previous[metric]:.2f}ms")
+        return failures
@@ -0,0 +1,76 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.renderers import FastJSONParser, FastJSONRenderer
+
+from ._benchmark import create_list_payloads, rolled_back, summarize_timings
+
+
+class Command(BaseCommand):
+    """
+    Time DRF's JSON renderer and parser against the orjson-backed ones in
+    api/renderers.py on payloads of --rows rows.
+
+    Payloads are built in a rolled-back transaction: serialized products,
+    serialized deliveries with two items each, and raw ``values()`` rows
+    whose Decimals and datetimes go through the encoder hook. The command
+    fails if the two renderers produce different bytes or the two parsers
+    different data, so it doubles as the compatibility check.
+    """
+    help = "Benchmark JSON rendering and parsing: DRF (stdlib json) vs orjson"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows per payload (default: 1000)')
+        parser.add_argument('--iterations', type=int, default=30, help='Timed runs per payload (default: 30)')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError("orjson is not installed; FastJSONRenderer is using the standard library")
+
+        with rolled_back():
+            payloads = self._payloads(options['rows'])
+
+        self.stdout.write(
+            f"{'payload':<12} {'KB':>6} {'serialize':>10} {'render':>8} {'orjson':>8} {'x':>5} "
+            f"{'parse':>8} {'orjson':>8} {'x':>5}   (p50 ms)"
+        )
+        for name, (data, serialize_ms) in payloads.items():
+            expected = JSONRenderer().render(data)
+            if FastJSONRenderer().render(data) != expected:
+                raise CommandError(f"{name}: FastJSONRenderer output differs from JSONRenderer")
+            if FastJSONParser().parse(io.BytesIO(expected)) != JSONParser().parse(io.BytesIO(expected)):
+                raise CommandError(f"{name}: FastJSONParser result differs from JSONParser")
+
+            timings = {
+                'render': self._time(lambda: JSONRenderer().render(data), options['iterations']),
+                'fast_render': self._time(lambda: FastJSONRenderer().render(data), options['iterations']),
+                'parse': self._time(lambda: JSONParser().parse(io.BytesIO(expected)), options['iterations']),
+                'fast_parse': self._time(lambda: FastJSONParser().parse(io.BytesIO(expected)), options['iterations']),
+            }
+            self.stdout.write(
+                f"{name:<12} {len(expected) / 1024:>6.0f} {serialize_ms:>10.2f} "
+                f"{timings['render']:>8.2f} {timings['fast_render']:>8.2f} {timings['render'] / timings['fast_render']:>5.1f} "
+                f"{timings['parse']:>8.2f} {timings['fast_parse']:>8.2f} {timings['parse'] / timings['fast_parse']:>5.1f}"
+            )
+        self.stdout.write(self.style.SUCCESS("Rendered bytes and parsed data identical for every payload"))
+
+    def _payloads(self, rows):
+        """{name: (data, serializer p50 ms)}; the serializer time puts the rendering share in context."""
+        payloads = {}
+        for name, build in create_list_payloads(rows).items():
+            data = build()
+            payloads[name] = (data, self._time(build, 5))
+        return payloads
+
+    def _time(self, func, iterations):
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000)
+        return summarize_timings(samples)['p50']
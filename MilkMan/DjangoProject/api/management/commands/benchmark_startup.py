@@ -0,0 +1,81 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ._benchmark import summarize_timings
+
+# Runs in a fresh interpreter so nothing (settings, connections, the SQL Server
+# version cache) is warm. Prints one JSON line of millisecond timings.
+PROBE = """
+import json, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+allowed = [h for h in settings.ALLOWED_HOSTS if h != '*' and not h.startswith('.')]
+response = Client(HTTP_HOST=allowed[0] if allowed else 'localhost').get({path!r})
+first_done = time.perf_counter()
+Client(HTTP_HOST=allowed[0] if allowed else 'localhost').get({path!r})
+second_done = time.perf_counter()
+print(json.dumps({{
+    'status': response.status_code,
+    'vendor': connection.vendor,
+    'setup': (setup_done - started) * 1000,
+    'first_request': (first_done - setup_done) * 1000,
+    'second_request': (second_done - first_done) * 1000,
+}}))
+"""
+
+
+class Command(BaseCommand):
+    """
+    Measure process startup and first-request latency, with the SQL Server
+    version detected on the first connection versus pinned via
+    SQL_SERVER_VERSION.
+
+    Every run is a fresh Python process using the current settings module.
+    The version query only exists on SQL Server; on the SQLite stand-in both
+    variants should match and the numbers show the baseline startup cost.
+    """
+    help = "Benchmark startup and first-request latency with detected vs pinned SQL Server version"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes per variant (default: 5)')
+        parser.add_argument('--path', default='/api/products/active_products/',
+                            help='Request path for the first-request timing')
+        parser.add_argument('--pinned-version', type=int, default=2022,
+                            help='SQL_SERVER_VERSION for the pinned variant (default: 2022)')
+
+    def handle(self, *args, **options):
+        variants = {'detect': '0', 'pinned': str(options['pinned_version'])}
+        probe = PROBE.format(path=options['path'])
+        self.stdout.write(f"{options['runs']} fresh processes per variant, GET {options['path']}")
+        self.stdout.write(f"{'variant':>8} {'setup p50':>10} {'first p50':>10} {'first max':>10} {'second p50':>11}")
+        for variant, version in variants.items():
+            env = {
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE),
+                'SQL_SERVER_VERSION': version,
+            }
+            runs = [self._probe(probe, env) for _ in range(options['runs'])]
+            setup = summarize_timings([run['setup'] for run in runs])
+            first = summarize_timings([run['first_request'] for run in runs])
+            second = summarize_timings([run['second_request'] for run in runs])
+            self.stdout.write(
+                f"{variant:>8} {setup['p50']:>10.1f} {first['p50']:>10.1f} {first['max']:>10.1f} "
+                f"{second['p50']:>11.1f}  ({runs[0]['vendor']}, HTTP {runs[0]['status']})"
+            )
+
+    def _probe(self, probe, env):
+        result = subprocess.run(
+            [sys.executable, '-c', probe], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.inventory import InsufficientStock, rebalance_stock, reserve_stock
+from api.models import Admin, Category, Customer, Product
+
+from ._benchmark import create_benchmark_catalog
+
+
+class Command(BaseCommand):
+    """
+    Measure reservation throughput when many threads buy the same SKU.
+
+    Runs once per shard count (0 = plain product row) against the configured
+    database. Worker threads need committed rows, so the fixture product is
+    created for real and deleted afterwards. Contention effects only show on
+    a server database; SQLite serializes all writers regardless of sharding.
+    """
+    help = "Benchmark concurrent stock reservations on a single hot product"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent workers (default: 8)')
+        parser.add_argument('--reservations', type=int, default=200, help='Reservations per worker (default: 200)')
+        parser.add_argument('--shards', type=int, nargs='+', default=[0, 4, 16], help='Shard counts to compare')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        per_thread = options['reservations']
+        admin, products, customer = create_benchmark_catalog(1, stock=threads * per_thread)
+        product = products[0]
+        try:
+            self.stdout.write(f"{'shards':>6} {'threads':>8} {'ok':>8} {'short':>6} {'res/s':>10}")
+            for shard_count in options['shards']:
+                rebalance_stock(product, shard_count=shard_count, total=threads * per_thread)
+                product.refresh_from_db()
+                ok, short, elapsed = self._run(product, threads, per_thread)
+                self.stdout.write(f"{shard_count:>6} {threads:>8} {ok:>8} {short:>6} {ok / elapsed:>10.1f}")
+        finally:
+            product.stock_shards.all().delete()
+            Product.objects.filter(pk=product.pk).delete()
+            Customer.objects.filter(pk=customer.pk).delete()
+            Category.objects.filter(owner_admin=admin).delete()
+            Admin.objects.filter(pk=admin.pk).delete()
+
+    def _run(self, product, threads, per_thread):
+        counts = {'ok': 0, 'short': 0}
+        lock = threading.Lock()
+        start_gate = threading.Barrier(threads + 1)
+
+        def worker():
+            ok = short = 0
+            try:
+                start_gate.wait()
+                for _ in range(per_thread):
+                    try:
+                        reserve_stock([(product, 1)])
+                        ok += 1
+                    except InsufficientStock:
+                        short += 1
+            finally:
+                connections.close_all()
+                with lock:
+                    counts['ok'] += ok
+                    counts['short'] += short
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        start_gate.wait()
+        started = time.perf_counter()
+        for thread in workers:
+            thread.join()
+        return counts['ok'], counts['short'], time.perf_counter() - started
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.rollups import find_customer_stats_drift, rebuild_customer_stats
+
+
+class Command(BaseCommand):
+    """
+    Compare the customer_stats table with the raw order and payment tables.
+    Exits non-zero when they disagree unless --repair rebuilds the drifted rows.
+    """
+    help = "Check per-customer aggregates against the order and payment tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer', type=int, action='append', dest='customers', help='Only check this customer id (repeatable)')
+        parser.add_argument('--repair', action='store_true', help='Rebuild the stats of customers that drifted')
+
+    def handle(self, *args, **options):
+        drift = find_customer_stats_drift(options['customers'])
+        for customer_id, field, stored, expected in drift:
+            self.stdout.write(f"customer {customer_id}: {field} is {stored}, expected {expected}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Customer stats are consistent"))
+            return
+
+        customer_ids = sorted({customer_id for customer_id, *_ in drift})
+        if options['repair']:
+            rebuild_customer_stats(customer_ids)
+            self.stdout.write(self.style.SUCCESS(f"Repaired stats for {len(customer_ids)} customers"))
+            return
+        raise CommandError(f"Customer stats drifted for {len(customer_ids)} customers")
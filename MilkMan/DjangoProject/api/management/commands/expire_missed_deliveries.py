@@ -0,0 +1,87 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import SubscriptionDelivery
+from api.rollups import apply_delivery_summary_delta, move_summary_status, summarize_deliveries
+
+
+class Command(BaseCommand):
+    """
+    Mark past-due scheduled deliveries as missed.
+
+    Intended to run periodically (cron / Task Scheduler). Rows are moved in
+    bounded batches so each UPDATE stays well below SQL Server's lock
+    escalation threshold (~5000 locks). Each batch locks its rows with
+    READPAST semantics, so concurrent runs skip each other's rows instead of
+    blocking or double-counting.
+    """
+    help = "Mark scheduled deliveries whose date has passed as missed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows updated per statement (default: 1000)',
+        )
+        parser.add_argument(
+            '--before',
+            help='Expire deliveries scheduled before this date (YYYY-MM-DD, default: today)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many deliveries would be expired',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be >= 1')
+
+        cutoff = timezone.localdate()
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be a date in YYYY-MM-DD format')
+
+        pending = SubscriptionDelivery.objects.filter(status='scheduled', scheduled_for__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{pending.count()} deliveries scheduled before {cutoff} would be marked missed")
+            return
+
+        total = 0
+        batches = 0
+        while True:
+            updated = self._expire_batch(pending, batch_size)
+            if updated is None:
+                break
+            total += updated
+            batches += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  batch {batches}: {updated} deliveries")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Marked {total} deliveries scheduled before {cutoff} as missed ({batches} batches)"
+        ))
+
+    def _expire_batch(self, pending, batch_size):
+        with transaction.atomic():
+            delivery_ids = list(
+                pending.select_for_update(skip_locked=True)
+                .order_by('scheduled_for', 'delivery_id')
+                .values_list('delivery_id', flat=True)[:batch_size]
+            )
+            if not delivery_ids:
+                return None
+            # Re-check the status so a delivery marked by an admin in the meantime is left alone.
+            batch = SubscriptionDelivery.objects.filter(delivery_id__in=delivery_ids, status='scheduled')
+            summary = summarize_deliveries(batch)
+            updated = batch.update(status='missed', delivered_at=None, updated_at=timezone.now())
+            apply_delivery_summary_delta(move_summary_status(summary, 'missed'))
+            return updated
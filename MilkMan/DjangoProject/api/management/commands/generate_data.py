@@ -0,0 +1,76 @@
+from time import perf_counter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.datagen import CUSTOMERS_PER_SCALE, generate
+from api.models import Admin
+
+from ._benchmark import BENCHMARK_PASSWORD
+
+
+class Command(BaseCommand):
+    """
+    Fill the database with synthetic customers, deliveries, orders and payments.
+
+    ``--scale`` counts thousands of customers (``--scale 3`` is about a
+    million rows with the default 365 days of history). The same ``--seed``
+    and ``--tag`` always produce the same data. All accounts share
+    ``--password``, hashed once; the admin logs in with the tag as username.
+
+    ``--workers`` splits the customers across processes, which only helps on
+    a server database; SQLite allows a single writer, so it always runs in
+    one process.
+    """
+    help = "Generate a synthetic data set for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help=f'Customers in thousands (default: 1 = {CUSTOMERS_PER_SCALE} customers)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        parser.add_argument('--days', type=int, default=365, help='Days of history per customer (default: 365)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT (default: 1000)')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes (default: 1)')
+        parser.add_argument('--tag', help='Admin username and name suffix for the data set (default: loadtest-<seed>)')
+        parser.add_argument('--password', default=BENCHMARK_PASSWORD,
+                            help=f'Password for the admin and every customer (default: {BENCHMARK_PASSWORD})')
+        parser.add_argument('--admin-role', default='super_admin', choices=[role for role, _ in Admin.ROLE_CHOICES])
+        parser.add_argument('--skip-rollups', action='store_true', help='Do not rebuild the reporting rollups')
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0 or options['days'] < 1:
+            raise CommandError('--scale must be positive and --days at least 1')
+        tag = options['tag'] or f"loadtest-{options['seed']}"
+        if Admin.objects.filter(username=tag).exists():
+            raise CommandError(f"A data set tagged '{tag}' already exists; pass a different --tag or --seed")
+
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stderr.write('SQLite allows a single writer; generating in one process')
+            workers = 1
+
+        started = perf_counter()
+        password_hash = make_password(options['password'])
+        written = [0]
+
+        def progress(chunk_rows):
+            written[0] += sum(chunk_rows.values())
+            elapsed = perf_counter() - started
+            self.stdout.write(f"  {written[0]:>10,} rows  {written[0] / elapsed:>9,.0f} rows/s", ending='\r')
+            self.stdout.flush()
+
+        result = generate(
+            scale=options['scale'], seed=options['seed'], days=options['days'], batch_size=options['batch_size'],
+            workers=workers, tag=tag, password_hash=password_hash, admin_role=options['admin_role'],
+            rebuild_rollups=not options['skip_rollups'], progress=progress,
+        )
+        self.stdout.write('')
+
+        total = sum(result['rows'].values())
+        for table, count in result['rows'].items():
+            self.stdout.write(f"  {table:<28} {count:>12,}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {total:,} rows in {result['seconds']:.1f}s ({total / result['seconds']:,.0f} rows/s) "
+            f"on {connection.vendor} with {workers} worker(s); admin login '{tag}'"
+        ))
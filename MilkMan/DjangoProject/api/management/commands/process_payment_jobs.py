@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.payments import claim_jobs, process_job, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    """
+    Payment worker. Run one or more of these next to the web processes when
+    PAYMENT_PROCESSING_MODE is 'queue'; workers never pick up the same job.
+    """
+    help = "Charge queued payments and settle their orders / subscriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per poll (default: 10)')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty (default: 1)')
+        parser.add_argument('--stale-after', type=int, default=300, help='Requeue running jobs locked longer than this many seconds (default: 300)')
+        parser.add_argument('--once', action='store_true', help='Drain the due jobs and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            requeued, failed = requeue_stale_jobs(options['stale_after'])
+            if requeued or failed:
+                self.stdout.write(self.style.WARNING(
+                    f"Requeued {requeued} stale payment jobs, failed {failed} out of attempts"
+                ))
+
+            jobs = claim_jobs(options['batch_size'])
+            for job in jobs:
+                try:
+                    process_job(job)
+                except Exception as exc:
+                    # process_job has already requeued it with backoff, or failed it.
+                    self.stderr.write(f"Payment job {job.job_id} failed: {exc}")
+            processed += len(jobs)
+
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} payment jobs"))
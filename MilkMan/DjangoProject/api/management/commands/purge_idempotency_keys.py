@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    """Delete expired Idempotency-Key records in bounded batches. Intended to run periodically."""
+    help = "Delete expired idempotency keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement (default: 1000)')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total = 0
+        while True:
+            key_ids = list(
+                IdempotencyKey.objects.filter(expires_at__lte=now)
+                .values_list('idempotency_key_id', flat=True)[:options['batch_size']]
+            )
+            if not key_ids:
+                break
+            deleted, _ = IdempotencyKey.objects.filter(idempotency_key_id__in=key_ids).delete()
+            total += deleted
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} expired idempotency keys"))
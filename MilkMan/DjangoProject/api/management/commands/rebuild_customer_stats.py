@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from api.rollups import rebuild_customer_stats
+
+
+class Command(BaseCommand):
+    """
+    Recompute the customer_stats table from paid orders and successful
+    subscription payments. Use it to backfill after the table is introduced.
+    """
+    help = "Rebuild per-customer order and spend aggregates"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer', type=int, action='append', dest='customers', help='Only rebuild this customer id (repeatable)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_customer_stats(options['customers'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt customer stats: {rows} rows"))
@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.rollups import rebuild_delivery_summary
+
+
+class Command(BaseCommand):
+    """
+    Recompute the delivery_daily_summary rollup from the delivery tables.
+
+    Use it to backfill after the table is introduced or to repair drift for a
+    date range. Without --start/--end the whole table is rebuilt.
+    """
+    help = "Rebuild the per-day delivery summary rollup"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('--start and --end must be dates in YYYY-MM-DD format')
+
+        rows = rebuild_delivery_summary(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt delivery summary: {rows} rows"))
@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.rollups import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    """
+    Recompute sales_daily_summary and product_daily_sales from the order and
+    payment tables.
+
+    Run it once after the tables are introduced to backfill history, or for a
+    date range to repair drift. Without --start/--end both tables are rebuilt.
+    """
+    help = "Rebuild the daily sales and product sales rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('--start and --end must be dates in YYYY-MM-DD format')
+
+        days, product_days = rebuild_sales_rollups(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt sales rollups: {days} daily rows, {product_days} product rows"
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.inventory import available_stock, rebalance_stock
+from api.models import Product
+
+
+class Command(BaseCommand):
+    """
+    Split a hot product's stock over N shard rows (or merge it back with --shards 0).
+
+    Running it again with the same shard count rebalances slots that have
+    drifted apart, which avoids spurious out-of-stock answers when one slot
+    runs dry while others still hold stock.
+    """
+    help = "Shard, rebalance or unshard a product's stock counter"
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--product', type=int, help='product_id')
+        target.add_argument('--sku', help='Product SKU')
+        parser.add_argument('--shards', type=int, default=None, help='Number of shards (0 to unshard; default: keep current)')
+
+    def handle(self, *args, **options):
+        lookup = {'product_id': options['product']} if options['product'] else {'sku': options['sku']}
+        product = Product.objects.filter(**lookup).first()
+        if not product:
+            raise CommandError('Product not found')
+        if options['shards'] is not None and options['shards'] < 0:
+            raise CommandError('--shards must be >= 0')
+
+        product = rebalance_stock(product, shard_count=options['shards'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{product.sku}: {available_stock(product)} units over {product.stock_shard_count} shards"
+        ))
@@ -0,0 +1,215 @@
+"""
+Prometheus metrics, served at ``/metrics``.
+
+``PrometheusMetricsMiddleware`` records a request count and latency
+histogram per route name, method and status, plus the SQL statements each
+request ran. Views and helpers record the domain metrics through the small
+``record_*`` / ``observe_*`` functions below (cache hits, delivery rebuilds,
+checkout outcomes, payment failures); ``api.sessions`` times the session
+backend.
+
+Under gunicorn every worker is its own process, so set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty directory before the workers start
+(``gunicorn.conf.py`` does this): each process then writes its samples to
+memory-mapped files there and ``/metrics`` sums them, whichever worker
+serves the scrape. Without it the metrics live in process memory, which is
+fine for ``runserver`` and single-process deployments.
+
+Recording a sample is a dict lookup and a lock-protected add, so the
+per-request cost is a few microseconds.
+"""
+import hmac
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .075, .1, .25, .5, .75, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+HTTP_METHODS = {'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+HTTP_REQUESTS = Counter(
+    'milkman_http_requests_total', 'HTTP requests by route name, method and status.',
+    ['route', 'method', 'status'],
+)
+HTTP_LATENCY = Histogram(
+    'milkman_http_request_duration_seconds', 'Time from the first middleware to the response.',
+    ['route', 'method'], buckets=LATENCY_BUCKETS,
+)
+HTTP_QUERIES = Histogram(
+    'milkman_http_request_db_queries', 'SQL statements executed per request.',
+    ['route'], buckets=QUERY_COUNT_BUCKETS,
+)
+DB_QUERIES = Counter('milkman_db_queries_total', 'SQL statements executed.', ['alias'])
+DB_QUERY_SECONDS = Counter('milkman_db_query_seconds_total', 'Time spent executing SQL statements.', ['alias'])
+CACHE_REQUESTS = Counter(
+    'milkman_cache_requests_total', 'Response cache lookups; hit ratio = hit / (hit + miss).',
+    ['cache', 'result'],
+)
+SESSION_LATENCY = Histogram(
+    'milkman_session_operation_duration_seconds', 'Session backend load/save/delete time.',
+    ['operation'], buckets=FAST_BUCKETS,
+)
+DELIVERY_REBUILD_SECONDS = Histogram(
+    'milkman_delivery_rebuild_duration_seconds',
+    'Future subscription delivery rebuilds (the _count series is the number of rebuilds).',
+    buckets=LATENCY_BUCKETS,
+)
+CHECKOUTS = Counter('milkman_checkouts_total', 'Cart checkouts by outcome.', ['outcome'])
+PAYMENT_FAILURES = Counter(
+    'milkman_payment_failures_total', 'Failed payments by kind (order / subscription) and reason.',
+    ['kind', 'reason'],
+)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+@contextmanager
+def observe_delivery_rebuild():
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        DELIVERY_REBUILD_SECONDS.observe(perf_counter() - started)
+
+
+def record_checkout(outcome):
+    CHECKOUTS.labels(outcome).inc()
+
+
+def record_payment_failure(kind, reason):
+    # Reasons come from validation and the gateway; cap their length to keep series names sane.
+    PAYMENT_FAILURES.labels(kind, (reason or 'unknown')[:64]).inc()
+
+
+class _RequestQueries:
+    """Tallies a request's statements per alias; published once when the response is ready."""
+
+    def __init__(self):
+        self.by_alias = {}
+        # Async views run a request's queries on several threads at once.
+        self.lock = threading.Lock()
+
+    def add(self, alias, seconds):
+        with self.lock:
+            tally = self.by_alias.setdefault(alias, [0, 0.0])
+            tally[0] += 1
+            tally[1] += seconds
+
+    def publish(self):
+        total = 0
+        for alias, (count, seconds) in self.by_alias.items():
+            DB_QUERIES.labels(alias).inc(count)
+            DB_QUERY_SECONDS.labels(alias).inc(seconds)
+            total += count
+        return total
+
+
+# Set by the middleware for the duration of a request. A ContextVar (rather than
+# per-connection wrappers) follows the request into sync_to_async worker threads.
+_request_queries = ContextVar('metrics_request_queries', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = perf_counter() - started
+        alias = context['connection'].alias
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.add(alias, seconds)
+        else:
+            # Queries outside a request (e.g. background threads) are counted as they go.
+            DB_QUERIES.labels(alias).inc()
+            DB_QUERY_SECONDS.labels(alias).inc(seconds)
+
+
+def _install_query_recorder(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class PrometheusMetricsMiddleware:
+    """Place first in MIDDLEWARE so the latency covers every other middleware. Sync and async capable."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_recorder, dispatch_uid='api.metrics.query_recorder')
+        for connection in connections.all(initialized_only=True):
+            _install_query_recorder(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = perf_counter()
+        queries = _RequestQueries()
+        token = _request_queries.set(queries)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, started, queries)
+        return response
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        queries = _RequestQueries()
+        token = _request_queries.set(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, started, queries)
+        return response
+
+    def _observe(self, request, response, started, queries):
+        # Route names, not paths, keep the label set bounded; unmatched URLs share one series.
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        method = request.method if request.method in HTTP_METHODS else 'other'
+        HTTP_LATENCY.labels(route, method).observe(perf_counter() - started)
+        HTTP_REQUESTS.labels(route, method, str(response.status_code)).inc()
+        HTTP_QUERIES.labels(route).observe(queries.publish())
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition, guarded by ``METRICS_AUTH_TOKEN``.
+
+    Without a token it is only served with DEBUG on: route names, error rates
+    and cache behaviour are not for the public internet.
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse('Set METRICS_AUTH_TOKEN to enable /metrics', status=403, content_type='text/plain')
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
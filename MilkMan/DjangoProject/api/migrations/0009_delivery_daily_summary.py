@@ -0,0 +1,42 @@
+# Generated by Django 4.2.10 on 2026-10-18 23:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_subscription_delivery_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryDailySummary',
+            fields=[
+                ('summary_id', models.AutoField(primary_key=True, serialize=False)),
+                ('summary_date', models.DateField()),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('delivered', 'Delivered'), ('missed', 'Missed'), ('skipped', 'Skipped')], max_length=20)),
+                ('delivery_count', models.IntegerField(default=0)),
+                ('item_quantity', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'delivery_daily_summary',
+                'ordering': ['summary_date', 'status'],
+            },
+        ),
+        migrations.AddField(
+            model_name='deliverydailysummary',
+            name='owner_admin',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='delivery_summaries', to='api.admin'),
+        ),
+        migrations.AddIndex(
+            model_name='deliverydailysummary',
+            index=models.Index(fields=['summary_date', 'status'], name='delivery_da_summary_1600ec_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='deliverydailysummary',
+            unique_together={('owner_admin', 'summary_date', 'status')},
+        ),
+    ]
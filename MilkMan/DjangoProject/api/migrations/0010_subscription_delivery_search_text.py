@@ -0,0 +1,50 @@
+# Generated by Django 4.2.10 on 2026-10-18 23:02
+
+from django.db import migrations, models
+
+
+def backfill_search_text(apps, schema_editor):
+    SubscriptionDelivery = apps.get_model('api', 'SubscriptionDelivery')
+    SubscriptionDeliveryItem = apps.get_model('api', 'SubscriptionDeliveryItem')
+
+    last_id = 0
+    while True:
+        batch = list(
+            SubscriptionDelivery.objects.filter(delivery_id__gt=last_id)
+            .select_related('customer')
+            .order_by('delivery_id')[:1000]
+        )
+        if not batch:
+            return
+        product_names = {}
+        for delivery_id, product_name in SubscriptionDeliveryItem.objects.filter(
+            delivery_id__in=[d.delivery_id for d in batch]
+        ).values_list('delivery_id', 'product_name'):
+            product_names.setdefault(delivery_id, set()).add(product_name)
+
+        for delivery in batch:
+            parts = [delivery.customer.first_name, delivery.customer.last_name]
+            parts += sorted(product_names.get(delivery.delivery_id, ()))
+            delivery.search_text = ' '.join(p.strip() for p in parts if p and p.strip()).lower()[:400]
+        SubscriptionDelivery.objects.bulk_update(batch, ['search_text'])
+        last_id = batch[-1].delivery_id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_delivery_daily_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscriptiondelivery',
+            name='search_text',
+            field=models.CharField(blank=True, default='', max_length=400),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='subscriptiondelivery',
+            index=models.Index(fields=['search_text'], name='subscriptio_search__4ed44a_idx'),
+        ),
+    ]
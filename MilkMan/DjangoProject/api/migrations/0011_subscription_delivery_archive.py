@@ -0,0 +1,73 @@
+# Generated by Django 4.2.10 on 2026-10-18 23:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_subscription_delivery_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriptionDeliveryArchive',
+            fields=[
+                ('delivery_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('scheduled_for', models.DateField()),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('delivered', 'Delivered'), ('missed', 'Missed'), ('skipped', 'Skipped')], max_length=20)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('notes', models.CharField(blank=True, max_length=255, null=True)),
+                ('search_text', models.CharField(blank=True, default='', max_length=400)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'subscription_delivery_archive',
+                'ordering': ['-scheduled_for'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubscriptionDeliveryItemArchive',
+            fields=[
+                ('delivery_item_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('product_name', models.CharField(max_length=200)),
+                ('quantity', models.IntegerField(default=1)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'subscription_delivery_item_archive',
+                'ordering': ['delivery_item_id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='subscriptiondeliveryitemarchive',
+            name='delivery',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='api.subscriptiondeliveryarchive'),
+        ),
+        migrations.AddField(
+            model_name='subscriptiondeliveryitemarchive',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_delivery_items', to='api.product'),
+        ),
+        migrations.AddField(
+            model_name='subscriptiondeliveryarchive',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_deliveries', to='api.customer'),
+        ),
+        migrations.AddField(
+            model_name='subscriptiondeliveryarchive',
+            name='subscription',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_deliveries', to='api.subscription'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriptiondeliveryarchive',
+            index=models.Index(fields=['customer', 'scheduled_for'], name='subscriptio_custome_cbd23f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriptiondeliveryarchive',
+            index=models.Index(fields=['scheduled_for', 'status'], name='subscriptio_schedul_07ce67_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.10 on 2026-10-18 23:07
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductStockShard',
+            fields=[
+                ('stock_shard_id', models.AutoField(primary_key=True, serialize=False)),
+                ('shard', models.IntegerField(validators=[django.core.validators.MinValueValidator(0)])),
+                ('quantity', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+            ],
+            options={
+                'db_table': 'product_stock_shard',
+                'ordering': ['product', 'shard'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('reservation_id', models.AutoField(primary_key=True, serialize=False)),
+                ('quantity', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('shard', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('held', 'Held'), ('committed', 'Committed'), ('released', 'Released')], default='held', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'stock_reservation',
+                'ordering': ['reservation_id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='stock_shard_count',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='stockreservation',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='api.order'),
+        ),
+        migrations.AddField(
+            model_name='stockreservation',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_reservations', to='api.product'),
+        ),
+        migrations.AddField(
+            model_name='productstockshard',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_shards', to='api.product'),
+        ),
+        migrations.AddIndex(
+            model_name='stockreservation',
+            index=models.Index(fields=['order', 'status'], name='stock_reser_order_i_291c71_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productstockshard',
+            unique_together={('product', 'shard')},
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.10 on 2026-10-18 23:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max, Sum
+
+
+def backfill_customer_stats(apps, schema_editor):
+    CustomerStats = apps.get_model('api', 'CustomerStats')
+    Order = apps.get_model('api', 'Order')
+    PaymentTransaction = apps.get_model('api', 'PaymentTransaction')
+
+    stats = {}
+    for row in (
+        Order.objects.filter(status='paid').order_by().values('customer_id')
+        .annotate(count=Count('order_id'), spend=Sum('total_amount'), last=Max('created_at'))
+    ):
+        stats[row['customer_id']] = CustomerStats(
+            customer_id=row['customer_id'], order_count=row['count'],
+            order_spend=row['spend'], last_order_at=row['last'],
+        )
+    for row in (
+        PaymentTransaction.objects.filter(status='success').order_by().values('customer_id')
+        .annotate(count=Count('payment_id'), spend=Sum('amount'))
+    ):
+        entry = stats.setdefault(row['customer_id'], CustomerStats(customer_id=row['customer_id']))
+        entry.subscription_payment_count = row['count']
+        entry.subscription_spend = row['spend']
+    for entry in stats.values():
+        entry.total_spend = entry.order_spend + entry.subscription_spend
+    CustomerStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_order_customer_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerStats',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.customer')),
+                ('order_count', models.IntegerField(default=0)),
+                ('order_spend', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('subscription_payment_count', models.IntegerField(default=0)),
+                ('subscription_spend', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_spend', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'customer_stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='customerstats',
+            index=models.Index(fields=['total_spend'], name='customer_st_total_s_0d33ee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerstats',
+            index=models.Index(fields=['last_order_at'], name='customer_st_last_or_80405b_idx'),
+        ),
+        migrations.RunPython(backfill_customer_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.10 on 2026-10-18 23:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_customer_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductDailySales',
+            fields=[
+                ('product_sales_id', models.AutoField(primary_key=True, serialize=False)),
+                ('summary_date', models.DateField()),
+                ('units_sold', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'product_daily_sales',
+                'ordering': ['summary_date', 'product'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesDailySummary',
+            fields=[
+                ('summary_id', models.AutoField(primary_key=True, serialize=False)),
+                ('summary_date', models.DateField()),
+                ('order_count', models.IntegerField(default=0)),
+                ('order_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('failed_order_payment_count', models.IntegerField(default=0)),
+                ('subscription_payment_count', models.IntegerField(default=0)),
+                ('subscription_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('failed_subscription_payment_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'sales_daily_summary',
+                'ordering': ['summary_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='salesdailysummary',
+            name='owner_admin',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sales_summaries', to='api.admin'),
+        ),
+        migrations.AddField(
+            model_name='productdailysales',
+            name='owner_admin',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_sales', to='api.admin'),
+        ),
+        migrations.AddField(
+            model_name='productdailysales',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='api.product'),
+        ),
+        migrations.AddIndex(
+            model_name='salesdailysummary',
+            index=models.Index(fields=['summary_date'], name='sales_daily_summary_cdfa17_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='salesdailysummary',
+            unique_together={('owner_admin', 'summary_date')},
+        ),
+        migrations.AddIndex(
+            model_name='productdailysales',
+            index=models.Index(fields=['summary_date', 'product'], name='product_dai_summary_55df76_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productdailysales',
+            unique_together={('owner_admin', 'product', 'summary_date')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-19 00:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentjob',
+            name='charge_outcome',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.10 on 2026-10-19 00:31
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_unowned_duplicates(apps, schema_editor):
+    """Fold duplicate owner-less rows into one before the constraint is added."""
+    DeliveryDailySummary = apps.get_model('api', 'DeliveryDailySummary')
+    unowned = DeliveryDailySummary.objects.filter(owner_admin__isnull=True)
+    duplicates = (
+        unowned.values('summary_date', 'status')
+        .annotate(rows=Count('summary_id'), deliveries=Sum('delivery_count'), quantity=Sum('item_quantity'))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        rows = unowned.filter(summary_date=group['summary_date'], status=group['status']).order_by('summary_id')
+        keep = rows.first()
+        rows.exclude(summary_id=keep.summary_id).delete()
+        rows.filter(summary_id=keep.summary_id).update(
+            delivery_count=group['deliveries'], item_quantity=group['quantity'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_payment_job_charge_outcome'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_unowned_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='deliverydailysummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('owner_admin__isnull', True)), fields=('summary_date', 'status'), name='delivery_summary_unowned_uniq'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.10 on 2026-10-19 00:40
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+SALES_COUNTERS = [
+    'order_count', 'order_revenue', 'failed_order_payment_count',
+    'subscription_payment_count', 'subscription_revenue', 'failed_subscription_payment_count',
+]
+PRODUCT_COUNTERS = ['units_sold', 'revenue']
+
+
+def _merge(model, pk, group_fields, counters):
+    unowned = model.objects.filter(owner_admin__isnull=True)
+    duplicates = (
+        unowned.values(*group_fields)
+        .annotate(rows=Count(pk), **{f'total_{field}': Sum(field) for field in counters})
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        rows = unowned.filter(**{field: group[field] for field in group_fields}).order_by(pk)
+        keep = rows.first()
+        rows.exclude(pk=keep.pk).delete()
+        rows.filter(pk=keep.pk).update(**{field: group[f'total_{field}'] for field in counters})
+
+
+def merge_unowned_duplicates(apps, schema_editor):
+    """Fold duplicate owner-less rows into one before the constraints are added."""
+    _merge(apps.get_model('api', 'SalesDailySummary'), 'summary_id', ['summary_date'], SALES_COUNTERS)
+    _merge(apps.get_model('api', 'ProductDailySales'), 'product_sales_id', ['product', 'summary_date'], PRODUCT_COUNTERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_delivery_summary_unowned_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_unowned_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='salesdailysummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('owner_admin__isnull', True)), fields=('summary_date',), name='sales_summary_unowned_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='productdailysales',
+            constraint=models.UniqueConstraint(condition=models.Q(('owner_admin__isnull', True)), fields=('product', 'summary_date'), name='product_sales_unowned_uniq'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.10 on 2026-10-19 01:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_sales_rollups_unowned_unique'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='subscriptiondelivery',
+            name='subscriptio_search__4ed44a_idx',
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.core.validators import MinValueValidator, MaxValueValidator, RegexVa
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password
 import uuid
+from decimal import Decimal
 
 # ======================== ADMIN MODEL ========================
 class Admin(models.Model):
@@ -219,6 +220,8 @@ class Product(models.Model):
     status = models.CharField(max_length=20, choices=PRODUCT_STATUS_CHOICES, default='active')
     is_featured = models.BooleanField(default=False)
     subscription_only = models.BooleanField(default=False)
+    # Number of ProductStockShard rows holding this product's stock (0 = stock lives in quantity_in_stock only).
+    stock_shard_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     rating = models.FloatField(
         validators=[MinValueValidator(0), MaxValueValidator(5)],
         null=True,
@@ -241,6 +244,23 @@ class Product(models.Model):
         return f"{self.name} (SKU: {self.sku})"
 
 
+# ======================== PRODUCT STOCK SHARD MODEL ========================
+class ProductStockShard(models.Model):
+    """One slot of a hot product's stock; available stock is quantity_in_stock plus all slots."""
+    stock_shard_id = models.AutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_shards')
+    shard = models.IntegerField(validators=[MinValueValidator(0)])
+    quantity = models.IntegerField(validators=[MinValueValidator(0)], default=0)
+
+    class Meta:
+        db_table = 'product_stock_shard'
+        ordering = ['product', 'shard']
+        unique_together = ('product', 'shard')
+
+    def __str__(self):
+        return f"{self.product_id}#{self.shard}: {self.quantity}"
+
+
 # ======================== SUBSCRIPTION DELIVERY BASKET ========================
 class SubscriptionBasketItem(models.Model):
     """Recurring delivery item attached to the customer's active subscription period."""
@@ -285,6 +305,10 @@ class SubscriptionDelivery(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
     delivered_at = models.DateTimeField(null=True, blank=True)
     notes = models.CharField(max_length=255, null=True, blank=True)
+    # Denormalized "customer name + product names" used by admin search instead of joining items.
+    # Not indexed: search is LIKE '%term%', which no B-tree index serves. The win is scanning
+    # one table without the joins through customer/items and the DISTINCT they needed.
+    search_text = models.CharField(max_length=400, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -300,6 +324,13 @@ class SubscriptionDelivery(models.Model):
     def __str__(self):
         return f"Delivery {self.delivery_id} {self.customer_id} {self.scheduled_for}"
 
+    @staticmethod
+    def build_search_text(first_name, last_name, product_names):
+        """Lower-cased search blob, truncated to fit the column."""
+        parts = [first_name or '', last_name or ''] + sorted(set(product_names))
+        text = ' '.join(part.strip() for part in parts if part and part.strip()).lower()
+        return text[:400]
+
 
 class SubscriptionDeliveryItem(models.Model):
     """Snapshot items for a specific subscription delivery day."""
@@ -318,6 +349,50 @@ class SubscriptionDeliveryItem(models.Model):
     def __str__(self):
         return f"{self.delivery_id} - {self.product_name}"
 
+# ======================== SUBSCRIPTION DELIVERY ARCHIVE ========================
+class SubscriptionDeliveryArchive(models.Model):
+    """Cold copy of completed deliveries moved out of subscription_delivery by archive_deliveries."""
+    delivery_id = models.IntegerField(primary_key=True)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='archived_deliveries')
+    subscription = models.ForeignKey(Subscription, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_deliveries')
+    scheduled_for = models.DateField()
+    status = models.CharField(max_length=20, choices=SubscriptionDelivery.STATUS_CHOICES)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    notes = models.CharField(max_length=255, null=True, blank=True)
+    search_text = models.CharField(max_length=400, blank=True, default='')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'subscription_delivery_archive'
+        ordering = ['-scheduled_for']
+        indexes = [
+            models.Index(fields=['customer', 'scheduled_for']),
+            models.Index(fields=['scheduled_for', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Archived delivery {self.delivery_id} {self.customer_id} {self.scheduled_for}"
+
+
+class SubscriptionDeliveryItemArchive(models.Model):
+    """Cold copy of the items of an archived delivery."""
+    delivery_item_id = models.IntegerField(primary_key=True)
+    delivery = models.ForeignKey(SubscriptionDeliveryArchive, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name='archived_delivery_items')
+    product_name = models.CharField(max_length=200)
+    quantity = models.IntegerField(default=1)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'subscription_delivery_item_archive'
+        ordering = ['delivery_item_id']
+
+    def __str__(self):
+        return f"{self.delivery_id} - {self.product_name}"
+
+
 # ======================== PAYMENT TRANSACTION MODEL ========================
 class PaymentTransaction(models.Model):
     """Payment records for user subscription purchases"""
@@ -380,6 +455,9 @@ class Order(models.Model):
     class Meta:
         db_table = 'order'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', 'created_at']),
+        ]
 
 
 class OrderItem(models.Model):
@@ -428,3 +506,216 @@ class OrderPayment(models.Model):
         if not self.transaction_reference:
             self.transaction_reference = f"ORDPAY-{uuid.uuid4().hex[:12].upper()}"
         super().save(*args, **kwargs)
+
+
+class PaymentJob(models.Model):
+    """Queued gateway charge for a pending PaymentTransaction or OrderPayment, run by process_payment_jobs."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    job_id = models.AutoField(primary_key=True)
+    payment_transaction = models.ForeignKey(PaymentTransaction, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    order_payment = models.ForeignKey(OrderPayment, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    # Masked payment details only (card last four, UPI id, bank name); never card numbers or CVVs.
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.CharField(max_length=255, null=True, blank=True)
+    # Gateway answer ({"success", "failure_reason"}), stored before it is applied so a retry never charges again.
+    charge_outcome = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'payment_job'
+        ordering = ['job_id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"Payment job {self.job_id} ({self.status})"
+
+
+class StockReservation(models.Model):
+    """Stock taken for an order line; released back to its source if the order's payment fails."""
+    STATUS_CHOICES = [
+        ('held', 'Held'),
+        ('committed', 'Committed'),
+        ('released', 'Released'),
+    ]
+
+    reservation_id = models.AutoField(primary_key=True)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name='stock_reservations')
+    quantity = models.IntegerField(validators=[MinValueValidator(1)])
+    # Shard the stock was taken from; null means Product.quantity_in_stock.
+    shard = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stock_reservation'
+        ordering = ['reservation_id']
+        indexes = [
+            models.Index(fields=['order', 'status']),
+        ]
+
+
+# ======================== IDEMPOTENCY KEY MODEL ========================
+class IdempotencyKey(models.Model):
+    """Outcome of a POST sent with an Idempotency-Key header, replayed to retries until it expires."""
+    STATUS_CHOICES = [
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+    ]
+
+    idempotency_key_id = models.AutoField(primary_key=True)
+    scope = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='processing')
+    response_status = models.IntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'idempotency_key'
+        unique_together = ('scope', 'key')
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key} ({self.status})"
+
+
+# ======================== REPORTING ROLLUP MODELS ========================
+class DeliveryDailySummary(models.Model):
+    """Per-day delivery counts by owner admin and status, maintained incrementally."""
+    summary_id = models.AutoField(primary_key=True)
+    owner_admin = models.ForeignKey(Admin, on_delete=models.CASCADE, null=True, blank=True, related_name='delivery_summaries')
+    summary_date = models.DateField()
+    status = models.CharField(max_length=20, choices=SubscriptionDelivery.STATUS_CHOICES)
+    delivery_count = models.IntegerField(default=0)
+    item_quantity = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'delivery_daily_summary'
+        ordering = ['summary_date', 'status']
+        unique_together = ('owner_admin', 'summary_date', 'status')
+        constraints = [
+            # NULLs are distinct in unique_together, so rows without an owner need their own constraint.
+            models.UniqueConstraint(
+                fields=['summary_date', 'status'], condition=models.Q(owner_admin__isnull=True),
+                name='delivery_summary_unowned_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['summary_date', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.summary_date} {self.status}: {self.delivery_count}"
+
+
+class CustomerStats(models.Model):
+    """
+    Lifetime purchase aggregates per customer, maintained incrementally.
+
+    Only settled money counts: orders in ``paid`` status and successful
+    subscription payments.
+    """
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    order_count = models.IntegerField(default=0)
+    order_spend = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    subscription_payment_count = models.IntegerField(default=0)
+    subscription_spend = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_spend = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    last_order_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'customer_stats'
+        indexes = [
+            models.Index(fields=['total_spend']),
+            models.Index(fields=['last_order_at']),
+        ]
+
+    @property
+    def average_basket_value(self):
+        if not self.order_count:
+            return Decimal('0.00')
+        return (self.order_spend / self.order_count).quantize(Decimal('0.01'))
+
+    def __str__(self):
+        return f"Stats for customer {self.customer_id}"
+
+
+class SalesDailySummary(models.Model):
+    """Per-day order and subscription revenue by owner admin, maintained incrementally."""
+    summary_id = models.AutoField(primary_key=True)
+    owner_admin = models.ForeignKey(Admin, on_delete=models.CASCADE, null=True, blank=True, related_name='sales_summaries')
+    summary_date = models.DateField()
+    order_count = models.IntegerField(default=0)
+    order_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    failed_order_payment_count = models.IntegerField(default=0)
+    subscription_payment_count = models.IntegerField(default=0)
+    subscription_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    failed_subscription_payment_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'sales_daily_summary'
+        ordering = ['summary_date']
+        unique_together = ('owner_admin', 'summary_date')
+        constraints = [
+            # NULLs are distinct in unique_together, so rows without an owner need their own constraint.
+            models.UniqueConstraint(
+                fields=['summary_date'], condition=models.Q(owner_admin__isnull=True),
+                name='sales_summary_unowned_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['summary_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.summary_date}: {self.order_count} orders"
+
+
+class ProductDailySales(models.Model):
+    """Per-day units sold and revenue for each product by owner admin, maintained incrementally."""
+    product_sales_id = models.AutoField(primary_key=True)
+    owner_admin = models.ForeignKey(Admin, on_delete=models.CASCADE, null=True, blank=True, related_name='product_sales')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    summary_date = models.DateField()
+    units_sold = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'product_daily_sales'
+        ordering = ['summary_date', 'product']
+        unique_together = ('owner_admin', 'product', 'summary_date')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'summary_date'], condition=models.Q(owner_admin__isnull=True),
+                name='product_sales_unowned_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['summary_date', 'product']),
+        ]
+
+    def __str__(self):
+        return f"{self.summary_date} product {self.product_id}: {self.units_sold}"
@@ -0,0 +1,320 @@
+"""
+Asynchronous payment processing.
+
+``user_subscribe`` and ``user_cart_checkout`` validate payment details
+locally, write a pending PaymentTransaction / OrderPayment and a PaymentJob,
+and return. ``process_payment_jobs`` workers claim queued jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` (so any number of workers can run),
+charge the configured gateway and move the payment ``pending -> success``
+or ``pending -> failed``. Transient gateway errors and any other error
+before the outcome is applied are retried with exponential backoff up to
+``PAYMENT_JOB_MAX_ATTEMPTS``; jobs out of attempts are marked failed and
+their payment is settled with them, releasing any held stock. ``inline``
+jobs have no worker to retry them, so they settle on the first error.
+
+The gateway is charged with the job id as idempotency key, and its answer
+is stored on the job before it is applied, so a retried or stale-requeued
+job applies the recorded answer instead of charging again. Outcomes are
+applied with conditional updates on ``status='pending'``, so a job that is
+retried after a crash can never apply a result twice.
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .deliveries import rebuild_future_subscription_deliveries
+from .inventory import release_order_reservations
+from .metrics import record_payment_failure
+from .models import Customer, Order, OrderPayment, PaymentJob, PaymentTransaction, StockReservation
+from .rollups import (
+    record_order_paid, record_order_payment_failed, record_order_sale, record_subscription_payment,
+    record_subscription_payment_failed, record_subscription_sale,
+)
+
+GATEWAY_UNAVAILABLE_REASON = "Payment gateway unavailable"
+
+
+class GatewayError(Exception):
+    """Transient gateway failure (timeout, 5xx); the job is retried."""
+
+
+class LocalGateway:
+    """
+    Stand-in gateway for development and tests.
+
+    Waits ``PAYMENT_GATEWAY_LATENCY_MS`` per charge, raises GatewayError for a
+    ``PAYMENT_GATEWAY_ERROR_RATE`` share of calls and declines cards ending in 0000.
+    It accepts an idempotency key like a real gateway but keeps no record of
+    it; the outcome stored on the job is what prevents a second charge.
+    """
+
+    def __init__(self, latency_ms=None, error_rate=None):
+        self.latency_ms = settings.PAYMENT_GATEWAY_LATENCY_MS if latency_ms is None else latency_ms
+        self.error_rate = settings.PAYMENT_GATEWAY_ERROR_RATE if error_rate is None else error_rate
+
+    def charge(self, amount, currency, payment_method, details, idempotency_key=None):
+        """Return (success, failure_reason)."""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            raise GatewayError("Simulated gateway timeout")
+        if payment_method == 'card' and (details.get('card_last4') or '').endswith('0000'):
+            return False, "Payment declined by gateway"
+        return True, None
+
+
+def get_gateway():
+    return import_string(settings.PAYMENT_GATEWAY_CLASS)()
+
+
+def masked_payment_details(payment_method, payload):
+    """The part of the request a worker needs; card numbers and CVVs are never stored."""
+    if payment_method == 'card':
+        card_number = (payload.get("card_number") or "").replace(" ", "")
+        return {"card_last4": card_number[-4:]}
+    if payment_method == 'upi':
+        return {"upi_id": (payload.get("upi_id") or "").strip()}
+    if payment_method == 'netbanking':
+        return {"bank_name": (payload.get("bank_name") or "").strip()}
+    return {}
+
+
+def submit_payment(payment, payment_method, payload):
+    """
+    Queue a gateway charge for a pending PaymentTransaction or OrderPayment.
+
+    In ``inline`` mode the job is processed before returning, so callers can
+    re-read the payment and answer with the final outcome.
+    """
+    job = PaymentJob.objects.create(
+        payment_transaction=payment if isinstance(payment, PaymentTransaction) else None,
+        order_payment=payment if isinstance(payment, OrderPayment) else None,
+        payload={"payment_method": payment_method, **masked_payment_details(payment_method, payload)},
+    )
+    if settings.PAYMENT_PROCESSING_MODE == 'inline':
+        job = claim_job(job.job_id)
+        if job:
+            process_job(job)
+    return job
+
+
+# ======================== WORKER ========================
+def _claim(queryset, limit):
+    now = timezone.now()
+    with transaction.atomic():
+        job_ids = list(
+            queryset.select_for_update(skip_locked=True)
+            .filter(status='queued', available_at__lte=now)
+            .order_by('available_at', 'job_id')
+            .values_list('job_id', flat=True)[:limit]
+        )
+        if job_ids:
+            PaymentJob.objects.filter(job_id__in=job_ids).update(
+                status='running', locked_at=now, attempts=F('attempts') + 1, updated_at=now,
+            )
+    if not job_ids:
+        return []
+    return list(
+        PaymentJob.objects.filter(job_id__in=job_ids)
+        .select_related('payment_transaction', 'order_payment')
+        .order_by('available_at', 'job_id')
+    )
+
+
+def claim_jobs(limit):
+    """Mark up to ``limit`` due jobs as running for this worker."""
+    return _claim(PaymentJob.objects.all(), limit)
+
+
+def claim_job(job_id):
+    jobs = _claim(PaymentJob.objects.filter(job_id=job_id), 1)
+    return jobs[0] if jobs else None
+
+
+def requeue_stale_jobs(stale_after_seconds):
+    """
+    Put back jobs whose worker died mid-charge; returns (requeued, failed).
+
+    Jobs that have used PAYMENT_JOB_MAX_ATTEMPTS are failed and their payment
+    settled instead, so a job that keeps killing its worker stops coming back.
+    """
+    now = timezone.now()
+    stale = PaymentJob.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=stale_after_seconds))
+    failed = 0
+    for job in stale.filter(attempts__gte=settings.PAYMENT_JOB_MAX_ATTEMPTS).select_related(
+        'payment_transaction', 'order_payment',
+    ):
+        # Claim the job first, so two workers never settle it both.
+        if PaymentJob.objects.filter(job_id=job.job_id, status='running').update(status='failed', updated_at=now):
+            _fail_job(job, "Worker stopped before finishing the job")
+            failed += 1
+    requeued = stale.update(status='queued', locked_at=None, updated_at=now)
+    return requeued, failed
+
+
+def process_job(job):
+    """
+    Charge the gateway for a claimed job and apply the outcome.
+
+    Unexpected errors put the job back with backoff (or fail it once it is out
+    of attempts) and are re-raised for the worker to log.
+    """
+    try:
+        _process_job(job)
+    except Exception as exc:
+        _retry_or_fail(job, exc)
+        raise
+
+
+def _process_job(job):
+    payment = job.payment_transaction or job.order_payment
+    if payment.status != 'pending':
+        _finish_job(job, 'completed')
+        return
+
+    gave_up = False
+    if job.charge_outcome is not None:
+        # Charged on an earlier attempt that died before applying the answer.
+        success, failure_reason = job.charge_outcome['success'], job.charge_outcome['failure_reason']
+    else:
+        try:
+            success, failure_reason = get_gateway().charge(
+                payment.amount, payment.currency, job.payload.get('payment_method'), job.payload,
+                idempotency_key=f"payment-job-{job.job_id}",
+            )
+        except GatewayError as exc:
+            if _can_retry(job):
+                _retry_or_fail(job, exc)
+                return
+            success, failure_reason, gave_up = False, GATEWAY_UNAVAILABLE_REASON, True
+            job.last_error = str(exc)[:255]
+        else:
+            job.charge_outcome = {"success": success, "failure_reason": failure_reason}
+            PaymentJob.objects.filter(job_id=job.job_id).update(
+                charge_outcome=job.charge_outcome, updated_at=timezone.now(),
+            )
+
+    with transaction.atomic():
+        _apply_outcome(job, success, failure_reason)
+        _finish_job(job, 'failed' if gave_up else 'completed')
+
+
+def _apply_outcome(job, success, failure_reason):
+    if job.payment_transaction_id:
+        apply_subscription_payment_result(job.payment_transaction, success, failure_reason)
+    else:
+        apply_order_payment_result(job.order_payment, success, failure_reason)
+
+
+def _can_retry(job):
+    # Inline jobs have no worker to pick a requeued job up, so they settle on the first error.
+    return settings.PAYMENT_PROCESSING_MODE != 'inline' and job.attempts < settings.PAYMENT_JOB_MAX_ATTEMPTS
+
+
+def _retry_or_fail(job, exc):
+    """Requeue with exponential backoff, or fail the job once it cannot be retried."""
+    if _can_retry(job):
+        now = timezone.now()
+        PaymentJob.objects.filter(job_id=job.job_id).update(
+            status='queued',
+            locked_at=None,
+            available_at=now + timedelta(seconds=2 ** job.attempts),
+            last_error=str(exc)[:255],
+            updated_at=now,
+        )
+    else:
+        _fail_job(job, exc)
+
+
+def _fail_job(job, error):
+    """
+    Mark a job failed and settle its payment in the same transaction, so the
+    order's stock is released instead of staying held.
+
+    A charge the gateway already answered is settled with that answer; otherwise
+    the payment fails as gateway unavailable. If settling itself raises, the job
+    is still failed and the error kept on it for an operator.
+    """
+    if job.charge_outcome is not None:
+        success, failure_reason = job.charge_outcome['success'], job.charge_outcome['failure_reason']
+    else:
+        success, failure_reason = False, GATEWAY_UNAVAILABLE_REASON
+    job.last_error = str(error)[:255]
+    try:
+        with transaction.atomic():
+            _apply_outcome(job, success, failure_reason)
+            _finish_job(job, 'failed')
+    except Exception as exc:
+        job.last_error = f"Could not settle the payment: {exc}"[:255]
+        _finish_job(job, 'failed')
+
+
+def _finish_job(job, job_status):
+    PaymentJob.objects.filter(job_id=job.job_id).update(
+        status=job_status, locked_at=None, last_error=job.last_error, updated_at=timezone.now(),
+    )
+
+
+# ======================== OUTCOMES ========================
+def apply_subscription_payment_result(payment_transaction, success, failure_reason=None):
+    """Settle a pending subscription payment; activates the plan on success."""
+    now = timezone.now()
+    with transaction.atomic():
+        settled = PaymentTransaction.objects.filter(pk=payment_transaction.pk, status='pending').update(
+            status='success' if success else 'failed',
+            paid_at=now if success else None,
+            failure_reason=None if success else failure_reason,
+        )
+        if not settled:
+            return False
+        if not success:
+            record_subscription_payment_failed(payment_transaction)
+            transaction.on_commit(lambda: record_payment_failure('subscription', failure_reason))
+            return True
+        record_subscription_payment(payment_transaction)
+        record_subscription_sale(payment_transaction)
+
+        subscription = payment_transaction.subscription
+        customer = Customer.objects.select_for_update().get(pk=payment_transaction.customer_id)
+        customer.subscription = subscription
+        customer.subscription_start_date = now
+        customer.subscription_end_date = now + timedelta(days=subscription.duration_days)
+        customer.save(update_fields=['subscription', 'subscription_start_date', 'subscription_end_date'])
+
+        rebuild_future_subscription_deliveries(customer, start_date=customer.subscription_start_date.date())
+    return True
+
+
+def apply_order_payment_result(order_payment, success, failure_reason=None):
+    """Settle a pending order payment; commits the held stock or returns it."""
+    now = timezone.now()
+    with transaction.atomic():
+        settled = OrderPayment.objects.filter(pk=order_payment.pk, status='pending').update(
+            status='success' if success else 'failed',
+            paid_at=now if success else None,
+            failure_reason=None if success else failure_reason,
+        )
+        if not settled:
+            return False
+        Order.objects.filter(pk=order_payment.order_id).update(
+            status='paid' if success else 'failed', updated_at=now,
+        )
+        order = Order.objects.select_related('customer').get(pk=order_payment.order_id)
+        if not success:
+            record_order_payment_failed(order)
+            transaction.on_commit(lambda: record_payment_failure('order', failure_reason))
+        else:
+            record_order_paid(order)
+            record_order_sale(order)
+            StockReservation.objects.filter(order_id=order_payment.order_id, status='held').update(
+                status='committed', updated_at=now,
+            )
+    if not success:
+        release_order_reservations(order_payment.order)
+    return True
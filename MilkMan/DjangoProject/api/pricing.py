@@ -0,0 +1,5 @@
+"""Money constants shared by checkout (api/views.py) and the data generator (api/datagen.py)."""
+from decimal import Decimal
+
+ORDER_TAX_RATE = Decimal('0.05')
+CENTS = Decimal('0.01')
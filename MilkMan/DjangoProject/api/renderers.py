@@ -0,0 +1,74 @@
+"""
+orjson-backed JSON renderer and parser for the REST API.
+
+Selected with ``JSON_BACKEND=orjson`` (see settings). The output is the same
+bytes DRF's JSONRenderer produces: compact separators, unescaped UTF-8,
+U+2028/U+2029 escaped, and every value the standard library cannot encode
+(datetimes with a trailing ``Z``, dates, times, Decimals, lazy strings,
+querysets...) goes through DRF's own ``JSONEncoder.default``. Serializers
+already turn model Decimals and timestamps into strings, so most payloads
+never reach that hook and are encoded entirely in C.
+
+Anything orjson cannot handle the same way falls back to the pure-Python
+classes: indented output (``; indent=4`` and the browsable API), integers
+beyond 64 bits in responses, non-UTF-8 request bodies and invalid JSON,
+which therefore keeps DRF's error messages. Without orjson installed both
+classes behave exactly like DRF's. Known differences: floats below 1e-4 or
+from 1e16 up are written in another notation for the same value,
+NaN/Infinity render as ``null`` instead of raising, and request integers
+beyond 64 bits parse as floats.
+"""
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pure-Python fallback
+    orjson = None
+
+# Datetimes and dataclasses are passed to DRF's encoder so they render exactly as before.
+_DUMPS_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson else 0
+)
+_default = JSONEncoder().default
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(data, default=_default, option=_DUMPS_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Big integers, lone surrogates, unsupported types: let the standard library decide.
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # Re-parse for DRF's ParseError message (or the input only the stdlib accepts).
+            return super().parse(io.BytesIO(body), media_type, parser_context)
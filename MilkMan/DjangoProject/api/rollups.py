@@ -0,0 +1,387 @@
+"""
+Incrementally maintained reporting rollups.
+
+Views and management commands call these helpers in the same transaction as
+the write they summarize, so rollup reads never have to scan the raw tables.
+The ``rebuild_*`` functions recompute a date range from scratch and are used
+for backfills and to repair drift.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Max, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    CustomerStats, DeliveryDailySummary, Order, OrderItem, OrderPayment, PaymentTransaction,
+    ProductDailySales, SalesDailySummary, SubscriptionDelivery, SubscriptionDeliveryArchive,
+)
+
+
+# ======================== DELIVERY DAILY SUMMARY ========================
+def summarize_deliveries(queryset):
+    """
+    Return {(owner_admin_id, date, status): [delivery_count, item_quantity]} for a
+    SubscriptionDelivery or SubscriptionDeliveryArchive queryset.
+    """
+    rows = (
+        queryset.order_by()
+        .values('customer__owner_admin_id', 'scheduled_for', 'status')
+        .annotate(deliveries=Count('delivery_id', distinct=True), quantity=Sum('items__quantity'))
+    )
+    summary = defaultdict(lambda: [0, 0])
+    for row in rows:
+        key = (row['customer__owner_admin_id'], row['scheduled_for'], row['status'])
+        summary[key][0] += row['deliveries']
+        summary[key][1] += row['quantity'] or 0
+    return summary
+
+
+def diff_summaries(after, before):
+    """Delta that turns the ``before`` summary into the ``after`` summary."""
+    delta = defaultdict(lambda: [0, 0])
+    for key, (count, quantity) in after.items():
+        delta[key][0] += count
+        delta[key][1] += quantity
+    for key, (count, quantity) in before.items():
+        delta[key][0] -= count
+        delta[key][1] -= quantity
+    return delta
+
+
+def move_summary_status(summary, new_status):
+    """Delta for moving every delivery in ``summary`` to ``new_status``."""
+    delta = defaultdict(lambda: [0, 0])
+    for (owner_id, day, status), (count, quantity) in summary.items():
+        if status == new_status:
+            continue
+        delta[(owner_id, day, status)][0] -= count
+        delta[(owner_id, day, status)][1] -= quantity
+        delta[(owner_id, day, new_status)][0] += count
+        delta[(owner_id, day, new_status)][1] += quantity
+    return delta
+
+
+def apply_delivery_summary_delta(delta):
+    """Add a delta to the summary table with conditional UPDATEs, inserting missing rows."""
+    now = timezone.now()
+    for (owner_id, day, status), (count, quantity) in delta.items():
+        if not count and not quantity:
+            continue
+        rows = DeliveryDailySummary.objects.filter(owner_admin_id=owner_id, summary_date=day, status=status)
+        changes = {
+            'delivery_count': F('delivery_count') + count,
+            'item_quantity': F('item_quantity') + quantity,
+            'updated_at': now,
+        }
+        if rows.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                DeliveryDailySummary.objects.create(
+                    owner_admin_id=owner_id,
+                    summary_date=day,
+                    status=status,
+                    delivery_count=count,
+                    item_quantity=quantity,
+                )
+        except IntegrityError:
+            # Another writer inserted the row first; fold our delta into it.
+            rows.update(**changes)
+
+
+def record_delivery_status_change(delivery, previous_status):
+    """Move a single delivery between status buckets after its status changed."""
+    if previous_status == delivery.status:
+        return
+    quantity = sum(item.quantity for item in delivery.items.all())
+    owner_id = delivery.customer.owner_admin_id
+    apply_delivery_summary_delta({
+        (owner_id, delivery.scheduled_for, previous_status): [-1, -quantity],
+        (owner_id, delivery.scheduled_for, delivery.status): [1, quantity],
+    })
+
+
+def rebuild_delivery_summary(start=None, end=None):
+    """Recompute summary rows for an optional date range from the live and archived delivery tables."""
+    summaries = DeliveryDailySummary.objects.all()
+    deliveries = SubscriptionDelivery.objects.all()
+    archived = SubscriptionDeliveryArchive.objects.all()
+    if start:
+        summaries = summaries.filter(summary_date__gte=start)
+        deliveries = deliveries.filter(scheduled_for__gte=start)
+        archived = archived.filter(scheduled_for__gte=start)
+    if end:
+        summaries = summaries.filter(summary_date__lte=end)
+        deliveries = deliveries.filter(scheduled_for__lte=end)
+        archived = archived.filter(scheduled_for__lte=end)
+
+    with transaction.atomic():
+        summaries.delete()
+        totals = defaultdict(lambda: [0, 0])
+        for summary in (summarize_deliveries(deliveries), summarize_deliveries(archived)):
+            for key, (count, quantity) in summary.items():
+                totals[key][0] += count
+                totals[key][1] += quantity
+        rows = [
+            DeliveryDailySummary(
+                owner_admin_id=owner_id,
+                summary_date=day,
+                status=status,
+                delivery_count=count,
+                item_quantity=quantity,
+            )
+            for (owner_id, day, status), (count, quantity) in totals.items()
+        ]
+        DeliveryDailySummary.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# ======================== CUSTOMER STATS ========================
+def _apply_customer_stats_delta(customer_id, orders=0, order_spend=0, payments=0, payment_spend=0, order_at=None):
+    rows = CustomerStats.objects.filter(customer_id=customer_id)
+    changes = {
+        'order_count': F('order_count') + orders,
+        'order_spend': F('order_spend') + order_spend,
+        'subscription_payment_count': F('subscription_payment_count') + payments,
+        'subscription_spend': F('subscription_spend') + payment_spend,
+        'total_spend': F('total_spend') + order_spend + payment_spend,
+        'updated_at': timezone.now(),
+    }
+    if order_at is not None:
+        changes['last_order_at'] = Case(
+            When(last_order_at__gte=order_at, then=F('last_order_at')),
+            default=Value(order_at),
+        )
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            CustomerStats.objects.create(
+                customer_id=customer_id,
+                order_count=orders,
+                order_spend=order_spend,
+                subscription_payment_count=payments,
+                subscription_spend=payment_spend,
+                total_spend=order_spend + payment_spend,
+                last_order_at=order_at,
+            )
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def record_order_paid(order):
+    """Count an order that just moved to ``paid``."""
+    _apply_customer_stats_delta(
+        order.customer_id, orders=1, order_spend=order.total_amount, order_at=order.created_at,
+    )
+
+
+def record_subscription_payment(payment_transaction):
+    """Count a subscription payment that just moved to ``success``."""
+    _apply_customer_stats_delta(
+        payment_transaction.customer_id, payments=1, payment_spend=payment_transaction.amount,
+    )
+
+
+def compute_customer_stats(customer_ids=None):
+    """Aggregate {customer_id: CustomerStats} from the raw order and payment tables."""
+    orders = Order.objects.filter(status='paid')
+    payments = PaymentTransaction.objects.filter(status='success')
+    if customer_ids is not None:
+        orders = orders.filter(customer_id__in=customer_ids)
+        payments = payments.filter(customer_id__in=customer_ids)
+
+    stats = {}
+    for row in (
+        orders.order_by().values('customer_id')
+        .annotate(count=Count('order_id'), spend=Sum('total_amount'), last=Max('created_at'))
+    ):
+        stats[row['customer_id']] = CustomerStats(
+            customer_id=row['customer_id'],
+            order_count=row['count'],
+            order_spend=row['spend'],
+            last_order_at=row['last'],
+        )
+    for row in (
+        payments.order_by().values('customer_id')
+        .annotate(count=Count('payment_id'), spend=Sum('amount'))
+    ):
+        entry = stats.setdefault(row['customer_id'], CustomerStats(customer_id=row['customer_id']))
+        entry.subscription_payment_count = row['count']
+        entry.subscription_spend = row['spend']
+    for entry in stats.values():
+        entry.total_spend = entry.order_spend + entry.subscription_spend
+    return stats
+
+
+STATS_FIELDS = (
+    'order_count', 'order_spend', 'subscription_payment_count', 'subscription_spend',
+    'total_spend', 'last_order_at',
+)
+
+
+def find_customer_stats_drift(customer_ids=None):
+    """Return [(customer_id, field, stored, expected)] where the stats table disagrees with the raw tables."""
+    expected = compute_customer_stats(customer_ids)
+    stored = CustomerStats.objects.all()
+    if customer_ids is not None:
+        stored = stored.filter(customer_id__in=customer_ids)
+    stored = {row.customer_id: row for row in stored}
+
+    drift = []
+    empty = CustomerStats()
+    for customer_id in sorted(set(expected) | set(stored)):
+        want = expected.get(customer_id, empty)
+        have = stored.get(customer_id, empty)
+        for field in STATS_FIELDS:
+            if getattr(have, field) != getattr(want, field):
+                drift.append((customer_id, field, getattr(have, field), getattr(want, field)))
+    return drift
+
+
+def rebuild_customer_stats(customer_ids=None):
+    """Recompute stats rows for all (or the given) customers."""
+    with transaction.atomic():
+        stale = CustomerStats.objects.all()
+        if customer_ids is not None:
+            stale = stale.filter(customer_id__in=customer_ids)
+        stale.delete()
+        rows = list(compute_customer_stats(customer_ids).values())
+        CustomerStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+# ======================== SALES ROLLUPS ========================
+def _add_to_counters(model, lookup, **deltas):
+    """Add ``deltas`` to the row matching ``lookup`` with an F() UPDATE, inserting it if missing."""
+    rows = model.objects.filter(**lookup)
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    changes['updated_at'] = timezone.now()
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        rows.update(**changes)
+
+
+def _sales_lookup(customer, created_at):
+    # Sales are bucketed by the local day the order / payment was created on, which
+    # is what rebuild_sales_rollups derives with TruncDate.
+    return {'owner_admin_id': customer.owner_admin_id, 'summary_date': timezone.localtime(created_at).date()}
+
+
+def record_order_sale(order):
+    """Add a newly paid order to the sales and product rollups."""
+    lookup = _sales_lookup(order.customer, order.created_at)
+    _add_to_counters(SalesDailySummary, lookup, order_count=1, order_revenue=order.total_amount)
+    for item in order.items.all():
+        _add_to_counters(
+            ProductDailySales, {**lookup, 'product_id': item.product_id},
+            units_sold=item.quantity, revenue=item.line_total,
+        )
+
+
+def record_order_payment_failed(order):
+    _add_to_counters(SalesDailySummary, _sales_lookup(order.customer, order.created_at), failed_order_payment_count=1)
+
+
+def record_subscription_sale(payment_transaction):
+    _add_to_counters(
+        SalesDailySummary, _sales_lookup(payment_transaction.customer, payment_transaction.created_at),
+        subscription_payment_count=1, subscription_revenue=payment_transaction.amount,
+    )
+
+
+def record_subscription_payment_failed(payment_transaction):
+    _add_to_counters(
+        SalesDailySummary, _sales_lookup(payment_transaction.customer, payment_transaction.created_at),
+        failed_subscription_payment_count=1,
+    )
+
+
+def rebuild_sales_rollups(start=None, end=None):
+    """Recompute sales and product rows for an optional date range from the order and payment tables."""
+    summaries = SalesDailySummary.objects.all()
+    product_rows = ProductDailySales.objects.all()
+    orders = Order.objects.all()
+    order_payments = OrderPayment.objects.all()
+    order_items = OrderItem.objects.filter(order__status='paid')
+    payments = PaymentTransaction.objects.all()
+    if start:
+        since = timezone.make_aware(datetime.combine(start, time.min))
+        summaries = summaries.filter(summary_date__gte=start)
+        product_rows = product_rows.filter(summary_date__gte=start)
+        orders = orders.filter(created_at__gte=since)
+        order_payments = order_payments.filter(order__created_at__gte=since)
+        order_items = order_items.filter(order__created_at__gte=since)
+        payments = payments.filter(created_at__gte=since)
+    if end:
+        until = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        summaries = summaries.filter(summary_date__lte=end)
+        product_rows = product_rows.filter(summary_date__lte=end)
+        orders = orders.filter(created_at__lt=until)
+        order_payments = order_payments.filter(order__created_at__lt=until)
+        order_items = order_items.filter(order__created_at__lt=until)
+        payments = payments.filter(created_at__lt=until)
+
+    with transaction.atomic():
+        summaries.delete()
+        product_rows.delete()
+        totals, products = _aggregate_sales(orders, order_payments, order_items, payments)
+        SalesDailySummary.objects.bulk_create(totals, batch_size=1000)
+        ProductDailySales.objects.bulk_create(products, batch_size=1000)
+    return len(totals), len(products)
+
+
+def _aggregate_sales(orders, order_payments, order_items, payments):
+    totals = {}
+
+    def bucket(owner_id, day):
+        return totals.setdefault(
+            (owner_id, day), SalesDailySummary(owner_admin_id=owner_id, summary_date=day),
+        )
+
+    for row in (
+        orders.filter(status='paid').order_by()
+        .values('customer__owner_admin_id', day=TruncDate('created_at'))
+        .annotate(count=Count('order_id'), revenue=Sum('total_amount'))
+    ):
+        entry = bucket(row['customer__owner_admin_id'], row['day'])
+        entry.order_count, entry.order_revenue = row['count'], row['revenue']
+    for row in (
+        order_payments.filter(status='failed').order_by()
+        .values('order__customer__owner_admin_id', day=TruncDate('order__created_at'))
+        .annotate(count=Count('order_payment_id'))
+    ):
+        bucket(row['order__customer__owner_admin_id'], row['day']).failed_order_payment_count = row['count']
+    for row in (
+        payments.filter(status__in=['success', 'failed']).order_by()
+        .values('customer__owner_admin_id', 'status', day=TruncDate('created_at'))
+        .annotate(count=Count('payment_id'), revenue=Sum('amount'))
+    ):
+        entry = bucket(row['customer__owner_admin_id'], row['day'])
+        if row['status'] == 'success':
+            entry.subscription_payment_count, entry.subscription_revenue = row['count'], row['revenue']
+        else:
+            entry.failed_subscription_payment_count = row['count']
+
+    products = [
+        ProductDailySales(
+            owner_admin_id=row['order__customer__owner_admin_id'],
+            product_id=row['product_id'],
+            summary_date=row['day'],
+            units_sold=row['units'],
+            revenue=row['revenue'],
+        )
+        for row in (
+            order_items.order_by()
+            .values('order__customer__owner_admin_id', 'product_id', day=TruncDate('order__created_at'))
+            .annotate(units=Sum('quantity'), revenue=Sum('line_total'))
+        )
+    ]
+    return list(totals.values()), products
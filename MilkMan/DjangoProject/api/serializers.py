@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from .inventory import available_stock, rebalance_stock
 from .models import (
     Admin, Category, Subscription, Customer, Product, SubscriptionBasketItem,
     SubscriptionDelivery, SubscriptionDeliveryItem,
-    PaymentTransaction, Order, OrderItem, OrderPayment
+    SubscriptionDeliveryArchive, SubscriptionDeliveryItemArchive,
+    PaymentTransaction, Order, OrderItem, OrderPayment, CustomerStats
 )
 
 
@@ -66,6 +68,27 @@ class SubscriptionSerializer(serializers.ModelSerializer):
 
 
 # ======================== CUSTOMER SERIALIZER ========================
+class CustomerStatsSerializer(serializers.ModelSerializer):
+    """Lifetime order and spend aggregates from the customer_stats table"""
+    average_basket_value = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = CustomerStats
+        fields = [
+            'order_count', 'order_spend', 'subscription_payment_count', 'subscription_spend',
+            'total_spend', 'average_basket_value', 'last_order_at'
+        ]
+
+    @classmethod
+    def for_customer(cls, customer):
+        """Serialized stats, or zeros for a customer with no settled purchases yet."""
+        try:
+            stats = customer.stats
+        except CustomerStats.DoesNotExist:
+            stats = CustomerStats(customer=customer)
+        return cls(stats).data
+
+
 class CustomerSerializer(serializers.ModelSerializer):
     """Serializer for Customer model"""
     password = serializers.CharField(write_only=True, required=False, allow_blank=False)
@@ -73,6 +96,7 @@ class CustomerSerializer(serializers.ModelSerializer):
         source='subscription.name',
         read_only=True
     )
+    stats = serializers.SerializerMethodField()
     
     class Meta:
         model = Customer
@@ -81,11 +105,14 @@ class CustomerSerializer(serializers.ModelSerializer):
             'password',
             'address', 'city', 'state', 'postal_code', 'country',
             'subscription', 'subscription_name', 'subscription_start_date',
-            'subscription_end_date', 'status', 'is_verified',
+            'subscription_end_date', 'status', 'is_verified', 'stats',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['customer_id', 'created_at', 'updated_at']
 
+    def get_stats(self, obj):
+        return CustomerStatsSerializer.for_customer(obj)
+
     def create(self, validated_data):
         password = validated_data.pop('password', None)
         customer = Customer(**validated_data)
@@ -131,6 +158,20 @@ class ProductSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        # For sharded products the submitted quantity is the new total, spread over the shards.
+        restock_total = validated_data.pop('quantity_in_stock', None) if instance.stock_shard_count else None
+        instance = super().update(instance, validated_data)
+        if restock_total is not None:
+            instance = rebalance_stock(instance, total=restock_total)
+        return instance
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.stock_shard_count:
+            data['quantity_in_stock'] = available_stock(instance)
+        return data
     
     def validate_price(self, value):
         """Validate price is positive"""
@@ -168,6 +209,12 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['product_id', 'created_at', 'updated_at', 'category_name', 'created_by_name']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.stock_shard_count:
+            data['quantity_in_stock'] = available_stock(instance)
+        return data
+
 
 class SubscriptionBasketItemSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
@@ -209,9 +256,27 @@ class SubscriptionDeliverySerializer(serializers.ModelSerializer):
             return ""
 
 
+class SubscriptionDeliveryItemArchiveSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SubscriptionDeliveryItemArchive
+        fields = ['delivery_item_id', 'product', 'product_name', 'quantity', 'created_at']
+        read_only_fields = fields
+
+
+class SubscriptionDeliveryArchiveSerializer(SubscriptionDeliverySerializer):
+    """Same shape as SubscriptionDeliverySerializer so history reads can mix both tables."""
+    items = SubscriptionDeliveryItemArchiveSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = SubscriptionDeliveryArchive
+        fields = SubscriptionDeliverySerializer.Meta.fields
+        read_only_fields = fields
+
+
 class CustomerDetailSerializer(serializers.ModelSerializer):
     """Detailed customer serializer with subscription info"""
     subscription = SubscriptionSerializer(read_only=True)
+    stats = serializers.SerializerMethodField()
     
     class Meta:
         model = Customer
@@ -221,6 +286,9 @@ class CustomerDetailSerializer(serializers.ModelSerializer):
             'password': {'write_only': True},
         }
 
+    def get_stats(self, obj):
+        return CustomerStatsSerializer.for_customer(obj)
+
 
 class PaymentTransactionSerializer(serializers.ModelSerializer):
     """Serializer for payment transaction model"""
@@ -263,6 +331,17 @@ class OrderSerializer(serializers.ModelSerializer):
         return f"{obj.customer.first_name} {obj.customer.last_name}".strip()
 
 
+class OrderSummarySerializer(OrderSerializer):
+    """Order list row without line items; expects an ``item_count`` annotation."""
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        fields = [
+            'order_id', 'customer', 'customer_name', 'subtotal', 'tax_amount',
+            'total_amount', 'currency', 'status', 'created_at', 'updated_at', 'item_count'
+        ]
+
+
 class OrderPaymentSerializer(serializers.ModelSerializer):
     order_id = serializers.IntegerField(source='order.order_id', read_only=True)
 
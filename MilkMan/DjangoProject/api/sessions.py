@@ -0,0 +1,28 @@
+"""
+Session engine that times the real one for ``/metrics``.
+
+With METRICS_ENABLED, settings point SESSION_ENGINE here and keep the actual
+backend (db, cache, cached_db, ...) in SESSION_BACKEND_ENGINE; this store
+subclasses it and records load/save/delete latency.
+"""
+from importlib import import_module
+
+from django.conf import settings
+
+from .metrics import SESSION_LATENCY
+
+_backend = import_module(settings.SESSION_BACKEND_ENGINE)
+
+
+class SessionStore(_backend.SessionStore):
+    def load(self):
+        with SESSION_LATENCY.labels('load').time():
+            return super().load()
+
+    def save(self, must_create=False):
+        with SESSION_LATENCY.labels('save').time():
+            return super().save(must_create=must_create)
+
+    def delete(self, session_key=None):
+        with SESSION_LATENCY.labels('delete').time():
+            return super().delete(session_key)
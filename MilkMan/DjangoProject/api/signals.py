@@ -0,0 +1,15 @@
+"""Model signal handlers that keep response caches in step with catalog writes."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_catalog_version
+from .models import Category, Product, Subscription
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Subscription)
+def invalidate_catalog(sender, **kwargs):
+    # After commit, so a concurrent reader cannot re-cache the old rows under the new version.
+    transaction.on_commit(bump_catalog_version)
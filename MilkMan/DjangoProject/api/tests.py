@@ -1,3 +1,93 @@
-from django.test import TestCase
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import TransactionTestCase, override_settings
+from django.urls import path
+
+from config.db_router import SESSION_KEY, query_counts, reset_query_counts
+
+from .models import Category
+
+
+# ======================== READ REPLICA ROUTING ========================
+def _category_names(request):
+    return HttpResponse(",".join(Category.objects.values_list('name', flat=True)))
+
+
+def _category_names_in_transaction(request):
+    with transaction.atomic():
+        return _category_names(request)
+
+
+def _create_category(request):
+    request.session['auth_role'] = 'user'
+    Category.objects.create(name=request.POST['name'])
+    return HttpResponse(status=201)
+
+
+urlpatterns = [
+    path('categories/', _category_names),
+    path('categories/in-transaction/', _category_names_in_transaction),
+    path('categories/create/', _create_category),
+]
+
+
+@skipUnless(
+    'replica' in settings.DATABASES,
+    "needs a replica alias: DB_ENGINE=sqlite DB_REPLICA_SQLITE_PATH=<file> python manage.py test api",
+)
+@override_settings(
+    ROOT_URLCONF='api.tests',
+    DATABASE_ROUTERS=['config.db_router.ReplicaRouter'],
+    MIDDLEWARE=[
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'config.db_router.ReplicaRoutingMiddleware',
+    ],
+    DB_READ_YOUR_WRITES_SECONDS=60,
+)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    ReplicaRouter and ReplicaRoutingMiddleware against two separate SQLite
+    databases. Each alias holds a differently named category, so a response
+    shows which database served the read. TransactionTestCase, because the
+    per-test transaction of TestCase would keep every read on the primary.
+    """
+    # The runner sets up every alias a collected test names, skipped or not.
+    databases = {'default', 'replica'} if 'replica' in settings.DATABASES else {'default'}
+
+    def setUp(self):
+        Category.objects.using('default').create(name='on primary')
+        Category.objects.using('replica').create(name='on replica')
+        reset_query_counts()
+
+    def test_anonymous_get_reads_from_replica(self):
+        response = self.client.get('/categories/')
+        self.assertEqual(response.content, b'on replica')
+
+    def test_get_after_write_reads_from_primary(self):
+        response = self.client.post('/categories/create/', {'name': 'new'})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(SESSION_KEY, self.client.session)
+
+        response = self.client.get('/categories/')
+        self.assertEqual(response.content, b'new,on primary')
+
+    def test_read_in_transaction_uses_primary(self):
+        response = self.client.get('/categories/in-transaction/')
+        self.assertEqual(response.content, b'on primary')
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(list(Category.objects.values_list('name', flat=True)), ['on primary'])
+
+    def test_query_counts_by_alias(self):
+        self.client.get('/categories/')
+        self.client.get('/categories/')
+        self.client.get('/categories/in-transaction/')
+        counts = query_counts()
+        self.assertEqual(counts.get('replica'), 2)
+        self.assertGreaterEqual(counts.get('default', 0), 1)
+
+        reset_query_counts()
+        self.assertEqual(query_counts(), {})
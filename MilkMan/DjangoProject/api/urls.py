@@ -1,7 +1,14 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 
+# Under an ASGI server the read-heavy customer endpoints can be served by async views.
+if settings.USER_VIEWS_ASYNC:
+    from . import async_views as user_read_views
+else:
+    user_read_views = views
+
 # Create a router and register viewsets
 router = DefaultRouter()
 router.register(r'admins', views.AdminViewSet, basename='admin')
@@ -18,12 +25,20 @@ urlpatterns = [
     path('auth/login/', views.auth_login, name='auth-login'),
     path('auth/me/', views.auth_me, name='auth-me'),
     path('auth/logout/', views.auth_logout, name='auth-logout'),
-    path('user/dashboard-data/', views.user_dashboard_data, name='user-dashboard-data'),
+    path('user/dashboard-data/', user_read_views.user_dashboard_data, name='user-dashboard-data'),
     path('user/subscribe/', views.user_subscribe, name='user-subscribe'),
     path('user/subscription-basket/', views.user_subscription_basket, name='user-subscription-basket'),
-    path('user/subscription-deliveries/', views.user_subscription_deliveries, name='user-subscription-deliveries'),
-    path('user/payments/', views.user_payments, name='user-payments'),
+    path('user/subscription-deliveries/', user_read_views.user_subscription_deliveries, name='user-subscription-deliveries'),
+    path('user/subscription-deliveries/history/', views.user_subscription_delivery_history, name='user-subscription-delivery-history'),
+    path('user/payments/', user_read_views.user_payments, name='user-payments'),
+    path('user/payments/<str:reference>/status/', views.user_payment_status, name='user-payment-status'),
     path('user/deactivate-subscription/', views.user_deactivate_subscription, name='user-deactivate-subscription'),
     path('user/cart-checkout/', views.user_cart_checkout, name='user-cart-checkout'),
-    path('user/orders/', views.user_orders, name='user-orders'),
+    path('user/orders/', user_read_views.user_orders, name='user-orders'),
+    path('user/orders/<int:order_id>/', views.user_order_detail, name='user-order-detail'),
+    path('user/reorder-suggestions/', views.user_reorder_suggestions, name='user-reorder-suggestions'),
+    path('admin/stats/', views.admin_stats, name='admin-stats'),
+    path('admin/query-stats/', views.admin_query_stats, name='admin-query-stats'),
+    path('admin/reports/sales/', views.admin_sales_report, name='admin-sales-report'),
+    path('admin/reports/product-sales/', views.admin_product_sales_report, name='admin-product-sales-report'),
 ]
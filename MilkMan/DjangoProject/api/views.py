@@ -2,24 +2,44 @@ from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, action
+from rest_framework.pagination import CursorPagination
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Prefetch, Q, Subquery, Sum, prefetch_related_objects
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
 from django.utils import timezone
-from datetime import timedelta
+from calendar import monthrange
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from time import perf_counter
 
 from .models import (
     Admin, Category, Subscription, Customer, Product, SubscriptionBasketItem,
-    SubscriptionDelivery, SubscriptionDeliveryItem,
+    SubscriptionDelivery, SubscriptionDeliveryArchive,
     PaymentTransaction,
-    Order, OrderItem, OrderPayment
+    Order, OrderItem, OrderPayment, ProductStockShard, StockReservation,
+    DeliveryDailySummary, ProductDailySales, SalesDailySummary
 )
 from .serializers import (
     AdminSerializer, CategorySerializer, SubscriptionSerializer,
     CustomerSerializer, ProductSerializer, ProductDetailSerializer,
-    CustomerDetailSerializer, PaymentTransactionSerializer,
-    OrderSerializer, OrderPaymentSerializer, SubscriptionBasketItemSerializer,
-    SubscriptionDeliverySerializer
+    CustomerDetailSerializer, CustomerStatsSerializer, PaymentTransactionSerializer,
+    OrderSerializer, OrderSummarySerializer, OrderPaymentSerializer, SubscriptionBasketItemSerializer,
+    SubscriptionDeliverySerializer, SubscriptionDeliveryArchiveSerializer
+)
+from .caching import get_admin_stats, get_dashboard_catalog, get_reorder_suggestions
+from .deliveries import rebuild_future_subscription_deliveries
+from .idempotency import idempotent, mark_writes_committed
+from .instrumentation import endpoint_stats, reset_endpoint_stats
+from .metrics import record_checkout, record_payment_failure
+from .inventory import InsufficientStock, reserve_stock, release_stock, release_order_reservations
+from .payments import apply_subscription_payment_result, submit_payment
+from .pricing import CENTS, ORDER_TAX_RATE
+from .rollups import (
+    summarize_deliveries, diff_summaries, apply_delivery_summary_delta,
+    record_delivery_status_change, record_order_payment_failed
 )
 
 
@@ -38,13 +58,59 @@ def _resolve_admin_for_request(request):
     return Admin.objects.filter(admin_id=auth_user_id, is_active=True).first()
 
 
+def _parse_history_window(request, default_days=30, default_limit=100, max_limit=500):
+    """Read start/end/limit query params; raises ValueError on malformed input."""
+    end_param = request.query_params.get('end')
+    start_param = request.query_params.get('start')
+    end = date.fromisoformat(end_param) if end_param else timezone.localdate()
+    start = date.fromisoformat(start_param) if start_param else end - timedelta(days=default_days)
+    if start > end:
+        raise ValueError("start must be on or before end")
+    limit = int(request.query_params.get('limit') or default_limit)
+    return start, end, min(max(limit, 1), max_limit)
+
+
+def _merged_delivery_history(deliveries, archived_deliveries, start, end, limit):
+    """Newest-first deliveries in [start, end] read from both the live and the archive table."""
+    def window(queryset):
+        return (
+            queryset.filter(scheduled_for__gte=start, scheduled_for__lte=end)
+            .select_related('customer')
+            .prefetch_related('items')
+            .order_by('-scheduled_for', '-delivery_id')[:limit]
+        )
+
+    # Both reads are bounded by the (customer, scheduled_for) / (scheduled_for, status) indexes.
+    rows = list(SubscriptionDeliverySerializer(window(deliveries), many=True).data)
+    rows += SubscriptionDeliveryArchiveSerializer(window(archived_deliveries), many=True).data
+    rows.sort(key=lambda row: (row['scheduled_for'], row['delivery_id']), reverse=True)
+    return rows[:limit]
+
+
+LOW_STOCK_THRESHOLD = 10
+
+
+def _available_stock_annotation():
+    """available_stock = product row + sum of its stock shards, as a queryset annotation."""
+    shard_totals = (
+        ProductStockShard.objects.filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    return F('quantity_in_stock') + Coalesce(Subquery(shard_totals), 0)
+
+
 def _scoped_products_queryset(request):
     admin = _resolve_admin_for_request(request)
+    # category_name / created_by_name are joined in; sharded products report stock summed
+    # over their shards, and prefetching keeps that to one query.
+    products = Product.objects.all().select_related('category', 'created_by').prefetch_related('stock_shards')
     if not admin:
-        return Product.objects.all()
+        return products
     if admin.role == "super_admin":
-        return Product.objects.all()
-    return Product.objects.filter(created_by=admin)
+        return products
+    return products.filter(created_by=admin)
 
 
 # ======================== ADMIN VIEWSET ========================
@@ -198,12 +264,12 @@ class CustomerViewSet(viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
     filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
     search_fields = ['first_name', 'last_name', 'email', 'city']
-    ordering_fields = ['created_at', 'status']
+    ordering_fields = ['created_at', 'status', 'stats__order_count', 'stats__total_spend', 'stats__last_order_at']
     filterset_fields = ['status', 'is_verified', 'subscription']
 
     def get_queryset(self):
         admin = _resolve_admin_for_request(self.request)
-        queryset = Customer.objects.all()
+        queryset = Customer.objects.select_related('subscription', 'stats')
         if admin:
             if admin.role == "super_admin":
                 return queryset
@@ -213,6 +279,12 @@ class CustomerViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         admin = _resolve_admin_for_request(self.request)
         serializer.save(owner_admin=admin)
+
+    def perform_update(self, serializer):
+        previous_name = (serializer.instance.first_name, serializer.instance.last_name)
+        customer = serializer.save()
+        if (customer.first_name, customer.last_name) != previous_name:
+            _refresh_delivery_search_text(customer)
     
     def get_serializer_class(self):
         """Use detailed serializer for retrieve action"""
@@ -307,8 +379,10 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """Get products with low stock (less than 10)"""
-        threshold = request.query_params.get('threshold', 10)
-        products = self.get_queryset().filter(quantity_in_stock__lt=threshold, status='active')
+        threshold = request.query_params.get('threshold', LOW_STOCK_THRESHOLD)
+        products = self.get_queryset().annotate(
+            available_stock=_available_stock_annotation()
+        ).filter(available_stock__lt=threshold, status='active')
         serializer = self.get_serializer(products, many=True)
         return Response(serializer.data)
     
@@ -341,13 +415,13 @@ class SubscriptionDeliveryViewSet(viewsets.ModelViewSet):
     queryset = SubscriptionDelivery.objects.all()
     serializer_class = SubscriptionDeliverySerializer
     filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
-    search_fields = ['customer__first_name', 'customer__last_name', 'items__product_name']
+    search_fields = ['search_text']
     ordering_fields = ['scheduled_for', 'status', 'updated_at']
     filterset_fields = ['status', 'scheduled_for', 'customer']
 
     def get_queryset(self):
         admin = _resolve_admin_for_request(self.request)
-        queryset = SubscriptionDelivery.objects.all().prefetch_related('items')
+        queryset = SubscriptionDelivery.objects.all().select_related('customer').prefetch_related('items')
         if not admin:
             # Delivery management is admin-only. Without an admin session, show nothing.
             return queryset.none()
@@ -355,14 +429,51 @@ class SubscriptionDeliveryViewSet(viewsets.ModelViewSet):
             return queryset
         return queryset.filter(customer__owner_admin=admin)
 
+    def perform_create(self, serializer):
+        customer = serializer.validated_data['customer']
+        # Items are added afterwards, so a new delivery is found by the customer's name.
+        search_text = SubscriptionDelivery.build_search_text(customer.first_name, customer.last_name, [])
+        with transaction.atomic():
+            delivery = serializer.save(search_text=search_text)
+            rows = SubscriptionDelivery.objects.filter(pk=delivery.pk)
+            apply_delivery_summary_delta(diff_summaries(summarize_deliveries(rows), {}))
+
+    def perform_update(self, serializer):
+        # status, scheduled_for and customer (owner) all move summary rows, so diff the whole footprint.
+        rows = SubscriptionDelivery.objects.filter(pk=serializer.instance.pk)
+        previous_customer_id = serializer.instance.customer_id
+        with transaction.atomic():
+            rows.select_for_update().get()
+            before = summarize_deliveries(rows)
+            delivery = serializer.save()
+            apply_delivery_summary_delta(diff_summaries(summarize_deliveries(rows), before))
+            if delivery.customer_id != previous_customer_id:
+                _refresh_delivery_search_text(delivery.customer, rows)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            removed = summarize_deliveries(SubscriptionDelivery.objects.filter(pk=instance.pk))
+            instance.delete()
+            apply_delivery_summary_delta(diff_summaries({}, removed))
+
+    def _set_status(self, delivery, new_status, delivered_at):
+        with transaction.atomic():
+            # Re-read under a row lock so concurrent marks never move the delivery out of a stale status.
+            previous_status = (
+                SubscriptionDelivery.objects.select_for_update()
+                .values_list('status', flat=True).get(pk=delivery.pk)
+            )
+            delivery.status = new_status
+            delivery.delivered_at = delivered_at
+            delivery.save(update_fields=['status', 'delivered_at', 'updated_at'])
+            record_delivery_status_change(delivery, previous_status)
+
     @action(detail=True, methods=['post'])
     def mark_delivered(self, request, pk=None):
         if not _resolve_admin_for_request(request):
             return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
         delivery = self.get_object()
-        delivery.status = 'delivered'
-        delivery.delivered_at = timezone.now()
-        delivery.save(update_fields=['status', 'delivered_at'])
+        self._set_status(delivery, 'delivered', timezone.now())
         return Response({"message": "Marked delivered", "delivery": self.get_serializer(delivery).data})
 
     @action(detail=True, methods=['post'])
@@ -370,11 +481,91 @@ class SubscriptionDeliveryViewSet(viewsets.ModelViewSet):
         if not _resolve_admin_for_request(request):
             return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
         delivery = self.get_object()
-        delivery.status = 'missed'
-        delivery.delivered_at = None
-        delivery.save(update_fields=['status', 'delivered_at'])
+        self._set_status(delivery, 'missed', None)
         return Response({"message": "Marked missed", "delivery": self.get_serializer(delivery).data})
 
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Per-day delivery counts for one month from the summary table: ?month=YYYY-MM"""
+        admin = _resolve_admin_for_request(request)
+        if not admin:
+            return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
+
+        month_param = request.query_params.get('month')
+        try:
+            if month_param:
+                year, month = (int(part) for part in month_param.split('-'))
+                first_day = date(year, month, 1)
+            else:
+                first_day = timezone.localdate().replace(day=1)
+        except ValueError:
+            return Response({"error": "month must be in YYYY-MM format"}, status=status.HTTP_400_BAD_REQUEST)
+        last_day = first_day.replace(day=monthrange(first_day.year, first_day.month)[1])
+
+        summaries = DeliveryDailySummary.objects.filter(summary_date__gte=first_day, summary_date__lte=last_day)
+        if admin.role != "super_admin":
+            summaries = summaries.filter(owner_admin=admin)
+        rows = (
+            summaries.order_by()
+            .values('summary_date', 'status')
+            .annotate(deliveries=Sum('delivery_count'), quantity=Sum('item_quantity'))
+        )
+
+        statuses = [choice[0] for choice in SubscriptionDelivery.STATUS_CHOICES]
+
+        def empty_bucket():
+            bucket = {status_name: 0 for status_name in statuses}
+            bucket.update({"total": 0, "item_quantity": 0})
+            return bucket
+
+        days = {}
+        for offset in range((last_day - first_day).days + 1):
+            day = first_day + timedelta(days=offset)
+            days[day] = {"date": day, **empty_bucket()}
+        totals = empty_bucket()
+        for row in rows:
+            for bucket in (days[row['summary_date']], totals):
+                bucket[row['status']] += row['deliveries'] or 0
+                bucket["total"] += row['deliveries'] or 0
+                bucket["item_quantity"] += row['quantity'] or 0
+
+        return Response({
+            "month": first_day.strftime('%Y-%m'),
+            "days": list(days.values()),
+            "totals": totals,
+        })
+
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """Delivery history across live and archived rows: ?start=&end=&customer=&status=&limit="""
+        admin = _resolve_admin_for_request(request)
+        if not admin:
+            return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            start, end, limit = _parse_history_window(request)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        deliveries = SubscriptionDelivery.objects.all()
+        archived_deliveries = SubscriptionDeliveryArchive.objects.all()
+        if admin.role != "super_admin":
+            deliveries = deliveries.filter(customer__owner_admin=admin)
+            archived_deliveries = archived_deliveries.filter(customer__owner_admin=admin)
+        customer_id = request.query_params.get('customer')
+        if customer_id:
+            deliveries = deliveries.filter(customer_id=customer_id)
+            archived_deliveries = archived_deliveries.filter(customer_id=customer_id)
+        status_param = request.query_params.get('status')
+        if status_param:
+            deliveries = deliveries.filter(status=status_param)
+            archived_deliveries = archived_deliveries.filter(status=status_param)
+
+        return Response({
+            "start": start,
+            "end": end,
+            "deliveries": _merged_delivery_history(deliveries, archived_deliveries, start, end, limit),
+        })
+
 
 # ======================== HELLO WORLD ENDPOINT ========================
 @api_view(['GET'])
@@ -536,14 +727,18 @@ def _resolve_customer_for_user_request(request):
     auth_role = session_obj.get("auth_role") if session_obj else None
     auth_user_id = session_obj.get("auth_user_id") if session_obj else None
 
+    # The plan and stats rows are joined in so user endpoints never need a second lookup.
+    customers = Customer.objects.select_related('subscription', 'stats')
     if auth_role == "user" and auth_user_id:
-        return Customer.objects.filter(customer_id=auth_user_id).first()
+        return customers.filter(customer_id=auth_user_id).first()
 
-    customer_id = request.query_params.get("customer_id") or request.data.get("customer_id")
+    # Plain HttpRequests (the async views in api.async_views) have GET but no query_params/data.
+    query_params = getattr(request, "query_params", request.GET)
+    customer_id = query_params.get("customer_id") or getattr(request, "data", {}).get("customer_id")
     if not customer_id:
         return None
 
-    return Customer.objects.filter(customer_id=customer_id).first()
+    return customers.filter(customer_id=customer_id).first()
 
 
 def _validate_payment_details(payment_method, payload):
@@ -556,8 +751,6 @@ def _validate_payment_details(payment_method, payload):
         expiry = (payload.get("expiry") or "").strip()
         if len(card_number) < 12 or len(cvv) not in [3, 4] or len(expiry) < 4:
             return False, "Invalid card details"
-        if card_number.endswith("0000"):
-            return False, "Payment declined by gateway"
         return True, None
     if method == 'upi':
         upi_id = (payload.get("upi_id") or "").strip()
@@ -572,137 +765,124 @@ def _validate_payment_details(payment_method, payload):
     return False, "Unsupported payment method"
 
 
-def _subscription_items_for_date(basket_items, subscription_start_date, target_date):
-    day_items = []
-    for basket_item in basket_items:
-        if basket_item.frequency == 'daily':
-            include = True
-        elif basket_item.frequency == 'alternate':
-            include = ((target_date - subscription_start_date).days % 2) == 0
-        else:
-            include = ((target_date - subscription_start_date).days % 7) == 0
-        if include:
-            day_items.append(basket_item)
-    return day_items
+def _refresh_delivery_search_text(customer, deliveries=None):
+    """
+    Rewrite search_text of ``deliveries``, by default the customer's upcoming ones.
 
+    Past deliveries keep the name they were made under, so a rename touches
+    the rest of the plan period rather than the customer's whole history.
+    """
+    if deliveries is None:
+        deliveries = SubscriptionDelivery.objects.filter(customer=customer, scheduled_for__gte=timezone.localdate())
+    deliveries = list(deliveries.prefetch_related('items'))
+    for delivery in deliveries:
+        delivery.search_text = SubscriptionDelivery.build_search_text(
+            customer.first_name, customer.last_name, [item.product_name for item in delivery.items.all()]
+        )
+    SubscriptionDelivery.objects.bulk_update(deliveries, ['search_text'], batch_size=500)
 
-def _rebuild_future_subscription_deliveries(customer, start_date=None):
-    if not customer or not customer.subscription or not customer.subscription_start_date or not customer.subscription_end_date:
-        return
 
-    # Only rebuild for active subscription period.
-    today = timezone.localdate()
-    period_start = customer.subscription_start_date.date()
-    period_end = customer.subscription_end_date.date()
-    rebuild_start = max(period_start, today)
-    if start_date:
-        try:
-            rebuild_start = max(rebuild_start, start_date)
-        except Exception:
-            pass
+DASHBOARD_PRODUCT_LIMIT = 40
+
+
+def _dashboard_catalog():
+    """Active products and plans shown to every customer; cached by get_dashboard_catalog."""
+    products = (
+        Product.objects.filter(status='active')
+        .select_related('category', 'created_by')
+        .prefetch_related('stock_shards')
+        .order_by('-created_at')[:DASHBOARD_PRODUCT_LIMIT]
+    )
+    subscriptions = Subscription.objects.filter(is_active=True).order_by('price')
+    return {
+        "products": ProductSerializer(products, many=True).data,
+        "subscriptions": SubscriptionSerializer(subscriptions, many=True).data,
+    }
+
+
+def _dashboard_recent_payments(customer):
+    recent_payments = (
+        PaymentTransaction.objects.filter(customer=customer)
+        .select_related('customer', 'subscription')
+        .order_by('-created_at')[:10]
+    )
+    return PaymentTransactionSerializer(recent_payments, many=True).data
 
-    if rebuild_start > period_end:
-        return
 
-    basket_items = list(
+def _dashboard_basket(customer):
+    basket_items = (
         SubscriptionBasketItem.objects.filter(customer=customer, is_active=True)
         .select_related('product')
-        .order_by('product__name')
+        .order_by('-updated_at')
     )
+    return SubscriptionBasketItemSerializer(basket_items, many=True).data
 
-    # If basket is empty, clear future scheduled deliveries.
-    SubscriptionDelivery.objects.filter(
-        customer=customer,
-        scheduled_for__gte=rebuild_start,
-        scheduled_for__lte=period_end,
-        status='scheduled',
-    ).delete()
-
-    if not basket_items:
-        return
-
-    deliveries_to_create = []
-    items_to_create = []
-
-    current = rebuild_start
-    while current <= period_end:
-        todays = _subscription_items_for_date(basket_items, period_start, current)
-        if todays:
-            delivery = SubscriptionDelivery(
-                customer=customer,
-                subscription=customer.subscription,
-                scheduled_for=current,
-                status='scheduled',
-            )
-            deliveries_to_create.append(delivery)
-        current = current + timedelta(days=1)
 
-    if not deliveries_to_create:
-        return
+def _dashboard_customer_summary(customer):
+    """The customer block of the dashboard; built from the resolved row, no queries."""
+    customer_subscription = None
+    if customer.subscription:
+        customer_subscription = {
+            "subscription_id": customer.subscription.subscription_id,
+            "name": customer.subscription.name,
+            "subscription_start_date": customer.subscription_start_date,
+            "subscription_end_date": customer.subscription_end_date,
+        }
 
-    # Bulk create deliveries, then attach items.
-    SubscriptionDelivery.objects.bulk_create(deliveries_to_create, ignore_conflicts=True)
-    created_deliveries = {
-        d.scheduled_for: d
-        for d in SubscriptionDelivery.objects.filter(
-            customer=customer,
-            scheduled_for__gte=rebuild_start,
-            scheduled_for__lte=period_end,
-            status='scheduled',
-        )
+    return {
+        "customer_id": customer.customer_id,
+        "name": f"{customer.first_name} {customer.last_name}".strip(),
+        "email": customer.email,
+        "status": customer.status,
+        "current_subscription": customer_subscription,
+        "stats": CustomerStatsSerializer.for_customer(customer),
     }
 
-    current = rebuild_start
-    while current <= period_end:
-        delivery = created_deliveries.get(current)
-        if delivery:
-            todays = _subscription_items_for_date(basket_items, period_start, current)
-            for basket_item in todays:
-                items_to_create.append(SubscriptionDeliveryItem(
-                    delivery=delivery,
-                    product=basket_item.product,
-                    product_name=basket_item.product.name,
-                    quantity=basket_item.quantity,
-                ))
-        current = current + timedelta(days=1)
 
-    if items_to_create:
-        SubscriptionDeliveryItem.objects.bulk_create(items_to_create, ignore_conflicts=True)
+def _dashboard_customer_section(customer):
+    """Per-customer part of the dashboard: two queries whatever the history size."""
+    return {
+        "customer": _dashboard_customer_summary(customer),
+        "recent_payments": _dashboard_recent_payments(customer),
+        "subscription_basket": _dashboard_basket(customer),
+    }
 
 
 @api_view(['GET'])
 def user_dashboard_data(request):
+    """
+    Shared catalog (cached, version-invalidated) merged with the customer's own data.
+
+    Section costs are reported in a Server-Timing header (catalog, customer).
+    """
+    started = perf_counter()
     customer = _resolve_customer_for_user_request(request)
     if not customer:
         return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
+    resolved = perf_counter()
 
-    products = Product.objects.filter(status='active').order_by('-created_at')[:40]
-    subscriptions = Subscription.objects.filter(is_active=True).order_by('price')
-    recent_payments = PaymentTransaction.objects.filter(customer=customer).order_by('-created_at')[:10]
-    basket_items = SubscriptionBasketItem.objects.filter(customer=customer, is_active=True).select_related('product').order_by('-updated_at')
+    catalog = get_dashboard_catalog(_dashboard_catalog)
+    catalog_done = perf_counter()
 
-    customer_subscription = None
-    if customer.subscription:
-        customer_subscription = {
-            "subscription_id": customer.subscription.subscription_id,
-            "name": customer.subscription.name,
-            "subscription_start_date": customer.subscription_start_date,
-            "subscription_end_date": customer.subscription_end_date,
-        }
+    customer_section = _dashboard_customer_section(customer)
+    customer_done = perf_counter()
 
-    return Response({
-        "customer": {
-            "customer_id": customer.customer_id,
-            "name": f"{customer.first_name} {customer.last_name}".strip(),
-            "email": customer.email,
-            "status": customer.status,
-            "current_subscription": customer_subscription,
-        },
-        "products": ProductSerializer(products, many=True).data,
-        "subscriptions": SubscriptionSerializer(subscriptions, many=True).data,
-        "recent_payments": PaymentTransactionSerializer(recent_payments, many=True).data,
-        "subscription_basket": SubscriptionBasketItemSerializer(basket_items, many=True).data,
+    response = Response({
+        "customer": customer_section["customer"],
+        "products": catalog["products"],
+        "subscriptions": catalog["subscriptions"],
+        "recent_payments": customer_section["recent_payments"],
+        "subscription_basket": customer_section["subscription_basket"],
     })
+    response['Server-Timing'] = ", ".join(
+        f"{name};dur={(end - start) * 1000:.1f}"
+        for name, start, end in (
+            ("resolve", started, resolved),
+            ("catalog", resolved, catalog_done),
+            ("customer", catalog_done, customer_done),
+        )
+    )
+    return response
 
 
 @api_view(['GET', 'POST', 'DELETE'])
@@ -723,7 +903,7 @@ def user_subscription_basket(request):
         if not product_id:
             return Response({"error": "product_id is required"}, status=status.HTTP_400_BAD_REQUEST)
         SubscriptionBasketItem.objects.filter(customer=customer, product_id=product_id, is_active=True).update(is_active=False)
-        _rebuild_future_subscription_deliveries(customer)
+        rebuild_future_subscription_deliveries(customer)
         return Response({"message": "Removed from subscription basket"})
 
     product_id = request.data.get('product')
@@ -750,7 +930,7 @@ def user_subscription_basket(request):
         is_active=True,
         defaults={'quantity': quantity, 'frequency': frequency},
     )
-    _rebuild_future_subscription_deliveries(customer)
+    rebuild_future_subscription_deliveries(customer)
     return Response({"message": "Subscription basket updated", "item": SubscriptionBasketItemSerializer(item).data})
 
 
@@ -761,11 +941,16 @@ def user_subscription_deliveries(request):
         return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
 
     days = int(request.query_params.get('days') or 7)
+    return Response({"deliveries": _upcoming_deliveries(customer, days)})
+
+
+def _upcoming_deliveries(customer, days):
+    """Serialized deliveries for the next ``days`` (1-31), rebuilding the schedule first."""
     days = min(max(days, 1), 31)
 
     if customer.subscription and customer.subscription_end_date and customer.subscription_end_date.date() >= timezone.localdate():
         # Ensure future schedule exists if basket is present.
-        _rebuild_future_subscription_deliveries(customer)
+        rebuild_future_subscription_deliveries(customer)
 
     start = timezone.localdate()
     end = start + timedelta(days=days - 1)
@@ -775,10 +960,30 @@ def user_subscription_deliveries(request):
         .prefetch_related('items')
         .order_by('scheduled_for')
     )
-    return Response({"deliveries": SubscriptionDeliverySerializer(deliveries, many=True).data})
+    return SubscriptionDeliverySerializer(deliveries, many=True).data
+
+
+@api_view(['GET'])
+def user_subscription_delivery_history(request):
+    customer = _resolve_customer_for_user_request(request)
+    if not customer:
+        return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        start, end, limit = _parse_history_window(request)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    history = _merged_delivery_history(
+        SubscriptionDelivery.objects.filter(customer=customer),
+        SubscriptionDeliveryArchive.objects.filter(customer=customer),
+        start, end, limit,
+    )
+    return Response({"start": start, "end": end, "deliveries": history})
 
 
 @api_view(['POST'])
+@idempotent('user-subscribe')
 def user_subscribe(request):
     customer = _resolve_customer_for_user_request(request)
     if not customer:
@@ -794,7 +999,7 @@ def user_subscribe(request):
     if not subscription:
         return Response({"error": "Subscription plan not found or inactive"}, status=status.HTTP_404_NOT_FOUND)
 
-    transaction = PaymentTransaction.objects.create(
+    payment_transaction = PaymentTransaction.objects.create(
         customer=customer,
         subscription=subscription,
         amount=subscription.price,
@@ -802,41 +1007,43 @@ def user_subscribe(request):
         status='pending',
         currency='INR',
     )
-
-    payment_success, failure_reason = _validate_payment_details(payment_method, request.data)
-
-    if payment_success:
-        now = timezone.now()
-        transaction.status = 'success'
-        transaction.paid_at = now
-        transaction.failure_reason = None
-        transaction.save(update_fields=['status', 'paid_at', 'failure_reason'])
-
-        customer.subscription = subscription
-        customer.subscription_start_date = now
-        customer.subscription_end_date = now + timedelta(days=subscription.duration_days)
-        customer.save(update_fields=['subscription', 'subscription_start_date', 'subscription_end_date'])
-
-        _rebuild_future_subscription_deliveries(customer, start_date=customer.subscription_start_date.date())
-
+    mark_writes_committed(request)
+
+    details_valid, failure_reason = _validate_payment_details(payment_method, request.data)
+    if details_valid:
+        submit_payment(payment_transaction, payment_method, request.data)
+        payment_transaction.refresh_from_db()
+    else:
+        apply_subscription_payment_result(payment_transaction, False, failure_reason)
+        payment_transaction.refresh_from_db()
+    return _subscription_payment_response(payment_transaction)
+
+
+def _subscription_payment_response(payment_transaction):
+    if payment_transaction.status == 'success':
+        customer = payment_transaction.customer
+        customer.refresh_from_db(fields=['subscription_start_date', 'subscription_end_date'])
         return Response({
             "message": "Payment successful and subscription activated",
-            "payment": PaymentTransactionSerializer(transaction).data,
+            "payment": PaymentTransactionSerializer(payment_transaction).data,
             "subscription": {
-                "name": subscription.name,
+                "name": payment_transaction.subscription.name,
                 "start_date": customer.subscription_start_date,
                 "end_date": customer.subscription_end_date,
             },
         }, status=status.HTTP_201_CREATED)
 
-    transaction.status = 'failed'
-    transaction.failure_reason = failure_reason
-    transaction.save(update_fields=['status', 'failure_reason'])
+    if payment_transaction.status == 'failed':
+        return Response({
+            "error": "Payment failed",
+            "reason": payment_transaction.failure_reason,
+            "payment": PaymentTransactionSerializer(payment_transaction).data,
+        }, status=status.HTTP_400_BAD_REQUEST)
+
     return Response({
-        "error": "Payment failed",
-        "reason": failure_reason,
-        "payment": PaymentTransactionSerializer(transaction).data,
-    }, status=status.HTTP_400_BAD_REQUEST)
+        "message": "Payment is being processed",
+        "payment": PaymentTransactionSerializer(payment_transaction).data,
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['GET'])
@@ -845,8 +1052,42 @@ def user_payments(request):
     if not customer:
         return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
 
+    return Response(_customer_payments(customer))
+
+
+def _customer_payments(customer):
     payments = PaymentTransaction.objects.filter(customer=customer).order_by('-created_at')
-    return Response(PaymentTransactionSerializer(payments, many=True).data)
+    return PaymentTransactionSerializer(payments, many=True).data
+
+
+@api_view(['GET'])
+def user_payment_status(request, reference):
+    """Poll a subscription or order payment by its transaction reference until it leaves pending."""
+    customer = _resolve_customer_for_user_request(request)
+    if not customer:
+        return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
+
+    payment_transaction = (
+        PaymentTransaction.objects.select_related('subscription')
+        .filter(customer=customer, transaction_reference=reference)
+        .first()
+    )
+    if payment_transaction:
+        payment_transaction.customer = customer
+        response = _subscription_payment_response(payment_transaction)
+    else:
+        payment = (
+            OrderPayment.objects.select_related('order')
+            .filter(order__customer=customer, transaction_reference=reference)
+            .first()
+        )
+        if not payment:
+            return Response({"error": "Payment not found"}, status=status.HTTP_404_NOT_FOUND)
+        prefetch_related_objects([payment.order], 'items__product')
+        response = _order_payment_response(payment.order, payment)
+    # Polling succeeded even when the payment did not; the outcome is in the body.
+    response.status_code = status.HTTP_200_OK
+    return response
 
 
 @api_view(['POST'])
@@ -865,11 +1106,15 @@ def user_deactivate_subscription(request):
     customer.save(update_fields=['subscription', 'subscription_start_date', 'subscription_end_date'])
 
     # Remove any future scheduled deliveries; keep history (delivered/missed).
-    SubscriptionDelivery.objects.filter(
+    future_deliveries = SubscriptionDelivery.objects.filter(
         customer=customer,
         scheduled_for__gte=timezone.localdate(),
         status='scheduled',
-    ).delete()
+    )
+    with transaction.atomic():
+        removed = summarize_deliveries(future_deliveries)
+        future_deliveries.delete()
+        apply_delivery_summary_delta(diff_summaries({}, removed))
 
     return Response({
         "message": "Subscription deactivated successfully",
@@ -877,24 +1122,76 @@ def user_deactivate_subscription(request):
     })
 
 
+def _place_order(customer, normalized_items, reservations, subtotal, tax_amount, total_amount, payment_method, failure_reason=None):
+    """
+    Write the order, its items, stock reservations and payment as one unit of work.
+
+    The order and payment start out pending with the stock held (or failed when
+    ``failure_reason`` is given); api.payments settles them once the gateway
+    answers. Checkout issues four INSERT statements (order, bulk items, bulk
+    reservations, payment) whatever the cart size, and a failure leaves no
+    partial order behind.
+    """
+    order_status = 'failed' if failure_reason else 'pending'
+
+    with transaction.atomic():
+        order = Order.objects.create(
+            customer=customer,
+            subtotal=subtotal,
+            tax_amount=tax_amount,
+            total_amount=total_amount,
+            currency='INR',
+            status=order_status,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=line_item['product'],
+                quantity=line_item['quantity'],
+                unit_price=line_item['unit_price'],
+                line_total=line_item['line_total'],
+            )
+            for line_item in normalized_items
+        ])
+        for reservation in reservations:
+            reservation.order = order
+            reservation.status = 'held'
+        StockReservation.objects.bulk_create(reservations)
+        payment = OrderPayment.objects.create(
+            order=order,
+            amount=total_amount,
+            currency='INR',
+            status=order_status,
+            payment_method=payment_method if payment_method in ['card', 'upi', 'netbanking', 'cod'] else 'card',
+            failure_reason=failure_reason,
+        )
+        if failure_reason:
+            record_order_payment_failed(order)
+    if failure_reason:
+        record_payment_failure('order', failure_reason)
+    return order, payment
+
+
 @api_view(['POST'])
+@idempotent('user-cart-checkout')
 def user_cart_checkout(request):
     customer = _resolve_customer_for_user_request(request)
     if not customer:
+        record_checkout('invalid_customer')
         return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
 
     cart_items = request.data.get("items") or []
     payment_method = (request.data.get("payment_method") or "card").lower()
 
     if not isinstance(cart_items, list) or len(cart_items) == 0:
+        record_checkout('invalid_cart')
         return Response({"error": "Cart items are required"}, status=status.HTTP_400_BAD_REQUEST)
 
     product_ids = [item.get('product_id') for item in cart_items if item.get('product_id')]
     products = Product.objects.filter(product_id__in=product_ids, status='active')
     product_map = {product.product_id: product for product in products}
-    subscription_only_products = [product for product in products if getattr(product, 'subscription_only', False)]
 
-    subtotal = 0
+    subtotal = Decimal('0.00')
     normalized_items = []
     subscription_only_hits = []
 
@@ -903,6 +1200,7 @@ def user_cart_checkout(request):
         quantity = int(item.get('quantity') or 0)
         product = product_map.get(product_id)
         if not product or quantity <= 0:
+            record_checkout('invalid_cart')
             return Response({"error": "Invalid cart item payload"}, status=status.HTTP_400_BAD_REQUEST)
 
         if product.subscription_only:
@@ -912,8 +1210,8 @@ def user_cart_checkout(request):
             })
             continue
 
-        unit_price = float(product.price)
-        line_total = unit_price * quantity
+        unit_price = product.price
+        line_total = (unit_price * quantity).quantize(CENTS)
         subtotal += line_total
         normalized_items.append({
             'product': product,
@@ -923,6 +1221,7 @@ def user_cart_checkout(request):
         })
 
     if subscription_only_hits:
+        record_checkout('subscription_only')
         return Response(
             {
                 "error": "Some items require subscription delivery",
@@ -931,73 +1230,410 @@ def user_cart_checkout(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    tax_amount = round(subtotal * 0.05, 2)
-    total_amount = round(subtotal + tax_amount, 2)
-
-    order = Order.objects.create(
-        customer=customer,
-        subtotal=subtotal,
-        tax_amount=tax_amount,
-        total_amount=total_amount,
-        currency='INR',
-        status='pending',
-    )
+    tax_amount = (subtotal * ORDER_TAX_RATE).quantize(CENTS, rounding=ROUND_HALF_UP)
+    total_amount = subtotal + tax_amount
 
-    for line_item in normalized_items:
-        OrderItem.objects.create(
-            order=order,
-            product=line_item['product'],
-            quantity=line_item['quantity'],
-            unit_price=line_item['unit_price'],
-            line_total=line_item['line_total'],
+    try:
+        reservations = reserve_stock([(line['product'], line['quantity']) for line in normalized_items])
+    except InsufficientStock as exc:
+        record_checkout('out_of_stock')
+        return Response(
+            {
+                "error": "Insufficient stock",
+                "out_of_stock_items": [{"product_id": exc.product.product_id, "name": exc.product.name}],
+            },
+            status=status.HTTP_409_CONFLICT,
         )
 
-    payment = OrderPayment.objects.create(
-        order=order,
-        amount=total_amount,
-        currency='INR',
-        status='pending',
-        payment_method=payment_method if payment_method in ['card', 'upi', 'netbanking', 'cod'] else 'card',
-    )
+    details_valid, failure_reason = _validate_payment_details(payment_method, request.data)
+    try:
+        order, payment = _place_order(
+            customer, normalized_items, reservations, subtotal, tax_amount, total_amount,
+            payment_method, None if details_valid else failure_reason,
+        )
+    except Exception:
+        release_stock(reservations)
+        raise
+    mark_writes_committed(request)
+    if not details_valid:
+        release_order_reservations(order)
+    elif payment_method != 'cod':
+        submit_payment(payment, payment_method, request.data)
+        payment.refresh_from_db()
+        order.refresh_from_db(fields=['status', 'updated_at'])
+    prefetch_related_objects([order], 'items__product')
+    record_checkout({'success': 'paid', 'failed': 'payment_failed'}.get(
+        payment.status, 'cod' if payment_method == 'cod' else 'processing',
+    ))
+    return _order_payment_response(order, payment)
+
+
+def _order_payment_response(order, payment):
+    if payment.status == 'failed':
+        return Response({
+            "error": "Order payment failed",
+            "reason": payment.failure_reason,
+            "order": OrderSerializer(order).data,
+            "payment": OrderPaymentSerializer(payment).data,
+        }, status=status.HTTP_400_BAD_REQUEST)
 
-    payment_success, failure_reason = _validate_payment_details(payment_method, request.data)
-    if payment_success:
-        now = timezone.now()
-        if payment_method == 'cod':
-            payment.status = 'pending'
-            payment.paid_at = None
-        else:
-            payment.status = 'success'
-            payment.paid_at = now
-        payment.failure_reason = None
-        payment.save(update_fields=['status', 'paid_at', 'failure_reason'])
-        order.status = 'pending' if payment_method == 'cod' else 'paid'
-        order.save(update_fields=['status'])
+    if payment.status == 'pending' and payment.payment_method != 'cod':
         return Response({
-            "message": "Order placed" if payment_method == 'cod' else "Order payment successful",
+            "message": "Order payment is being processed",
             "order": OrderSerializer(order).data,
             "payment": OrderPaymentSerializer(payment).data,
-        }, status=status.HTTP_201_CREATED)
+        }, status=status.HTTP_202_ACCEPTED)
 
-    payment.status = 'failed'
-    payment.failure_reason = failure_reason
-    payment.save(update_fields=['status', 'failure_reason'])
-    order.status = 'failed'
-    order.save(update_fields=['status'])
     return Response({
-        "error": "Order payment failed",
-        "reason": failure_reason,
+        "message": "Order placed" if payment.payment_method == 'cod' else "Order payment successful",
         "order": OrderSerializer(order).data,
         "payment": OrderPaymentSerializer(payment).data,
-    }, status=status.HTTP_400_BAD_REQUEST)
+    }, status=status.HTTP_201_CREATED)
+
+
+class OrderHistoryPagination(CursorPagination):
+    """Keyset pagination over (created_at, order_id); stable while new orders arrive."""
+    ordering = ('-created_at', '-order_id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def _order_items_prefetch():
+    return Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('order_item_id'))
 
 
 @api_view(['GET'])
 def user_orders(request):
+    """
+    Cursor-paginated order history, newest first.
+
+    Query params: ``start`` / ``end`` (YYYY-MM-DD, inclusive), ``status``,
+    ``view=summary`` to omit line items (``item_count`` instead), ``cursor``
+    and ``page_size``. Each page costs two queries in summary view and three
+    with items, independent of page size.
+    """
+    customer = _resolve_customer_for_user_request(request)
+    if not customer:
+        return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        orders, summary = _customer_orders(customer, request.query_params)
+    except ValueError:
+        return Response({"error": "start and end must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+    return _order_history_page(orders, summary, request)
+
+
+def _customer_orders(customer, query_params):
+    """(queryset, summary) for user_orders' filters; ValueError for a malformed start/end."""
+    orders = Order.objects.filter(customer=customer).select_related('customer')
+    start_param = query_params.get('start')
+    end_param = query_params.get('end')
+    if start_param:
+        start = timezone.make_aware(datetime.combine(date.fromisoformat(start_param), time.min))
+        orders = orders.filter(created_at__gte=start)
+    if end_param:
+        end = timezone.make_aware(datetime.combine(date.fromisoformat(end_param) + timedelta(days=1), time.min))
+        orders = orders.filter(created_at__lt=end)
+    order_status = query_params.get('status')
+    if order_status:
+        orders = orders.filter(status=order_status)
+
+    summary = query_params.get('view') == 'summary'
+    if summary:
+        orders = orders.annotate(item_count=Count('items'))
+    else:
+        orders = orders.prefetch_related(_order_items_prefetch())
+    return orders, summary
+
+
+def _order_history_page(orders, summary, request):
+    paginator = OrderHistoryPagination()
+    page = paginator.paginate_queryset(orders, request)
+    serializer_class = OrderSummarySerializer if summary else OrderSerializer
+    return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+
+@api_view(['GET'])
+def user_order_detail(request, order_id):
+    """One order with its line items, for expanding a summary row."""
+    customer = _resolve_customer_for_user_request(request)
+    if not customer:
+        return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
+
+    order = (
+        Order.objects.filter(customer=customer, order_id=order_id)
+        .select_related('customer')
+        .prefetch_related(_order_items_prefetch())
+        .first()
+    )
+    if not order:
+        return Response({"error": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(OrderSerializer(order).data)
+
+
+def _compute_reorder_suggestions(customer):
+    """Every active, cart-purchasable product the customer has bought, aggregated in one query."""
+    paid_items = OrderItem.objects.filter(order__customer=customer, order__status='paid')
+    last_quantity = (
+        paid_items.filter(product=OuterRef('product'))
+        .order_by('-order__created_at', '-order_item_id')
+        .values('quantity')[:1]
+    )
+    rows = (
+        paid_items.filter(product__status='active', product__subscription_only=False)
+        .order_by()
+        .values('product_id', 'product__name', 'product__price')
+        .annotate(
+            times_ordered=Count('order', distinct=True),
+            total_quantity=Sum('quantity'),
+            last_ordered_at=Max('order__created_at'),
+            last_quantity=Subquery(last_quantity),
+        )
+    )
+    return [
+        {
+            "product_id": row['product_id'],
+            "name": row['product__name'],
+            "price": str(row['product__price']),
+            "times_ordered": row['times_ordered'],
+            "total_quantity": row['total_quantity'],
+            "last_quantity": row['last_quantity'],
+            "last_ordered_at": row['last_ordered_at'].isoformat(),
+        }
+        for row in rows
+    ]
+
+
+@api_view(['GET'])
+def user_reorder_suggestions(request):
+    """
+    "Buy again" list: ?sort=frequent (default, most orders first) or ?sort=recent, ?limit=N.
+
+    Cached per customer until a new order of theirs is paid.
+    """
     customer = _resolve_customer_for_user_request(request)
     if not customer:
         return Response({"error": "Valid customer not found"}, status=status.HTTP_400_BAD_REQUEST)
 
-    orders = Order.objects.filter(customer=customer).order_by('-created_at')
-    return Response(OrderSerializer(orders, many=True).data)
+    sort = request.query_params.get('sort') or 'frequent'
+    if sort not in ('frequent', 'recent'):
+        return Response({"error": "sort must be frequent or recent"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit') or 12), 1), 50)
+    except ValueError:
+        return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+    suggestions = get_reorder_suggestions(customer, lambda: _compute_reorder_suggestions(customer))
+    if sort == 'frequent':
+        suggestions = sorted(suggestions, key=lambda row: (row['times_ordered'], row['last_ordered_at']), reverse=True)
+    else:
+        suggestions = sorted(suggestions, key=lambda row: row['last_ordered_at'], reverse=True)
+    return Response({"sort": sort, "suggestions": suggestions[:limit]})
+
+# ======================== ADMIN REPORTS ========================
+def _compute_admin_stats(admin):
+    def scoped(queryset, owner_field='owner_admin'):
+        if admin.role == "super_admin":
+            return queryset
+        return queryset.filter(**{owner_field: admin})
+
+    now = timezone.now()
+    today = timezone.localdate()
+    category_count = scoped(Category.objects.all()).count()
+    subscriptions = scoped(Subscription.objects.all()).aggregate(
+        total=Count('subscription_id'),
+        active=Count('subscription_id', filter=Q(is_active=True)),
+    )
+    customers = scoped(Customer.objects.all()).aggregate(
+        total=Count('customer_id'),
+        active_subscribers=Count(
+            'customer_id',
+            filter=Q(subscription__isnull=False, subscription_end_date__gte=now),
+        ),
+    )
+    products = scoped(Product.objects.all(), 'created_by').annotate(
+        available_stock=_available_stock_annotation(),
+    ).aggregate(
+        total=Count('product_id'),
+        low_stock=Count('product_id', filter=Q(status='active', available_stock__lt=LOW_STOCK_THRESHOLD)),
+    )
+    deliveries_today = scoped(
+        DeliveryDailySummary.objects.filter(summary_date=today, status='scheduled')
+    ).aggregate(total=Sum('delivery_count'))['total'] or 0
+
+    return {
+        # AdminViewSet only ever lists the signed-in admin.
+        "admins": 1,
+        "categories": category_count,
+        "subscriptions": subscriptions['total'],
+        "active_subscriptions": subscriptions['active'],
+        "customers": customers['total'],
+        "active_subscribers": customers['active_subscribers'],
+        "products": products['total'],
+        "low_stock_products": products['low_stock'],
+        "low_stock_threshold": LOW_STOCK_THRESHOLD,
+        "scheduled_deliveries_today": deliveries_today,
+        "generated_at": now.isoformat(),
+    }
+
+
+@api_view(['GET'])
+def admin_stats(request):
+    """Entity counts and KPIs for the admin dashboard, scoped to the signed-in admin."""
+    admin = _resolve_admin_for_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
+    return Response(get_admin_stats(admin.admin_id, lambda: _compute_admin_stats(admin)))
+
+
+@api_view(['GET', 'DELETE'])
+def admin_query_stats(request):
+    """Per-endpoint query counts and timings recorded by this worker process; DELETE resets them."""
+    admin = _resolve_admin_for_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
+    if request.method == 'DELETE':
+        reset_endpoint_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response({
+        "enabled": settings.QUERY_INSTRUMENTATION,
+        "slow_query_ms": settings.QUERY_SLOW_MS,
+        "endpoints": endpoint_stats(),
+    })
+
+
+REPORT_BUCKETS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def _parse_report_window(request):
+    """Read start/end/bucket query params; raises ValueError on malformed input."""
+    start, end, _ = _parse_history_window(request)
+    bucket = request.query_params.get('bucket') or 'day'
+    if bucket not in REPORT_BUCKETS:
+        raise ValueError("bucket must be one of: day, week, month")
+    return start, end, bucket
+
+
+def _money(value):
+    # SUM() over DECIMAL comes back with backend-specific precision; reports use cents.
+    return (value or Decimal('0')).quantize(CENTS)
 
+
+def _bucketed(queryset, bucket, *group_by):
+    """Group a rollup queryset by ``group_by`` and its summary_date truncated to ``bucket``."""
+    trunc = REPORT_BUCKETS[bucket]
+    period = trunc('summary_date') if trunc else F('summary_date')
+    return queryset.order_by().annotate(period=period).values(*group_by, 'period')
+
+
+@api_view(['GET'])
+def admin_sales_report(request):
+    """
+    Order and subscription revenue series from sales_daily_summary.
+
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD&bucket=day|week|month (default: last 30 days by day).
+    """
+    admin = _resolve_admin_for_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        start, end, bucket = _parse_report_window(request)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    summaries = SalesDailySummary.objects.filter(summary_date__gte=start, summary_date__lte=end)
+    if admin.role != "super_admin":
+        summaries = summaries.filter(owner_admin=admin)
+    rows = _bucketed(summaries, bucket).annotate(
+        orders=Sum('order_count'),
+        order_revenue_total=Sum('order_revenue'),
+        failed_order_payments=Sum('failed_order_payment_count'),
+        subscription_payments=Sum('subscription_payment_count'),
+        subscription_revenue_total=Sum('subscription_revenue'),
+        failed_subscription_payments=Sum('failed_subscription_payment_count'),
+    ).order_by('period')
+
+    series = []
+    totals = {
+        "orders": 0, "order_revenue": Decimal('0.00'), "failed_order_payments": 0,
+        "subscription_payments": 0, "subscription_revenue": Decimal('0.00'),
+        "failed_subscription_payments": 0, "revenue": Decimal('0.00'),
+    }
+    for row in rows:
+        point = {
+            "orders": row['orders'],
+            "order_revenue": _money(row['order_revenue_total']),
+            "failed_order_payments": row['failed_order_payments'],
+            "subscription_payments": row['subscription_payments'],
+            "subscription_revenue": _money(row['subscription_revenue_total']),
+            "failed_subscription_payments": row['failed_subscription_payments'],
+        }
+        point["revenue"] = point["order_revenue"] + point["subscription_revenue"]
+        for key in totals:
+            totals[key] += point[key]
+        series.append({"period": row['period'], **point})
+
+    return Response({"start": start, "end": end, "bucket": bucket, "series": series, "totals": totals})
+
+
+@api_view(['GET'])
+def admin_product_sales_report(request):
+    """
+    Units sold and revenue per product from product_daily_sales.
+
+    ?start&end&bucket as for the sales report, plus optional ?product=<id> and
+    ?limit=N (top products by units over the window, default 10).
+    """
+    admin = _resolve_admin_for_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        start, end, bucket = _parse_report_window(request)
+        limit = min(max(int(request.query_params.get('limit') or 10), 1), 100)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    sales = ProductDailySales.objects.filter(summary_date__gte=start, summary_date__lte=end)
+    if admin.role != "super_admin":
+        sales = sales.filter(owner_admin=admin)
+    product_id = request.query_params.get('product')
+    if product_id:
+        sales = sales.filter(product_id=product_id)
+
+    top_products = list(
+        sales.order_by()
+        .values('product_id', 'product__name')
+        .annotate(units_sold=Sum('units_sold'), revenue=Sum('revenue'))
+        .order_by('-units_sold', 'product_id')[:limit]
+    )
+    series = {row['product_id']: [] for row in top_products}
+    rows = (
+        _bucketed(sales.filter(product_id__in=list(series)), bucket, 'product_id')
+        .annotate(units=Sum('units_sold'), amount=Sum('revenue'))
+        .order_by('product_id', 'period')
+    )
+    for row in rows:
+        series[row['product_id']].append({
+            "period": row['period'], "units_sold": row['units'], "revenue": _money(row['amount']),
+        })
+
+    return Response({
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "products": [
+            {
+                "product_id": row['product_id'],
+                "name": row['product__name'],
+                "units_sold": row['units_sold'],
+                "revenue": _money(row['revenue']),
+                "series": series[row['product_id']],
+            }
+            for row in top_products
+        ],
+    })
@@ -0,0 +1 @@
+"""Database backends with a process-level connection pool (see config.db_pool)."""
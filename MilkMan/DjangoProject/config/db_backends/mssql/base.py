@@ -0,0 +1,7 @@
+from mssql.base import DatabaseWrapper as MssqlDatabaseWrapper
+
+from config.db_pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, MssqlDatabaseWrapper):
+    """mssql-django with pooled ODBC connections."""
@@ -0,0 +1,7 @@
+from django.db.backends.sqlite3.base import DatabaseWrapper as SqliteDatabaseWrapper
+
+from config.db_pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, SqliteDatabaseWrapper):
+    """SQLite with pooled connections; the local stand-in for the pooled mssql backend."""
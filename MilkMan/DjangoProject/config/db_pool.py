@@ -0,0 +1,234 @@
+"""
+Process-level database connection pool.
+
+Django opens one connection per thread and, with CONN_MAX_AGE=0, closes it at
+the end of every request; with SQL Server every open is a full ODBC login.
+The pooled backends in ``config.db_backends`` keep closed connections in a
+per-process pool instead and hand them to the next request, so a gunicorn
+worker pays the login cost at most ``size + max_overflow`` times.
+
+Pool settings live under ``DATABASES[alias]['POOL']``::
+
+    'POOL': {'size': 5, 'max_overflow': 10, 'recycle': 1800, 'timeout': 30, 'pre_ping': True}
+
+``size`` connections are kept idle, up to ``max_overflow`` more are opened
+under load and closed when returned, connections older than ``recycle``
+seconds are replaced, and a checkout waits at most ``timeout`` seconds for a
+free slot before raising PoolTimeout. With ``pre_ping`` an idle connection
+runs ``SELECT 1`` before it is handed out; one the server dropped (restart,
+failover, idle timeout) is closed and replaced. CONN_MAX_AGE is 0 with the
+pool, so Django's own CONN_HEALTH_CHECKS never get the chance to.
+"""
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+DEFAULT_POOL_OPTIONS = {
+    'size': 5,
+    'max_overflow': 10,
+    'recycle': 1800,
+    'timeout': 30,
+    'pre_ping': True,
+}
+
+
+class PoolTimeout(OperationalError):
+    """No connection became available within the pool timeout."""
+
+
+class ConnectionPool:
+    def __init__(self, size, max_overflow, recycle, timeout, pre_ping=True):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.recycle = recycle
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._idle = deque()  # (raw_connection, created_at), most recently returned last
+        self._created_at = {}  # id(raw_connection) -> created_at, for every open connection
+        self._condition = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'connects': 0,
+            'reuses': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'recycled': 0,
+            'discarded': 0,
+            'failed_pings': 0,
+            'wait_seconds': 0.0,
+        }
+
+    @property
+    def open_connections(self):
+        return len(self._created_at)
+
+    def acquire(self, connect, ping=None):
+        """
+        Return an idle connection, or open one with ``connect()`` if the pool has room.
+
+        With ``pre_ping``, an idle connection for which ``ping(raw)`` is false is
+        closed and the next one tried. The ping runs outside the pool lock.
+        """
+        with self._condition:
+            self._stats['checkouts'] += 1
+        while True:
+            raw, reused = self._checkout(connect)
+            if not reused:
+                return raw
+            if not self.pre_ping or ping is None or ping(raw):
+                with self._condition:
+                    self._stats['reuses'] += 1
+                return raw
+            with self._condition:
+                self._stats['failed_pings'] += 1
+                self._forget(raw)
+                self._condition.notify()
+
+    def _checkout(self, connect):
+        """(raw, reused): an idle connection, else a new one once a slot is free."""
+        deadline = None
+        waited_since = None
+        with self._condition:
+            while True:
+                while self._idle:
+                    raw, created_at = self._idle.pop()
+                    if self.recycle and time.monotonic() - created_at > self.recycle:
+                        self._stats['recycled'] += 1
+                        self._forget(raw)
+                        continue
+                    self._record_wait(waited_since)
+                    return raw, True
+                if self.open_connections < self.size + self.max_overflow:
+                    # Reserve the slot before connecting outside the lock.
+                    placeholder = object()
+                    self._created_at[id(placeholder)] = time.monotonic()
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.timeout
+                    waited_since = time.monotonic()
+                    self._stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._record_wait(waited_since)
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool size {self.size}, overflow {self.max_overflow})"
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            raw = connect()
+        except Exception:
+            with self._condition:
+                del self._created_at[id(placeholder)]
+                self._condition.notify()
+            raise
+        with self._condition:
+            del self._created_at[id(placeholder)]
+            self._created_at[id(raw)] = time.monotonic()
+            self._stats['connects'] += 1
+            self._record_wait(waited_since)
+        return raw, False
+
+    def release(self, raw, discard=False):
+        """Return a connection; it is closed instead when broken, expired or beyond ``size`` idle."""
+        with self._condition:
+            created_at = self._created_at.get(id(raw), 0)
+            expired = self.recycle and time.monotonic() - created_at > self.recycle
+            if discard or expired or len(self._idle) >= self.size:
+                if discard:
+                    self._stats['discarded'] += 1
+                elif expired:
+                    self._stats['recycled'] += 1
+                self._forget(raw)
+            else:
+                self._idle.append((raw, created_at))
+            self._condition.notify()
+
+    def stats(self):
+        with self._condition:
+            return {
+                **self._stats,
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self.open_connections,
+                'idle': len(self._idle),
+                'in_use': self.open_connections - len(self._idle),
+            }
+
+    def close_all(self):
+        with self._condition:
+            while self._idle:
+                raw, _ = self._idle.pop()
+                self._forget(raw)
+
+    def _forget(self, raw):
+        self._created_at.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _record_wait(self, waited_since):
+        if waited_since is not None:
+            self._stats['wait_seconds'] += time.monotonic() - waited_since
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(**{**DEFAULT_POOL_OPTIONS, **(options or {})})
+        return pool
+
+
+def pool_stats():
+    """{alias: stats} for every pool opened in this process."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """Mix into a backend's DatabaseWrapper to check raw connections out of a ConnectionPool."""
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict.get('POOL'))
+
+    def connect_raw(self, conn_params):
+        return super().get_new_connection(conn_params)
+
+    def get_new_connection(self, conn_params):
+        return self.pool.acquire(lambda: self.connect_raw(conn_params), ping=self.ping_raw)
+
+    def ping_raw(self, raw):
+        """Cheap liveness check for an idle connection; it is in autocommit, so no transaction is left open."""
+        try:
+            cursor = raw.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Connections closed mid-transaction or after an error are not trusted again.
+        discard = self.in_atomic_block or self.errors_occurred
+        if not discard:
+            try:
+                self.connection.rollback()
+            except Exception:
+                discard = True
+        self.pool.release(self.connection, discard=discard)
@@ -0,0 +1,137 @@
+"""
+Read-replica routing.
+
+When a ``replica`` database is configured, ``ReplicaRoutingMiddleware``
+marks each request as replica-safe or primary-only and ``ReplicaRouter``
+sends reads of the ``api`` models accordingly:
+
+* GET/HEAD/OPTIONS requests read from the replica;
+* other methods, and any request after it has written or opened a
+  transaction, use the primary for everything;
+* after a write request the session is pinned to the primary for
+  ``DB_READ_YOUR_WRITES_SECONDS``, so a client never reads data older than
+  its own last change while the replica catches up.
+
+Writes always go to ``default``. Reads outside a request (management
+commands, workers) and of Django's own apps (sessions, auth) stay on the
+primary, since they usually read-then-write.
+"""
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+PRIMARY_ALIAS = 'default'
+REPLICA_ALIAS = 'replica'
+REPLICA_APP_LABELS = {'api'}
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+SESSION_KEY = 'db_primary_until'
+
+# None outside a request; otherwise whether this request may read from the replica.
+_replica_allowed = ContextVar('replica_allowed', default=None)
+
+_query_counts = Counter()
+_query_counts_lock = threading.Lock()
+
+
+def query_counts():
+    """{alias: queries executed} since the process started or the last reset."""
+    with _query_counts_lock:
+        return dict(_query_counts)
+
+
+def reset_query_counts():
+    with _query_counts_lock:
+        _query_counts.clear()
+
+
+def _count_queries(execute, sql, params, many, context):
+    alias = context['connection'].alias
+    with _query_counts_lock:
+        _query_counts[alias] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_queries)
+
+
+connection_created.connect(_install_query_counter, dispatch_uid='config.db_router.query_counter')
+
+
+def use_primary():
+    """Send the rest of the current request's reads to the primary."""
+    if _replica_allowed.get() is not None:
+        _replica_allowed.set(False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICA_APP_LABELS or not _replica_allowed.get():
+            return PRIMARY_ALIAS
+        if connections[PRIMARY_ALIAS].in_atomic_block:
+            # Reads inside a transaction must see its own writes and locks.
+            use_primary()
+            return PRIMARY_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        use_primary()
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        if {obj1._state.db, obj2._state.db} <= {PRIMARY_ALIAS, REPLICA_ALIAS}:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Place after SessionMiddleware so the read-your-writes marker is saved with the session."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _replica_allowed.set(self._replica_allowed(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_allowed.reset(token)
+        self._pin_after_write(request)
+        return response
+
+    async def __acall__(self, request):
+        # Reading the session may load it from the database.
+        token = _replica_allowed.set(await sync_to_async(self._replica_allowed)(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica_allowed.reset(token)
+        if request.method not in SAFE_METHODS:
+            await sync_to_async(self._pin_after_write)(request)
+        return response
+
+    def _replica_allowed(self, request):
+        session = getattr(request, 'session', None)
+        pinned_until = session.get(SESSION_KEY, 0) if session is not None else 0
+        return request.method in SAFE_METHODS and pinned_until < time.time()
+
+    def _pin_after_write(self, request):
+        session = getattr(request, 'session', None)
+        # Anonymous sessions are left alone so failed logins don't create session rows.
+        if request.method not in SAFE_METHODS and session is not None and not session.is_empty():
+            session[SESSION_KEY] = time.time() + settings.DB_READ_YOUR_WRITES_SECONDS
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config as env_config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,8 +50,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.PrometheusMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Outside CORS/session/common so their headers are merged and the body is final (api/compression.py).
+    'api.compression.CompressionMiddleware',
+    'api.instrumentation.QueryInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # Just outside SessionMiddleware so it sees the session's cookies and Vary (api/http_cache.py).
+    'api.http_cache.CachePolicyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -102,6 +109,72 @@ DATABASES = {
     }
 }
 
+# Local stand-ins for development and benchmarks (DB_ENGINE=sqlite or postgres, the latter
+# reusing the DB_NAME/DB_HOST/DB_PORT/DB_USER/DB_PASSWORD values); SQL Server stays the default.
+DB_ENGINE = env_config('DB_ENGINE', default='mssql')
+if DB_ENGINE == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env_config('DB_SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+    }
+elif DB_ENGINE == 'postgres':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': DATABASES['default']['NAME'],
+        'USER': DATABASES['default']['USER'],
+        'PASSWORD': DATABASES['default']['PASSWORD'],
+        'HOST': DATABASES['default']['HOST'],
+        'PORT': DATABASES['default']['PORT'],
+    }
+
+# Persistent connections: reuse a thread's connection across requests for DB_CONN_MAX_AGE
+# seconds (0 closes it after every request), checking it is alive before each request.
+DATABASES['default']['CONN_MAX_AGE'] = env_config('DB_CONN_MAX_AGE', default=60, cast=int)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env_config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool)
+
+# Optional process-level pool (config/db_pool.py). Connections go back to the pool at the
+# end of each request instead of staying pinned to a thread, so CONN_MAX_AGE is forced to 0.
+DB_POOL = env_config('DB_POOL', default=False, cast=bool)
+if DB_POOL:
+    DATABASES['default']['ENGINE'] = {
+        'mssql': 'config.db_backends.mssql',
+        'django.db.backends.sqlite3': 'config.db_backends.sqlite3',
+        'django.db.backends.postgresql': 'config.db_backends.postgresql',
+    }[DATABASES['default']['ENGINE']]
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['POOL'] = {
+        'size': env_config('DB_POOL_SIZE', default=5, cast=int),
+        'max_overflow': env_config('DB_POOL_MAX_OVERFLOW', default=10, cast=int),
+        'recycle': env_config('DB_POOL_RECYCLE', default=1800, cast=int),
+        'timeout': env_config('DB_POOL_TIMEOUT', default=30, cast=float),
+        # SELECT 1 on each idle connection before reuse; replaces connections the server dropped.
+        'pre_ping': env_config('DB_POOL_PRE_PING', default=True, cast=bool),
+    }
+
+# Optional read replica (config/db_router.py). GET requests read the api tables from it;
+# writes, transactions and a session's requests for DB_READ_YOUR_WRITES_SECONDS after
+# it writes stay on the primary. DB_REPLICA_HOST (SQL Server) or DB_REPLICA_SQLITE_PATH
+# (DB_ENGINE=sqlite) enables it.
+DB_REPLICA_HOST = env_config('DB_REPLICA_HOST', default='')
+DB_REPLICA_SQLITE_PATH = env_config('DB_REPLICA_SQLITE_PATH', default='')
+DB_READ_YOUR_WRITES_SECONDS = env_config('DB_READ_YOUR_WRITES_SECONDS', default=5, cast=int)
+if DB_ENGINE == 'sqlite' and DB_REPLICA_SQLITE_PATH:
+    DATABASES['replica'] = {**DATABASES['default'], 'NAME': DB_REPLICA_SQLITE_PATH}
+elif DB_ENGINE != 'sqlite' and DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': env_config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'NAME': env_config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'TEST': {'MIRROR': 'default'},
+    }
+if 'replica' in DATABASES:
+    DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware') + 1,
+        'config.db_router.ReplicaRoutingMiddleware',
+    )
+
 
 
 # Password validation
@@ -158,6 +231,20 @@ REST_FRAMEWORK = {
     ],
 }
 
+# JSON request/response encoding: 'orjson' (api/renderers.py, same bytes as DRF's classes and
+# pure Python when orjson is not installed) or 'stdlib' for DRF's own JSON renderer and parser.
+JSON_BACKEND = env_config('JSON_BACKEND', default='orjson')
+if JSON_BACKEND == 'orjson':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ]
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = env_config(
     'CORS_ALLOWED_ORIGINS',
@@ -166,6 +253,8 @@ CORS_ALLOWED_ORIGINS = env_config(
 )
 
 CORS_ALLOW_CREDENTIALS = True
+# The frontend sends Idempotency-Key on checkout and subscribe (api/idempotency.py).
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
 
 # Required when using session auth from a separate frontend domain in production.
 CSRF_TRUSTED_ORIGINS = env_config(
@@ -176,10 +265,113 @@ CSRF_TRUSTED_ORIGINS = env_config(
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Apply SQL Server 2025 version detection patch
-try:
-    from .sql_server_patch import patch_sql_server_version
-    patch_sql_server_version()
-except Exception as e:
-    import sys
-    print(f"Warning: Could not apply SQL Server patch: {e}", file=sys.stderr)
+# Completed deliveries older than this many days are moved to the archive tables
+# by `python manage.py archive_deliveries`.
+DELIVERY_ARCHIVE_AFTER_DAYS = env_config('DELIVERY_ARCHIVE_AFTER_DAYS', default=90, cast=int)
+
+# Idempotency-Key handling for retry-prone POST endpoints (user_subscribe, user_cart_checkout).
+IDEMPOTENCY_KEY_TTL_HOURS = env_config('IDEMPOTENCY_KEY_TTL_HOURS', default=24, cast=int)
+IDEMPOTENCY_WAIT_SECONDS = env_config('IDEMPOTENCY_WAIT_SECONDS', default=10, cast=float)
+# A key still processing after this long is treated as abandoned by a dead worker; keep it
+# above the longest request a worker can run (gunicorn's timeout).
+IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS = env_config('IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS', default=120, cast=int)
+
+# Payment processing. In 'queue' mode user_subscribe / user_cart_checkout return the pending
+# record at once and `python manage.py process_payment_jobs` charges the gateway; 'inline'
+# runs the same job inside the request (handy for local development without a worker).
+PAYMENT_PROCESSING_MODE = env_config('PAYMENT_PROCESSING_MODE', default='queue')
+PAYMENT_GATEWAY_CLASS = env_config('PAYMENT_GATEWAY_CLASS', default='api.payments.LocalGateway')
+PAYMENT_GATEWAY_LATENCY_MS = env_config('PAYMENT_GATEWAY_LATENCY_MS', default=0, cast=int)
+PAYMENT_GATEWAY_ERROR_RATE = env_config('PAYMENT_GATEWAY_ERROR_RATE', default=0.0, cast=float)
+PAYMENT_JOB_MAX_ATTEMPTS = env_config('PAYMENT_JOB_MAX_ATTEMPTS', default=5, cast=int)
+
+# Cache used for per-customer and per-admin response caches. The default in-process
+# cache is fine for a single worker; with several gunicorn workers use a shared
+# backend (e.g. django.core.cache.backends.db.DatabaseCache after `manage.py
+# createcachetable`, or a Redis backend) so invalidations reach every process.
+CACHES = {
+    'default': {
+        'BACKEND': env_config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env_config('CACHE_LOCATION', default='milkman'),
+    }
+}
+
+# Seconds a customer's "buy again" list stays cached; a newly paid order changes its key.
+REORDER_SUGGESTIONS_CACHE_SECONDS = env_config('REORDER_SUGGESTIONS_CACHE_SECONDS', default=3600, cast=int)
+
+# Seconds the admin dashboard counts (/api/admin/stats/) are cached per admin.
+ADMIN_STATS_CACHE_SECONDS = env_config('ADMIN_STATS_CACHE_SECONDS', default=30, cast=int)
+
+# Upper bound on how long the shared user-dashboard catalog is cached. Catalog edits bump a
+# version kept in CACHES, so with a shared backend they show on the next request everywhere;
+# with the per-process default only the worker that saved the edit sees it at once, and the
+# others serve the old catalog (and stock levels) for up to this long.
+CATALOG_CACHE_SECONDS = env_config('CATALOG_CACHE_SECONDS', default=300, cast=int)
+
+# Cache-Control for CDNs and reverse proxies (api/http_cache.py). Anonymous GETs of these
+# routes are "public" for (max-age, stale-while-revalidate) seconds; product lists show stock,
+# so they stay fresh for less. Requests with an admin or customer session get "private, no-store".
+HTTP_CACHE_ENABLED = env_config('HTTP_CACHE_ENABLED', default=True, cast=bool)
+HTTP_CACHE_POLICIES = {
+    'product-active-products': (30, 120),
+    'product-featured-products': (60, 300),
+    'category-active-categories': (300, 3600),
+    'subscription-active-subscriptions': (300, 3600),
+}
+
+# gzip (and brotli, when the Brotli package is installed) for responses of an allowlisted
+# content type and at least COMPRESSION_MIN_BYTES; streaming responses always qualify.
+# benchmark_compression compares the levels.
+COMPRESSION_ENABLED = env_config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_BYTES = env_config('COMPRESSION_MIN_BYTES', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = env_config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI = env_config('COMPRESSION_BROTLI', default=True, cast=bool)
+COMPRESSION_BROTLI_LEVEL = env_config('COMPRESSION_BROTLI_LEVEL', default=4, cast=int)
+COMPRESSION_CONTENT_TYPES = env_config(
+    'COMPRESSION_CONTENT_TYPES',
+    default='application/json,text/csv,text/plain,text/html,text/css,application/javascript',
+    cast=Csv(),
+)
+
+# Per-request SQL counts and timings (Server-Timing header, JSON log lines on the
+# api.instrumentation logger, /api/admin/query-stats/). Off removes the middleware entirely.
+QUERY_INSTRUMENTATION = env_config('QUERY_INSTRUMENTATION', default=False, cast=bool)
+# Statements at least this slow are logged with their SQL and view name.
+QUERY_SLOW_MS = env_config('QUERY_SLOW_MS', default=200, cast=float)
+
+# Serve user dashboard-data, subscription-deliveries, payments and orders with the async
+# views in api/async_views.py. Only useful under an ASGI server (config.asgi); each ASGI
+# worker runs their queries on a pool of ASYNC_DB_THREADS threads, one DB connection each.
+USER_VIEWS_ASYNC = env_config('USER_VIEWS_ASYNC', default=False, cast=bool)
+ASYNC_DB_THREADS = env_config('ASYNC_DB_THREADS', default=8, cast=int)
+
+# Prometheus metrics at /metrics (api/metrics.py). Under gunicorn, run with gunicorn.conf.py
+# so PROMETHEUS_MULTIPROC_DIR is set and every worker's samples are aggregated. Scrapes send
+# "Authorization: Bearer <token>"; without a token /metrics is only served when DEBUG is on.
+METRICS_ENABLED = env_config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_AUTH_TOKEN = env_config('METRICS_AUTH_TOKEN', default='')
+# api.sessions times the real session backend when metrics are on.
+SESSION_BACKEND_ENGINE = env_config('SESSION_ENGINE', default='django.contrib.sessions.backends.db')
+SESSION_ENGINE = 'api.sessions' if METRICS_ENABLED else SESSION_BACKEND_ENGINE
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.instrumentation': {
+            'handlers': ['console'],
+            'level': env_config('QUERY_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Apply SQL Server 2025 version detection patch. Set SQL_SERVER_VERSION (e.g. 2022) to skip
+# the version query each process otherwise runs on its first database connection.
+SQL_SERVER_VERSION = env_config('SQL_SERVER_VERSION', default=0, cast=int)
+
+from .sql_server_patch import patch_sql_server_version  # noqa: E402
+patch_sql_server_version(pinned_version=SQL_SERVER_VERSION)
@@ -1,71 +1,82 @@
 # Monkey patch to fix SQL Server 2025 version detection issue
-import sys
+import logging
+
+from django.db.utils import NotSupportedError
+
+logger = logging.getLogger(__name__)
+
+# Map internal version numbers to product versions
+VERSION_MAP = {
+    17: 2025,  # SQL Server 2025
+    16: 2022,  # SQL Server 2022
+    15: 2019,  # SQL Server 2019
+    14: 2017,  # SQL Server 2017
+    13: 2016,  # SQL Server 2016
+    12: 2014,  # SQL Server 2014
+    11: 2012,  # SQL Server 2012
+    10: 2008,  # SQL Server 2008 R2
+}
+FALLBACK_VERSION = 2019
+
+# Detected once per process and shared by every DatabaseWrapper (one per thread and
+# alias), so only the first wrapper pays for the temporary connection.
+_process_version_cache = {}
+_patched = False
+
+
+def _product_version(major):
+    ver = VERSION_MAP.get(major, major)
+    if ver < 2008:
+        raise NotSupportedError('SQL Server v%d is not supported.' % ver)
+    return ver
+
+
+def _detect_version(wrapper):
+    with wrapper.temporary_connection() as cursor:
+        cursor.execute("SELECT SERVERPROPERTY('ProductVersion')")
+        val = cursor.fetchone()[0]
+    return _product_version(int(val.split('.')[0]))
+
+
+def patch_sql_server_version(pinned_version=None):
+    """
+    Patch mssql backend to handle SQL Server 2025 version detection.
+
+    ``pinned_version`` (e.g. 2022, from SQL_SERVER_VERSION) skips the
+    server round trip entirely. Safe to call more than once.
+    """
+    global _patched
+    if pinned_version:
+        _process_version_cache['pinned'] = _product_version(pinned_version)
+    if _patched:
+        return True
 
-def patch_sql_server_version():
-    """Patch mssql backend to handle SQL Server 2025 version detection"""
-    
-    # Try patching mssql-django backend
     try:
         from mssql.base import DatabaseWrapper
-        
-        # Store original property if it exists
-        original_sql_server_version = None
-        if hasattr(DatabaseWrapper, 'sql_server_version'):
-            try:
-                original_sql_server_version = DatabaseWrapper.sql_server_version
-            except:
-                pass
-        
-        def get_sql_server_version_fixed(self):
-            """Fixed version retrieval that handles SQL Server 2025"""
-            # Try to get from instance cache first
-            cache_attr = '_sql_server_version_cache'
-            if hasattr(self, cache_attr):
-                return getattr(self, cache_attr)
-            
-            try:
-                # Get version from server
-                with self.temporary_connection() as cursor:
-                    cursor.execute("SELECT SERVERPROPERTY('ProductVersion')")
-                    val = cursor.fetchone()[0]
-                    ver = int(val.split('.')[0])
-                    
-                    # Map internal version numbers to product versions
-                    version_map = {
-                        17: 2025,  # SQL Server 2025
-                        16: 2022,  # SQL Server 2022
-                        15: 2019,  # SQL Server 2019
-                        14: 2017,  # SQL Server 2017
-                        13: 2016,  # SQL Server 2016
-                        12: 2014,  # SQL Server 2014
-                        11: 2012,  # SQL Server 2012
-                        10: 2008,  # SQL Server 2008 R2
-                    }
-                    
-                    # Get mapped version or use original
-                    ver = version_map.get(ver, ver)
-                    
-                    if ver < 2008:
-                        from django.db.utils import NotSupportedError
-                        raise NotSupportedError('SQL Server v%d is not supported.' % ver)
-                    
-                    # Cache the result
-                    setattr(self, cache_attr, ver)
-                    return ver
-            except Exception as e:
-                # If patching fails, return a safe default
-                print(f"Warning: Could not retrieve SQL Server version: {e}", file=sys.stderr)
-                return 2019  # Default to 2019
-        
-        # Override the method/property safely
-        try:
-            if hasattr(DatabaseWrapper, 'sql_server_version'):
-                delattr(DatabaseWrapper, 'sql_server_version')
-        except:
-            pass
-        
-        DatabaseWrapper.sql_server_version = property(get_sql_server_version_fixed)
-        print(f"✓ Successfully patched mssql backend for SQL Server 2025", file=sys.stderr)
-        
     except Exception as e:
-        print(f"Info: Could not patch mssql backend: {e}", file=sys.stderr)
+        # Expected when running on the SQLite stand-in without mssql-django installed.
+        logger.debug("Could not patch mssql backend: %s", e)
+        return False
+
+    def get_sql_server_version_fixed(self):
+        """Fixed version retrieval that handles SQL Server 2025"""
+        if 'pinned' in _process_version_cache:
+            return _process_version_cache['pinned']
+        key = (self.settings_dict.get('HOST'), self.settings_dict.get('PORT'), self.settings_dict.get('NAME'))
+        if key in _process_version_cache:
+            return _process_version_cache[key]
+        try:
+            ver = _detect_version(self)
+        except NotSupportedError:
+            raise
+        except Exception as e:
+            # Not cached process-wide, so the next wrapper tries the server again.
+            logger.warning("Could not retrieve SQL Server version, assuming %d: %s", FALLBACK_VERSION, e)
+            return FALLBACK_VERSION
+        _process_version_cache[key] = ver
+        return ver
+
+    DatabaseWrapper.sql_server_version = property(get_sql_server_version_fixed)
+    _patched = True
+    logger.debug("Patched mssql backend for SQL Server 2025")
+    return True
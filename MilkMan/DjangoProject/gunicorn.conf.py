@@ -0,0 +1,29 @@
+# Gunicorn settings: gunicorn -c gunicorn.conf.py config.wsgi
+#
+# Each worker is a separate process, so Prometheus metrics are written to
+# memory-mapped files in PROMETHEUS_MULTIPROC_DIR and /metrics aggregates
+# them (see api/metrics.py). The directory is emptied when the master starts
+# so counters from a previous run are not added to this one.
+
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '4'))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+
+# Must be in the environment before the workers import prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/milkman-prometheus')
+
+
+def on_starting(server):
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live-gauge files; its counters and histograms are kept.
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { adminService, categoryService, subscriptionService, customerService, productService } from '../services/api';
+import { adminService } from '../services/api';
 import '../styles/Dashboard.css';
 
 function Dashboard() {
@@ -9,6 +9,9 @@ function Dashboard() {
     subscriptions: 0,
     customers: 0,
     products: 0,
+    active_subscribers: 0,
+    scheduled_deliveries_today: 0,
+    low_stock_products: 0,
   });
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -20,21 +23,8 @@ function Dashboard() {
   const fetchStats = async () => {
     try {
       setLoading(true);
-      const [admins, categories, subscriptions, customers, products] = await Promise.all([
-        adminService.getAll(),
-        categoryService.getAll(),
-        subscriptionService.getAll(),
-        customerService.getAll(),
-        productService.getAll(),
-      ]);
-
-      setStats({
-        admins: admins.data?.count || admins.data?.results?.length || 0,
-        categories: categories.data?.count || categories.data?.results?.length || 0,
-        subscriptions: subscriptions.data?.count || subscriptions.data?.results?.length || 0,
-        customers: customers.data?.count || customers.data?.results?.length || 0,
-        products: products.data?.count || products.data?.results?.length || 0,
-      });
+      const response = await adminService.getStats();
+      setStats((prev) => ({ ...prev, ...response.data }));
     } catch (err) {
       console.error('Error fetching stats:', err);
       setError('Failed to load dashboard data');
@@ -101,6 +91,30 @@ function Dashboard() {
             <div className="stat-number">{stats.products}</div>
           </div>
         </div>
+
+        <div className="stat-card customer-card">
+          <div className="stat-icon">✅</div>
+          <div className="stat-info">
+            <h3>Active Subscribers</h3>
+            <div className="stat-number">{stats.active_subscribers}</div>
+          </div>
+        </div>
+
+        <div className="stat-card subscription-card">
+          <div className="stat-icon">🚚</div>
+          <div className="stat-info">
+            <h3>Deliveries Today</h3>
+            <div className="stat-number">{stats.scheduled_deliveries_today}</div>
+          </div>
+        </div>
+
+        <div className="stat-card product-card">
+          <div className="stat-icon">⚠️</div>
+          <div className="stat-info">
+            <h3>Low Stock</h3>
+            <div className="stat-number">{stats.low_stock_products}</div>
+          </div>
+        </div>
       </div>
 
       <div className="welcome-section">
@@ -1,8 +1,14 @@
 import React, { useCallback, useEffect, useMemo, useRef, useState } from 'react';
 import { FaShoppingCart } from 'react-icons/fa';
-import { userService } from '../services/api';
+import { newIdempotencyKey, userService } from '../services/api';
 import '../styles/UserDashboard.css';
 
+// Keep the attempt's Idempotency-Key when the answer was lost, is still being worked on
+// (409) or was a server error, so resubmitting retries that attempt instead of paying twice.
+const keepsIdempotencyKey = (apiError) => (
+  !apiError?.response || apiError.response.status === 409 || apiError.response.status >= 500
+);
+
 const paymentTemplate = {
   payment_method: 'card',
   card_holder: '',
@@ -85,6 +91,8 @@ function UserDashboard({ authUser }) {
   const [activePanel, setActivePanel] = useState('');
   const [successReceipt, setSuccessReceipt] = useState(null);
   const plansRef = useRef(null);
+  const subscribeAttemptKey = useRef(null);
+  const cartCheckoutAttemptKey = useRef(null);
 
   const activeSubscription = dashboardData.customer?.current_subscription || null;
   const activePlan = useMemo(() => {
@@ -387,7 +395,16 @@ function UserDashboard({ authUser }) {
         payload.bank_name = paymentData.bank_name;
       }
 
-      const response = await userService.subscribe(payload);
+      subscribeAttemptKey.current = subscribeAttemptKey.current || newIdempotencyKey();
+      const response = await userService.subscribe(payload, subscribeAttemptKey.current);
+      subscribeAttemptKey.current = null;
+      if (response?.data?.payment?.status !== 'success') {
+        setSuccess('Your payment is still being processed. Check Recent Payments in a few minutes for the result.');
+        setSelectedPlan(null);
+        setPaymentData(paymentTemplate);
+        await fetchDashboard();
+        return;
+      }
       const paidAt = response?.data?.payment?.paid_at || new Date().toISOString();
       const amount = parsePrice(selectedPlanSnapshot.price);
       const reference = (
@@ -428,6 +445,9 @@ function UserDashboard({ authUser }) {
       setPaymentData(paymentTemplate);
       await fetchDashboard();
     } catch (apiError) {
+      if (!keepsIdempotencyKey(apiError)) {
+        subscribeAttemptKey.current = null;
+      }
       const data = apiError?.response?.data;
       setError(data?.reason || data?.error || 'Payment failed');
     } finally {
@@ -639,8 +659,20 @@ function UserDashboard({ authUser }) {
         payload.bank_name = cartPaymentData.bank_name;
       }
 
-      const response = await userService.cartCheckout(payload);
+      cartCheckoutAttemptKey.current = cartCheckoutAttemptKey.current || newIdempotencyKey();
+      const response = await userService.cartCheckout(payload, cartCheckoutAttemptKey.current);
+      cartCheckoutAttemptKey.current = null;
       const orderId = response?.data?.order?.order_id;
+      if (cartPaymentSnapshot.payment_method !== 'cod' && response?.data?.payment?.status !== 'success') {
+        setCartItems([]);
+        setCartPaymentData(cartPaymentTemplate);
+        setCartCheckoutOpen(false);
+        setCartOpen(false);
+        setSuccess(orderId
+          ? `Order #${orderId} placed; the payment is still being processed. Check Recent Payments in a few minutes.`
+          : 'Order placed; the payment is still being processed. Check Recent Payments in a few minutes.');
+        return;
+      }
       const paidAt = response?.data?.payment?.paid_at || new Date().toISOString();
       const transactionReference = (
         response?.data?.payment?.transaction_reference
@@ -681,6 +713,9 @@ function UserDashboard({ authUser }) {
       setCartOpen(false);
       setSuccess(orderId ? `Order #${orderId} confirmed via ${cartPaymentMethodLabel}` : 'Order confirmed');
     } catch (apiError) {
+      if (!keepsIdempotencyKey(apiError)) {
+        cartCheckoutAttemptKey.current = null;
+      }
       const data = apiError?.response?.data;
       if (Array.isArray(data?.subscription_only_items) && data.subscription_only_items.length > 0) {
         setCartWarning('Some items require subscription delivery. Remove them from cart and add to your plan basket.');
@@ -10,8 +10,8 @@ function UserDeliveryPage({ authUser }) {
   useEffect(() => {
     const loadOrders = async () => {
       try {
-        const response = await userService.getOrders(authUser?.id);
-        setOrders(response.data || []);
+        const response = await userService.getOrders(authUser?.id, { view: 'summary', status: 'paid', page_size: 5 });
+        setOrders(response.data?.results || []);
       } finally {
         setLoading(false);
       }
@@ -10,10 +10,10 @@ function UserNotificationsPage({ authUser }) {
     const load = async () => {
       const [paymentsResponse, ordersResponse] = await Promise.all([
         userService.getPayments(authUser?.id),
-        userService.getOrders(authUser?.id),
+        userService.getOrders(authUser?.id, { view: 'summary', page_size: 8 }),
       ]);
       setPayments(paymentsResponse.data || []);
-      setOrders(ordersResponse.data || []);
+      setOrders(ordersResponse.data?.results || []);
     };
     load();
   }, [authUser?.id]);
@@ -2,8 +2,15 @@ import React, { useEffect, useMemo, useState } from 'react';
 import { userService } from '../services/api';
 import '../styles/UserModules.css';
 
+const ORDERS_PAGE_SIZE = 8;
+
+const cursorFromUrl = (url) => (url ? new URL(url).searchParams.get('cursor') : null);
+
 function UserOrdersPage({ authUser }) {
   const [orders, setOrders] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [orderItems, setOrderItems] = useState({});
   const [deliveries, setDeliveries] = useState([]);
   const [loading, setLoading] = useState(true);
 
@@ -12,10 +19,11 @@ function UserOrdersPage({ authUser }) {
       setLoading(true);
       try {
         const [ordersRes, deliveriesRes] = await Promise.all([
-          userService.getOrders(authUser?.id),
+          userService.getOrders(authUser?.id, { view: 'summary', page_size: ORDERS_PAGE_SIZE }),
           userService.getSubscriptionDeliveries(authUser?.id, 7),
         ]);
-        setOrders(ordersRes.data || []);
+        setOrders(ordersRes.data?.results || []);
+        setNextCursor(cursorFromUrl(ordersRes.data?.next));
         setDeliveries(deliveriesRes.data?.deliveries || []);
       } finally {
         setLoading(false);
@@ -24,13 +32,37 @@ function UserOrdersPage({ authUser }) {
     load();
   }, [authUser?.id]);
 
+  const loadMoreOrders = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await userService.getOrders(authUser?.id, {
+        view: 'summary',
+        page_size: ORDERS_PAGE_SIZE,
+        cursor: nextCursor,
+      });
+      setOrders((prev) => [...prev, ...(response.data?.results || [])]);
+      setNextCursor(cursorFromUrl(response.data?.next));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const toggleOrderItems = async (orderId) => {
+    if (orderItems[orderId]) {
+      setOrderItems((prev) => ({ ...prev, [orderId]: null }));
+      return;
+    }
+    const response = await userService.getOrder(authUser?.id, orderId);
+    setOrderItems((prev) => ({ ...prev, [orderId]: response.data?.items || [] }));
+  };
+
   const orderRows = useMemo(() => (
     orders.map((order) => ({
       id: order.order_id,
       status: order.status,
       total: order.total_amount,
       createdAt: order.created_at,
-      items: order.items || [],
+      itemCount: order.item_count || 0,
     }))
   ), [orders]);
 
@@ -51,12 +83,22 @@ function UserOrdersPage({ authUser }) {
               <div className="module-meta">No orders yet.</div>
             ) : (
               <div className="module-list">
-                {orderRows.slice(0, 8).map((order) => (
+                {orderRows.map((order) => (
                   <div key={order.id} className="module-item">
                     <div>
                       <strong>Order #{order.id}</strong>
                       <div className="module-meta">{new Date(order.createdAt).toLocaleString()}</div>
-                      <div className="module-meta">{order.items.length} items</div>
+                      <div className="module-meta">{order.itemCount} items</div>
+                      {orderItems[order.id] && (
+                        <div className="module-meta">
+                          {orderItems[order.id].map((item) => `${item.product_name} x${item.quantity}`).join(', ')}
+                        </div>
+                      )}
+                      <div className="module-actions">
+                        <button type="button" className="ghost" onClick={() => toggleOrderItems(order.id)}>
+                          {orderItems[order.id] ? 'Hide items' : 'View items'}
+                        </button>
+                      </div>
                     </div>
                     <div>
                       <span className="module-badge">{order.status}</span>
@@ -64,6 +106,13 @@ function UserOrdersPage({ authUser }) {
                     </div>
                   </div>
                 ))}
+                {nextCursor && (
+                  <div className="module-actions">
+                    <button type="button" onClick={loadMoreOrders} disabled={loadingMore}>
+                      {loadingMore ? 'Loading...' : 'Load more orders'}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </article>
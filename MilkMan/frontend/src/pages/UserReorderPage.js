@@ -1,39 +1,26 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { userService } from '../services/api';
 import '../styles/UserModules.css';
 
 function UserReorderPage({ authUser }) {
-  const [orders, setOrders] = useState([]);
+  const [suggestions, setSuggestions] = useState([]);
   const [favorites, setFavorites] = useState(() => {
     const raw = window.localStorage.getItem('mm_favorites');
     return raw ? JSON.parse(raw) : [];
   });
 
   useEffect(() => {
-    const loadOrders = async () => {
-      const response = await userService.getOrders(authUser?.id);
-      setOrders(response.data || []);
+    const loadSuggestions = async () => {
+      const response = await userService.getReorderSuggestions(authUser?.id, { limit: 8 });
+      setSuggestions(response.data?.suggestions || []);
     };
-    loadOrders();
+    loadSuggestions();
   }, [authUser?.id]);
 
   useEffect(() => {
     window.localStorage.setItem('mm_favorites', JSON.stringify(favorites));
   }, [favorites]);
 
-  const frequentProducts = useMemo(() => {
-    const count = {};
-    orders.forEach((order) => {
-      (order.items || []).forEach((item) => {
-        const key = item.product_name || `Product-${item.product}`;
-        count[key] = (count[key] || 0) + Number(item.quantity || 0);
-      });
-    });
-    return Object.entries(count)
-      .sort((first, second) => second[1] - first[1])
-      .slice(0, 8);
-  }, [orders]);
-
   const toggleFavorite = (productName) => {
     setFavorites((prev) => (
       prev.includes(productName) ? prev.filter((value) => value !== productName) : [...prev, productName]
@@ -48,12 +35,13 @@ function UserReorderPage({ authUser }) {
       </header>
 
       <div className="module-grid">
-        {frequentProducts.length === 0 ? (
+        {suggestions.length === 0 ? (
           <div className="module-card">No order history available for reorder suggestions yet.</div>
-        ) : frequentProducts.map(([name, qty]) => (
-          <article key={name} className="module-card">
+        ) : suggestions.map(({ product_id: productId, name, total_quantity: totalQuantity, last_quantity: lastQuantity }) => (
+          <article key={productId} className="module-card">
             <h3>{name}</h3>
-            <div className="module-meta">Ordered quantity: {qty}</div>
+            <div className="module-meta">Ordered quantity: {totalQuantity}</div>
+            <div className="module-meta">Last time: {lastQuantity}</div>
             <div className="module-actions">
               <button type="button" onClick={() => window.localStorage.setItem('mm_user_active_panel', 'products')}>
                 Reorder
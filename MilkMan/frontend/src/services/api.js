@@ -19,14 +19,63 @@ export const authService = {
   logout: () => apiClient.post('/auth/logout/'),
 };
 
+// Online payments are settled by a background worker: a 202 response carries the
+// pending payment, so poll its status until it succeeds (resolve) or fails (reject).
+// If it is still pending when polling gives up, the latest poll is resolved as is:
+// callers must check payment.status before treating the payment as done.
+const PAYMENT_POLL_INTERVAL_MS = 1000;
+const PAYMENT_POLL_ATTEMPTS = 60;
+
+const waitForPayment = async (request, customerId) => {
+  const response = await request;
+  const reference = response.data?.payment?.transaction_reference;
+  if (response.status !== 202 || !reference) {
+    return response;
+  }
+  let latest = response;
+  for (let attempt = 0; attempt < PAYMENT_POLL_ATTEMPTS; attempt += 1) {
+    await new Promise((resolve) => setTimeout(resolve, PAYMENT_POLL_INTERVAL_MS));
+    latest = await apiClient.get(`/user/payments/${reference}/status/`, { params: { customer_id: customerId } });
+    const paymentStatus = latest.data?.payment?.status;
+    if (paymentStatus === 'failed') {
+      const error = new Error(latest.data?.reason || 'Payment failed');
+      error.response = latest;
+      throw error;
+    }
+    if (paymentStatus !== 'pending') {
+      return latest;
+    }
+  }
+  return latest;
+};
+
+// Checkout and subscribe take an Idempotency-Key: create one per attempt and send the
+// same key again when retrying that attempt, so the server never charges it twice.
+export const newIdempotencyKey = () => (
+  window.crypto?.randomUUID
+    ? window.crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`
+);
+
+const idempotencyHeaders = (idempotencyKey) => ({ headers: { 'Idempotency-Key': idempotencyKey } });
+
 // ======================== USER SERVICE ========================
 export const userService = {
   getDashboardData: (customerId) => apiClient.get('/user/dashboard-data/', { params: { customer_id: customerId } }),
-  subscribe: (data) => apiClient.post('/user/subscribe/', data),
+  subscribe: (data, idempotencyKey = newIdempotencyKey()) => waitForPayment(
+    apiClient.post('/user/subscribe/', data, idempotencyHeaders(idempotencyKey)),
+    data.customer_id,
+  ),
   getPayments: (customerId) => apiClient.get('/user/payments/', { params: { customer_id: customerId } }),
   deactivateSubscription: (data) => apiClient.post('/user/deactivate-subscription/', data),
-  cartCheckout: (data) => apiClient.post('/user/cart-checkout/', data),
-  getOrders: (customerId) => apiClient.get('/user/orders/', { params: { customer_id: customerId } }),
+  cartCheckout: (data, idempotencyKey = newIdempotencyKey()) => waitForPayment(
+    apiClient.post('/user/cart-checkout/', data, idempotencyHeaders(idempotencyKey)),
+    data.customer_id,
+  ),
+  // Cursor-paginated: { next, previous, results }. params: view ('summary'), status, start, end, page_size, cursor
+  getOrders: (customerId, params = {}) => apiClient.get('/user/orders/', { params: { customer_id: customerId, ...params } }),
+  getOrder: (customerId, orderId) => apiClient.get(`/user/orders/${orderId}/`, { params: { customer_id: customerId } }),
+  getReorderSuggestions: (customerId, params = {}) => apiClient.get('/user/reorder-suggestions/', { params: { customer_id: customerId, ...params } }),
   getSubscriptionBasket: (customerId) => apiClient.get('/user/subscription-basket/', { params: { customer_id: customerId } }),
   upsertSubscriptionBasket: (customerId, data) => apiClient.post('/user/subscription-basket/', { ...data, customer_id: customerId }),
   deleteSubscriptionBasket: (customerId, productId) => apiClient.delete('/user/subscription-basket/', { params: { customer_id: customerId, product_id: productId } }),
@@ -42,6 +91,7 @@ export const adminService = {
   delete: (id) => apiClient.delete(`/admins/${id}/`),
   getActive: () => apiClient.get('/admins/active_admins/'),
   deactivate: (id) => apiClient.post(`/admins/${id}/deactivate/`),
+  getStats: () => apiClient.get('/admin/stats/'),
 };
 
 // ======================== CATEGORY SERVICE ========================